@@ -0,0 +1,213 @@
+"""Baseline schema (database/schema.sql before migrations were introduced)
+
+Databases created before migrations (from the original schema.sql, or by
+Base.metadata.create_all when the app started) are adopted as they are: only
+the tables, indexes and triggers they lack are created, so `alembic upgrade
+head` works on them without a manual stamp.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+UPDATED_AT_TABLES = ["administrators", "guests", "rooms", "reservations"]
+
+
+def _create_missing_table(name, *elements) -> None:
+    """create_table, unless a database built before migrations already has it"""
+    if not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *elements)
+
+
+def upgrade() -> None:
+    _create_missing_table(
+        "administrators",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False, unique=True),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("full_name", sa.String(200), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False, unique=True),
+        sa.Column("role", sa.String(50), server_default="admin"),
+        sa.Column("is_active", sa.Boolean(), server_default=sa.true()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.current_timestamp()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.current_timestamp()),
+    )
+
+    _create_missing_table(
+        "guests",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("first_name", sa.String(100), nullable=False),
+        sa.Column("last_name", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False, unique=True),
+        sa.Column("phone", sa.String(20), nullable=False),
+        sa.Column("id_document", sa.String(50), nullable=False, unique=True),
+        sa.Column("nationality", sa.String(100)),
+        sa.Column("date_of_birth", sa.DateTime()),
+        sa.Column("address", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.current_timestamp()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.current_timestamp()),
+    )
+
+    _create_missing_table(
+        "rooms",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("room_number", sa.String(10), nullable=False, unique=True),
+        sa.Column("type", sa.String(20), nullable=False),
+        sa.Column("price_per_night", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("amenities", postgresql.JSONB(), server_default=sa.text("'[]'::jsonb")),
+        sa.Column("status", sa.String(20), server_default="Available"),
+        sa.Column("floor", sa.Integer()),
+        sa.Column("image_url", sa.String(500)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.current_timestamp()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.current_timestamp()),
+        sa.CheckConstraint("type IN ('Single', 'Double', 'Suite', 'Deluxe')", name="rooms_type_check"),
+        sa.CheckConstraint("price_per_night > 0", name="rooms_price_per_night_check"),
+        sa.CheckConstraint("capacity > 0", name="rooms_capacity_check"),
+        sa.CheckConstraint("status IN ('Available', 'Occupied', 'Maintenance')", name="rooms_status_check"),
+    )
+
+    _create_missing_table(
+        "room_images",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("room_id", sa.Integer(), sa.ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("image_url", sa.String(500), nullable=False),
+        sa.Column("is_primary", sa.Boolean(), server_default=sa.false()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.current_timestamp()),
+    )
+
+    _create_missing_table(
+        "reservations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("room_id", sa.Integer(), sa.ForeignKey("rooms.id"), nullable=False),
+        sa.Column("guest_id", sa.Integer(), sa.ForeignKey("guests.id"), nullable=False),
+        sa.Column("check_in_date", sa.DateTime(), nullable=False),
+        sa.Column("check_out_date", sa.DateTime(), nullable=False),
+        sa.Column("actual_check_in", sa.DateTime()),
+        sa.Column("actual_check_out", sa.DateTime()),
+        sa.Column("status", sa.String(20), server_default="Pending"),
+        sa.Column("total_price", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("guests_count", sa.Integer(), server_default="1"),
+        sa.Column("special_requests", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.current_timestamp()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.current_timestamp()),
+        sa.CheckConstraint("status IN ('Pending', 'Active', 'Completed', 'Cancelled')", name="reservations_status_check"),
+        sa.CheckConstraint("guests_count > 0", name="reservations_guests_count_check"),
+        sa.CheckConstraint("check_out_date > check_in_date", name="check_dates"),
+    )
+
+    op.create_index("idx_rooms_status", "rooms", ["status"], if_not_exists=True)
+    op.create_index("idx_rooms_type", "rooms", ["type"], if_not_exists=True)
+    op.create_index("idx_rooms_room_number", "rooms", ["room_number"], if_not_exists=True)
+
+    op.create_index("idx_guests_email", "guests", ["email"], if_not_exists=True)
+    op.create_index("idx_guests_id_document", "guests", ["id_document"], if_not_exists=True)
+
+    op.create_index("idx_reservations_room_id", "reservations", ["room_id"], if_not_exists=True)
+    op.create_index("idx_reservations_guest_id", "reservations", ["guest_id"], if_not_exists=True)
+    op.create_index("idx_reservations_status", "reservations", ["status"], if_not_exists=True)
+    op.create_index("idx_reservations_check_in_date", "reservations", ["check_in_date"], if_not_exists=True)
+    op.create_index("idx_reservations_check_out_date", "reservations", ["check_out_date"], if_not_exists=True)
+
+    op.create_index("idx_room_images_room_id", "room_images", ["room_id"], if_not_exists=True)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION update_updated_at_column()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at = CURRENT_TIMESTAMP;
+            RETURN NEW;
+        END;
+        $$ language 'plpgsql';
+    """)
+    for table in UPDATED_AT_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS update_{table}_updated_at ON {table}")
+        op.execute(f"""
+            CREATE TRIGGER update_{table}_updated_at BEFORE UPDATE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+        """)
+
+    op.execute("""
+        CREATE OR REPLACE VIEW current_room_status AS
+        SELECT
+            r.id,
+            r.room_number,
+            r.type,
+            r.status,
+            r.price_per_night,
+            r.capacity,
+            r.floor,
+            CASE
+                WHEN res.id IS NOT NULL THEN CONCAT(g.first_name, ' ', g.last_name)
+                ELSE NULL
+            END as current_guest,
+            res.check_in_date,
+            res.check_out_date
+        FROM rooms r
+        LEFT JOIN reservations res ON r.id = res.room_id AND res.status = 'Active'
+        LEFT JOIN guests g ON res.guest_id = g.id;
+    """)
+    op.execute("""
+        CREATE OR REPLACE VIEW occupancy_stats AS
+        SELECT
+            COUNT(*) as total_rooms,
+            COUNT(CASE WHEN status = 'Occupied' THEN 1 END) as occupied_rooms,
+            COUNT(CASE WHEN status = 'Available' THEN 1 END) as available_rooms,
+            COUNT(CASE WHEN status = 'Maintenance' THEN 1 END) as maintenance_rooms,
+            ROUND(
+                (COUNT(CASE WHEN status = 'Occupied' THEN 1 END)::NUMERIC / NULLIF(COUNT(*), 0)) * 100,
+                2
+            ) as occupancy_rate
+        FROM rooms;
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION check_room_availability(
+            p_room_id INTEGER,
+            p_check_in TIMESTAMP,
+            p_check_out TIMESTAMP
+        )
+        RETURNS BOOLEAN AS $$
+        DECLARE
+            conflict_count INTEGER;
+        BEGIN
+            SELECT COUNT(*) INTO conflict_count
+            FROM reservations
+            WHERE room_id = p_room_id
+                AND status IN ('Pending', 'Active')
+                AND (
+                    (check_in_date <= p_check_in AND check_out_date > p_check_in)
+                    OR (check_in_date < p_check_out AND check_out_date >= p_check_out)
+                    OR (check_in_date >= p_check_in AND check_out_date <= p_check_out)
+                );
+
+            RETURN conflict_count = 0;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS check_room_availability(INTEGER, TIMESTAMP, TIMESTAMP)")
+    op.execute("DROP VIEW IF EXISTS occupancy_stats")
+    op.execute("DROP VIEW IF EXISTS current_room_status")
+    for table in UPDATED_AT_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS update_{table}_updated_at ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS update_updated_at_column()")
+
+    op.drop_table("reservations")
+    op.drop_table("room_images")
+    op.drop_table("rooms")
+    op.drop_table("guests")
+    op.drop_table("administrators")
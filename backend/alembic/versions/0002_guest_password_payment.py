@@ -0,0 +1,39 @@
+"""Guest passwords and reservation payment columns
+
+Replaces migrate_add_password.py and add_payment_columns.sql. Uses
+IF NOT EXISTS so databases where those scripts already ran upgrade cleanly.
+
+Revision ID: 0002_guest_password_payment
+Revises: 0001_baseline
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_guest_password_payment'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE guests ADD COLUMN IF NOT EXISTS password_hash VARCHAR(255)")
+    op.execute("""
+        ALTER TABLE reservations
+        ADD COLUMN IF NOT EXISTS payment_method VARCHAR(50) DEFAULT 'Cash',
+        ADD COLUMN IF NOT EXISTS payment_status VARCHAR(50) DEFAULT 'Pending'
+    """)
+    op.execute("""
+        UPDATE reservations
+        SET payment_method = COALESCE(payment_method, 'Cash'),
+            payment_status = COALESCE(payment_status, 'Pending')
+        WHERE payment_method IS NULL OR payment_status IS NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column("reservations", "payment_status")
+    op.drop_column("reservations", "payment_method")
+    op.drop_column("guests", "password_hash")
@@ -0,0 +1,83 @@
+"""Group bookings, room holds and idempotency keys
+
+Databases built by Base.metadata.create_all may already have these tables
+and reservations.group_id; only what's missing is created.
+
+Revision ID: 0003_groups_holds_idempotency
+Revises: 0002_guest_password_payment
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_groups_holds_idempotency'
+down_revision = '0002_guest_password_payment'
+branch_labels = None
+depends_on = None
+
+
+def _create_missing_table(name, *elements) -> None:
+    """create_table, unless a database built before migrations already has it"""
+    if not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *elements)
+
+
+def upgrade() -> None:
+    _create_missing_table(
+        "reservation_groups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("guest_id", sa.Integer(), sa.ForeignKey("guests.id"), nullable=False),
+        sa.Column("check_in_date", sa.DateTime(), nullable=False),
+        sa.Column("check_out_date", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.current_timestamp()),
+    )
+    reservation_columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("reservations")}
+    if "group_id" not in reservation_columns:
+        op.add_column(
+            "reservations",
+            sa.Column("group_id", sa.Integer(), sa.ForeignKey("reservation_groups.id"))
+        )
+    op.create_index("idx_reservations_group_id", "reservations", ["group_id"], if_not_exists=True)
+
+    _create_missing_table(
+        "room_holds",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("hold_token", sa.String(36), nullable=False, unique=True),
+        sa.Column("room_id", sa.Integer(), sa.ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("guest_id", sa.Integer(), sa.ForeignKey("guests.id"), nullable=False),
+        sa.Column("check_in_date", sa.DateTime(), nullable=False),
+        sa.Column("check_out_date", sa.DateTime(), nullable=False),
+        sa.Column("guests_count", sa.Integer(), server_default="1"),
+        sa.Column("status", sa.String(20), server_default="Held"),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("reservation_id", sa.Integer(), sa.ForeignKey("reservations.id")),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.current_timestamp()),
+        sa.CheckConstraint("status IN ('Held', 'Converted', 'Released', 'Expired')", name="room_holds_status_check"),
+    )
+    op.create_index("idx_room_holds_room_id", "room_holds", ["room_id"], if_not_exists=True)
+
+    _create_missing_table(
+        "idempotency_keys",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("key", sa.String(255), nullable=False),
+        sa.Column("scope", sa.String(100), nullable=False),
+        sa.Column("request_hash", sa.String(64), nullable=False),
+        sa.Column("status_code", sa.Integer()),
+        sa.Column("response_body", postgresql.JSONB()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.current_timestamp()),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),
+    )
+    op.create_index("idx_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table("idempotency_keys")
+    op.drop_table("room_holds")
+    op.drop_index("idx_reservations_group_id", table_name="reservations")
+    op.drop_column("reservations", "group_id")
+    op.drop_table("reservation_groups")
@@ -0,0 +1,61 @@
+"""Partial and composite indexes for the hot reservation queries
+
+database/schema.sql creates the same indexes; a database built from it
+already has them.
+
+Revision ID: 0004_reservation_hot_indexes
+Revises: 0003_groups_holds_idempotency
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_reservation_hot_indexes'
+down_revision = '0003_groups_holds_idempotency'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Overlap checks for a room only ever look at Pending/Active reservations
+    op.create_index(
+        "idx_reservations_room_open_dates", "reservations",
+        ["room_id", "check_in_date", "check_out_date"],
+        postgresql_where=sa.text("status IN ('Pending', 'Active')"),
+        if_not_exists=True
+    )
+    # Today's check-ins and the no-show sweep
+    op.create_index(
+        "idx_reservations_open_check_in", "reservations", ["check_in_date"],
+        postgresql_where=sa.text("status IN ('Pending', 'Active')"),
+        if_not_exists=True
+    )
+    # Today's check-outs and the overdue check-out sweep
+    op.create_index(
+        "idx_reservations_active_check_out", "reservations", ["check_out_date"],
+        postgresql_where=sa.text("status = 'Active'"),
+        if_not_exists=True
+    )
+    # Revenue today/this month as an index-only scan
+    op.create_index(
+        "idx_reservations_created_at_revenue", "reservations", ["created_at"],
+        postgresql_include=["total_price"],
+        postgresql_where=sa.text("status <> 'Cancelled'"),
+        if_not_exists=True
+    )
+    op.create_index(
+        "idx_room_holds_room_held_dates", "room_holds",
+        ["room_id", "check_in_date", "check_out_date"],
+        postgresql_where=sa.text("status = 'Held'"),
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_room_holds_room_held_dates", table_name="room_holds")
+    op.drop_index("idx_reservations_created_at_revenue", table_name="reservations")
+    op.drop_index("idx_reservations_active_check_out", table_name="reservations")
+    op.drop_index("idx_reservations_open_check_in", table_name="reservations")
+    op.drop_index("idx_reservations_room_open_dates", table_name="reservations")
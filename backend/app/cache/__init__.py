@@ -0,0 +1,20 @@
+"""
+Cache Module
+Service-layer cache with tag invalidation: in-process LRU/TTL by default,
+Redis when CACHE_BACKEND=redis
+"""
+from . import keys
+from .backends import CacheBackend, MemoryBackend, RedisBackend
+from .cache import Cache, cache
+from .notify import InvalidationBus, invalidation_bus
+
+__all__ = [
+    'keys',
+    'CacheBackend',
+    'MemoryBackend',
+    'RedisBackend',
+    'Cache',
+    'cache',
+    'InvalidationBus',
+    'invalidation_bus'
+]
@@ -0,0 +1,166 @@
+"""
+Cache Backends
+Where cached values live: an in-process LRU with TTLs, or Redis shared by
+every worker. Both index entries by tag so a mutation can drop exactly the
+entries it affects.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from app.diagnostics.prometheus import cache_evictions
+
+
+class CacheBackend:
+    """Storage interface used by Cache"""
+
+    name = ""
+    # Whether calls do network I/O and must be kept off the event loop
+    blocking = False
+    # Whether every worker sees the same entries
+    shared = False
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """(found, value)"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """Drop every entry carrying any of the tags. Returns entries dropped"""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def size(self) -> Optional[int]:
+        """Entries stored, None when the backend can't tell cheaply"""
+        return None
+
+
+class MemoryBackend(CacheBackend):
+    """
+    LRU of at most `max_entries` entries with a TTL each
+
+    Expired entries are dropped when read or when they reach the LRU end.
+    One lock guards the entries and the tag index: every operation is a
+    few dict updates, so readers on the event loop and writers in the
+    thread pool don't wait on each other for long.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # key -> (value, expires at (monotonic), tags)
+        self._entries: "OrderedDict[str, Tuple[Any, float, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str]) -> None:
+        tags = tuple(tags)
+        evicted = 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+        if evicted:
+            cache_evictions.inc(amount=evicted)
+
+    def _remove(self, key: str) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+
+class RedisBackend(CacheBackend):
+    """
+    Cache shared by all workers in Redis (CACHE_BACKEND=redis)
+
+    Values are pickled, so the Redis instance must only be reachable by the
+    app. Each tag is a set of the keys carrying it, expiring with the
+    newest of them; invalidating a tag deletes its keys and the set.
+    """
+
+    name = "redis"
+    blocking = True
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "hotel:cache:"):
+        # Optional dependency, only needed with CACHE_BACKEND=redis
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self._prefix}tag:{tag}"
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        raw = self._client.get(self._prefix + key)
+        if raw is None:
+            return False, None
+        return True, pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str]) -> None:
+        pipeline = self._client.pipeline(transaction=False)
+        pipeline.set(self._prefix + key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=ttl)
+        for tag in tags:
+            pipeline.sadd(self._tag_key(tag), self._prefix + key)
+            pipeline.expire(self._tag_key(tag), ttl)
+        pipeline.execute()
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        pipeline = self._client.pipeline(transaction=False)
+        for tag_key in tag_keys:
+            pipeline.smembers(tag_key)
+        keys = set().union(*pipeline.execute())
+        self._client.delete(*keys, *tag_keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=f"{self._prefix}*", count=1000))
+        if keys:
+            self._client.delete(*keys)
@@ -0,0 +1,251 @@
+"""
+Service Cache
+Read-through cache for the service layer: a decorator that caches the
+result of a read under its arguments and tags, and explicit invalidation of
+tags by the mutations.
+"""
+import contextlib
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import anyio
+
+from app.cache.backends import CacheBackend, MemoryBackend, RedisBackend
+from app.config import settings
+from app.diagnostics.prometheus import Gauge, cache_invalidations, cache_requests, registry
+
+logger = logging.getLogger(__name__)
+
+# Tags held back by Cache.deferred() in the current context
+_deferred_tags: ContextVar[Optional[List[str]]] = ContextVar("cache_deferred_tags", default=None)
+
+
+class Cache:
+    """
+    Caches the results of service reads until a mutation invalidates them
+
+    A read that started before an invalidation of one of its tags may have
+    seen the old rows, so its result is not stored. With read replicas,
+    results are also not stored for READ_YOUR_WRITES_SECONDS after their
+    tags are invalidated, since a replica may still return the old rows.
+
+    Backend errors are logged and treated as misses: the cache never fails
+    a request. With the in-memory backend each worker has its own cache;
+    `publisher` (set by InvalidationBus) sends local invalidations to the
+    other workers, which apply them with receive(). Listeners added with
+    subscribe() see every invalidation, local or not: other in-process
+    caches (the room catalog) use them to follow the same tags.
+    """
+
+    # Invalidations remembered to check fills against; a fill older than
+    # all of them is not stored
+    RECENT_INVALIDATIONS = 1024
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: int, enabled: bool = True, fill_guard_seconds: float = 0):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.fill_guard_seconds = fill_guard_seconds
+        self._lock = threading.Lock()
+        self._sequence = 0
+        # (sequence, monotonic time, tags, or None for a clear())
+        self._recent: Deque[Tuple[int, float, Optional[FrozenSet[str]]]] = deque(maxlen=self.RECENT_INVALIDATIONS)
+        self.publisher: Optional[Callable[[Optional[Tuple[str, ...]]], None]] = None
+        self._listeners: List[Callable[[Optional[FrozenSet[str]]], None]] = []
+
+    def cached(
+        self,
+        namespace: str,
+        tags: Callable[..., Iterable[str]],
+        convert: Optional[Callable[[Any], Any]] = None
+    ):
+        """
+        Cache an async service read
+
+        The key is the namespace plus every argument except the session
+        (`db`). `tags(value, **arguments)` returns the tags of a result.
+        `convert` turns the ORM result into something detached from the
+        session (the response schema) before it is cached; the wrapped
+        function returns the converted value on hits and misses alike.
+        None results are returned but not cached. Cached values are shared
+        between requests and must not be modified.
+        """
+        def decorator(func):
+            signature = inspect.signature(func)
+
+            def finish(value):
+                return convert(value) if convert is not None and value is not None else value
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return finish(await func(*args, **kwargs))
+
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = {name: value for name, value in bound.arguments.items() if name != "db"}
+                key = f"{namespace}:{tuple(arguments.values())!r}"
+
+                found, value = await self._get(key)
+                cache_requests.inc(namespace, "hit" if found else "miss")
+                if found:
+                    return value
+
+                ticket = self._sequence
+                value = finish(await func(*args, **kwargs))
+                if value is not None:
+                    await self._set(key, value, frozenset(tags(value, **arguments)), ticket)
+                return value
+
+            return wrapper
+        return decorator
+
+    async def _get(self, key: str) -> Tuple[bool, Any]:
+        try:
+            if self.backend.blocking:
+                return await anyio.to_thread.run_sync(self.backend.get, key)
+            return self.backend.get(key)
+        except Exception:
+            logger.warning("Cache read of %s failed", key, exc_info=True)
+            return False, None
+
+    async def _set(self, key: str, value: Any, tags: FrozenSet[str], ticket: int) -> None:
+        if not self._may_store(tags, ticket):
+            return
+        try:
+            if self.backend.blocking:
+                await anyio.to_thread.run_sync(self.backend.set, key, value, self.ttl_seconds, tags)
+            else:
+                self.backend.set(key, value, self.ttl_seconds, tags)
+        except Exception:
+            logger.warning("Cache write of %s failed", key, exc_info=True)
+
+    def _may_store(self, tags: FrozenSet[str], ticket: int) -> bool:
+        """False if one of the tags was invalidated since `ticket` (or within the fill guard)"""
+        horizon = time.monotonic() - self.fill_guard_seconds
+        with self._lock:
+            if self._recent:
+                oldest_sequence, oldest_at, _ = self._recent[0]
+                if len(self._recent) == self._recent.maxlen and (oldest_sequence > ticket + 1 or oldest_at > horizon):
+                    # Invalidations that could matter were already forgotten
+                    return False
+            for sequence, invalidated_at, invalidated in reversed(self._recent):
+                if sequence <= ticket and invalidated_at <= horizon:
+                    break
+                if invalidated is None or not invalidated.isdisjoint(tags):
+                    return False
+        return True
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop the cached values carrying any of the tags in every worker. Call after the commit"""
+        if not tags:
+            return
+        pending = _deferred_tags.get()
+        if pending is not None:
+            pending.extend(tags)
+            return
+        self.receive(tags)
+        if self.publisher is not None:
+            self.publisher(tags)
+
+    @contextlib.contextmanager
+    def deferred(self):
+        """
+        Hold back the invalidations made inside the block until it exits
+
+        For service calls whose commit is not the final one (they run inside
+        an outer transaction): the block must end after that commit. If it
+        raises, nothing was committed and the invalidations are dropped.
+        """
+        tags: List[str] = []
+        token = _deferred_tags.set(tags)
+        try:
+            yield
+        finally:
+            _deferred_tags.reset(token)
+        self.invalidate(*dict.fromkeys(tags))
+
+    def clear(self) -> None:
+        """Drop every cached value, here and in the other workers"""
+        self.receive(None)
+        if self.publisher is not None:
+            self.publisher(None)
+
+    def subscribe(self, listener: Callable[[Optional[FrozenSet[str]]], None]) -> None:
+        """Call `listener(tags)` (None: everything) on each invalidation this worker applies"""
+        self._listeners.append(listener)
+
+    def receive(self, tags: Optional[Iterable[str]], remote: bool = False) -> None:
+        """
+        Apply an invalidation (None: drop everything) in this worker only
+
+        `remote` invalidations were published by another worker, which
+        already applied them to a shared backend.
+        """
+        tags = frozenset(tags) if tags is not None else None
+        with self._lock:
+            self._sequence += 1
+            self._recent.append((self._sequence, time.monotonic(), tags))
+        for listener in self._listeners:
+            try:
+                listener(tags)
+            except Exception:
+                logger.exception("Cache invalidation listener %r failed", listener)
+        if remote and self.backend.shared:
+            return
+        try:
+            if tags is None:
+                self.backend.clear()
+            else:
+                cache_invalidations.inc(amount=len(tags))
+                self.backend.invalidate(tags)
+        except Exception:
+            logger.exception("Cache invalidation of %s failed", ", ".join(sorted(tags or ["everything"])))
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend, entries and hit ratio per cached function"""
+        namespaces: Dict[str, Dict[str, Any]] = {}
+        for (namespace, result), count in sorted(cache_requests.values().items()):
+            entry = namespaces.setdefault(namespace, {"hits": 0, "misses": 0})
+            entry["hits" if result == "hit" else "misses"] = int(count)
+        for entry in namespaces.values():
+            total = entry["hits"] + entry["misses"]
+            entry["hit_ratio"] = round(entry["hits"] / total, 3) if total else None
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "entries": self.backend.size(),
+            "max_entries": getattr(self.backend, "max_entries", None),
+            "ttl_seconds": self.ttl_seconds,
+            "functions": namespaces,
+        }
+
+
+def _backend_from_settings() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(settings.CACHE_REDIS_URL)
+    return MemoryBackend(settings.CACHE_MAX_ENTRIES)
+
+
+cache = Cache(
+    _backend_from_settings(),
+    settings.CACHE_TTL_SECONDS,
+    enabled=settings.CACHE_ENABLED,
+    fill_guard_seconds=settings.READ_YOUR_WRITES_SECONDS if settings.replica_urls else 0
+)
+
+
+def _cache_entries():
+    size = cache.backend.size()
+    return {(cache.backend.name,): size} if size is not None else {}
+
+
+registry.register(Gauge(
+    "hotel_cache_entries", "Entries in the service cache, by backend", _cache_entries, ("backend",)
+))
@@ -0,0 +1,62 @@
+"""
+Cache Keys
+Invalidation tags of the cached service reads. Cached entries carry the
+tags of every row they show; mutations invalidate the tags of the rows they
+change, so only the entries that could be stale are dropped.
+"""
+from typing import Iterable, List
+
+# Every room list (all rooms, by status, the room catalog) and availability
+# search result
+ROOMS = "rooms"
+AVAILABILITY = "availability"
+# Guest lists
+GUESTS = "guests"
+
+
+def room(room_id: int) -> str:
+    """A room's details, and every cached value embedding them"""
+    return f"room:{room_id}"
+
+
+def room_availability(room_id: int) -> str:
+    """Availability answers for one room"""
+    return f"availability:room:{room_id}"
+
+
+def guest(guest_id: int) -> str:
+    """A guest's details, and every cached value embedding them"""
+    return f"guest:{guest_id}"
+
+
+def guest_reservations(guest_id: int) -> str:
+    """A guest's reservation list"""
+    return f"guest:{guest_id}:reservations"
+
+
+def reservation(reservation_id: int) -> str:
+    """A reservation, alone or in a list"""
+    return f"reservation:{reservation_id}"
+
+
+def group(group_id: int) -> str:
+    """The reservation list of a group booking"""
+    return f"group:{group_id}"
+
+
+def room_changed(room_id: int) -> List[str]:
+    """Tags to invalidate when a room (or its images or status) changes"""
+    return [room(room_id), room_availability(room_id), ROOMS, AVAILABILITY]
+
+
+def bookings_changed(
+    room_ids: Iterable[int] = (),
+    guest_ids: Iterable[int] = (),
+    reservation_ids: Iterable[int] = ()
+) -> List[str]:
+    """Tags to invalidate when reservations or holds are created or change status"""
+    tags = [AVAILABILITY]
+    tags += [room_availability(room_id) for room_id in set(room_ids)]
+    tags += [guest_reservations(guest_id) for guest_id in set(guest_ids)]
+    tags += [reservation(reservation_id) for reservation_id in set(reservation_ids)]
+    return tags
@@ -0,0 +1,175 @@
+"""
+Cache Invalidation Bus
+Cache invalidations shared between workers (uvicorn --workers, several
+instances) through PostgreSQL NOTIFY, with one LISTEN thread per worker.
+"""
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.cache.cache import Cache, cache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "hotel_cache_invalidation"
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD_BYTES = 7000
+
+
+class InvalidationBus:
+    """
+    Publishes this worker's cache invalidations and applies the others'
+
+    Publishing runs `pg_notify` on a pool connection right after the
+    mutation's own commit and invalidation, so by the time the response is
+    sent every listening worker has been notified. Each worker listens on a
+    dedicated connection (outside the pool) in a daemon thread that wakes
+    up as soon as a notification arrives.
+
+    Notifications sent while a listener is disconnected are lost, so after
+    (re)connecting it clears its worker's cache.
+    """
+
+    # How often the listener checks for shutdown while idle
+    POLL_SECONDS = 1.0
+    MAX_RECONNECT_SECONDS = 30
+    # How long start() waits for the first connection, so the worker isn't
+    # reported ready before it receives invalidations
+    START_TIMEOUT_SECONDS = 2.0
+
+    def __init__(self, cache: Cache):
+        self.cache = cache
+        # Identifies our own notifications, which we also receive. Set on
+        # start() so workers forked after import each get their own
+        self.origin = ""
+        self._engine: Optional[Engine] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._listening = threading.Event()
+        self.connected = False
+        self.published = 0
+        self.received = 0
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self, engine: Engine) -> None:
+        """Start listening and publish this worker's invalidations through `engine`"""
+        if self._running:
+            return
+        self._engine = engine
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="cache-listener", daemon=True)
+        self._thread.start()
+        self.cache.publisher = self.publish
+        if not self._listening.wait(self.START_TIMEOUT_SECONDS):
+            logger.warning("Cache invalidation listener not connected yet")
+
+    def stop(self) -> None:
+        self.cache.publisher = None
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=self.POLL_SECONDS + 5)
+            self._thread = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "connected": self.connected,
+            "published": self.published,
+            "received": self.received,
+        }
+
+    def publish(self, tags: Optional[Iterable[str]]) -> None:
+        """Notify the other workers. None asks them to clear their cache"""
+        payloads = self._payloads(tags)
+        try:
+            with self._engine.connect() as connection:
+                for payload in payloads:
+                    connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+                connection.commit()
+            self.published += len(payloads)
+        except Exception:
+            # The other workers keep stale entries until CACHE_TTL_SECONDS
+            logger.exception("Could not publish cache invalidation of %s", ", ".join(tags or ["everything"]))
+
+    def _payloads(self, tags: Optional[Iterable[str]]) -> List[str]:
+        if tags is None:
+            return [json.dumps({"origin": self.origin, "clear": True})]
+        payloads: List[str] = []
+        chunk: List[str] = []
+        size = 0
+        for tag in tags:
+            if chunk and size + len(tag) + 4 > MAX_PAYLOAD_BYTES - 100:
+                payloads.append(json.dumps({"origin": self.origin, "tags": chunk}))
+                chunk, size = [], 0
+            chunk.append(tag)
+            size += len(tag) + 4
+        if chunk:
+            payloads.append(json.dumps({"origin": self.origin, "tags": chunk}))
+        return payloads
+
+    def _run(self) -> None:
+        delay = 1
+        while self._running:
+            try:
+                self._listen()
+            except Exception as e:
+                reason = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+                logger.warning("Cache invalidation listener disconnected (%s), reconnecting in %d s", reason, delay)
+                time.sleep(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_SECONDS)
+            else:
+                delay = 1
+            finally:
+                self.connected = False
+
+    def _listen(self) -> None:
+        # Same connection arguments as the engine, but not from its pool: the
+        # connection stays open for the life of the worker
+        dialect = self._engine.dialect
+        args, kwargs = dialect.create_connect_args(self._engine.url)
+        connection = dialect.connect(*args, **kwargs)
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            self.cache.receive(None, remote=True)
+            self.connected = True
+            self._listening.set()
+            logger.info("Listening for cache invalidations from other workers")
+
+            while self._running:
+                readable, _, _ = select.select([connection], [], [], self.POLL_SECONDS)
+                if not readable:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    self._apply(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def _apply(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed cache invalidation: %.200s", payload)
+            return
+        if message.get("origin") == self.origin:
+            return
+        self.received += 1
+        self.cache.receive(None if message.get("clear") else message.get("tags", []), remote=True)
+
+
+invalidation_bus = InvalidationBus(cache)
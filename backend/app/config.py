@@ -1,12 +1,60 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Literal, Optional
 
 class Settings(BaseSettings):
     # App
     APP_NAME: str = "Hotel Reception System"
     DEBUG: bool = True
     ENVIRONMENT: str = "development"
-    
+    # Logging: JSON lines (or plain text) on stdout, or LOG_FILE if set, and
+    # one access log line per request
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    LOG_FILE: str = ""
+    ACCESS_LOG: bool = True
+    # Log the stack of code that blocks the event loop longer than the
+    # threshold. None means enabled when DEBUG is on
+    LOOP_BLOCK_DETECTOR: Optional[bool] = None
+    LOOP_BLOCK_THRESHOLD_MS: int = 100
+    # Per-request SQL stats: log requests where one statement repeats this
+    # many times (N+1) or that run more statements than SQL_STATEMENTS_WARN
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    SQL_STATEMENTS_WARN: int = 50
+    # Runtime metrics (admin /metrics/runtime): sampling, window and the p95
+    # values above which an alert is reported and logged
+    METRICS_SAMPLE_INTERVAL_MS: int = 100
+    METRICS_WINDOW_SECONDS: int = 60
+    METRICS_ALERT_LOOP_LAG_MS: float = 50
+    METRICS_ALERT_THREADPOOL_QUEUED: float = 5
+    METRICS_ALERT_POOL_WAIT_MS: float = 100
+    # Admin request profiling (X-Profile header or ?profile= flag): sampling
+    # interval, time limit, and where "store" mode saves the profiles
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5
+    PROFILE_MAX_SECONDS: int = 60
+    PROFILE_DIR: str = "profiles"
+    PROFILE_KEEP: int = 50
+    # Readiness (/health/ready): results are cached this long, and the worker
+    # reports 503 when a check exceeds its limit
+    HEALTH_CACHE_SECONDS: float = 2
+    HEALTH_DB_TIMEOUT_MS: int = 1000
+    HEALTH_MAX_DB_RTT_MS: float = 250
+    HEALTH_MIN_FREE_CONNECTIONS: int = 1
+    HEALTH_SCHEDULER_STALE_SECONDS: int = 90
+    HEALTH_MAX_EMAIL_BACKLOG: int = 200
+    # Service-layer cache of rooms, guests, reservations and availability.
+    # Entries are invalidated by the mutations; the TTL only bounds how long
+    # a change made outside the app (psql, scripts) can go unnoticed.
+    # "redis" shares one cache between workers (needs the redis package)
+    CACHE_ENABLED: bool = True
+    CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_TTL_SECONDS: int = 300
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    # Send invalidations to the other workers with PostgreSQL NOTIFY and
+    # apply theirs (one LISTEN connection per worker). Needed by the memory
+    # backend and the room catalog, which live in each worker
+    CACHE_INVALIDATION_NOTIFY: bool = True
+
     # Database
     DATABASE_URL: str
     DB_HOST: str = "localhost"
@@ -14,6 +62,30 @@ class Settings(BaseSettings):
     DB_USER: str
     DB_PASSWORD: str
     DB_NAME: str
+    # Connection pools (primary, async and replicas each get one)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    # Replace connections older than this (seconds, -1 = never): avoids
+    # reusing connections the server or a proxy already closed
+    DB_POOL_RECYCLE: int = 1800
+    # "always" pings on every checkout, "idle" only connections unused for
+    # DB_POOL_PING_IDLE_SECONDS, "never" relies on DB_POOL_RECYCLE
+    DB_POOL_PRE_PING: Literal["always", "idle", "never"] = "idle"
+    DB_POOL_PING_IDLE_SECONDS: int = 30
+    # Connections opened per pool at startup, before the first request
+    DB_POOL_WARMUP: int = 5
+    # Compare the database Alembic revision with the code at startup (no DDL)
+    SCHEMA_VERSION_CHECK: bool = True
+    # Async engine (asyncpg) for the read endpoints served on the event loop.
+    # Empty means DATABASE_URL with the asyncpg driver
+    ASYNC_DATABASE_URL: str = ""
+    # Read replicas, comma-separated. Read-only endpoints and reports are
+    # spread across them; empty means everything uses DATABASE_URL
+    DATABASE_REPLICA_URLS: str = ""
+    # After a successful write, the same client reads from the primary for
+    # this long (replication lag budget)
+    READ_YOUR_WRITES_SECONDS: int = 5
     
     # Security
     SECRET_KEY: str
@@ -40,11 +112,17 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = ""
     SMTP_FROM: str = "noreply@hotelrecepcion.com"
     
+    # Idempotency-Key support (POST /reservations, POST /checkin)
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    
     # PayPal Configuration
     PAYPAL_MODE: str = "sandbox"
     PAYPAL_CLIENT_ID: str = ""
     PAYPAL_CLIENT_SECRET: str = ""
     
+    # Room holds (room reserved while the guest completes the PayPal checkout)
+    ROOM_HOLD_MINUTES: int = 15
+    
     # Server
     PORT: int = 10000
     
@@ -52,6 +130,16 @@ class Settings(BaseSettings):
     def cors_origins(self) -> List[str]:
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
     
+    @property
+    def replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    
+    @property
+    def loop_block_detector_enabled(self) -> bool:
+        if self.LOOP_BLOCK_DETECTOR is None:
+            return self.DEBUG
+        return self.LOOP_BLOCK_DETECTOR
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -5,6 +5,10 @@ from .checkin_controller import router as checkin_router
 from .report_controller import router as report_router
 from .auth_controller import router as auth_router
 from .guest_auth_controller import router as guest_auth_router
+from .hold_controller import router as hold_router
+from .metrics_controller import router as metrics_router
+from .diagnostics_controller import router as diagnostics_router
+from .health_controller import router as health_router
 
 __all__ = [
     "room_router",
@@ -13,5 +17,9 @@ __all__ = [
     "checkin_router",
     "report_router",
     "auth_router",
-    "guest_auth_router"
+    "guest_auth_router",
+    "hold_router",
+    "metrics_router",
+    "diagnostics_router",
+    "health_router"
 ]
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import timedelta
 
-from app.database import get_db
+from app.database import get_async_db, get_db
+from app.diagnostics.structured_log import set_principal
 from app.schemas import AdminCreate, AdminLogin, Admin, Token
-from app.services import AuthService
+from app.services import AsyncAuthService, AuthService
 from app.config import settings
 from app.middleware.admin_middleware import verify_admin_token
 
@@ -24,9 +26,9 @@ def register_admin(admin: AdminCreate, db: Session = Depends(get_db)):
     return AuthService.create_admin(db, admin)
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Login administrator"""
-    admin = AuthService.authenticate_admin(db, form_data.username, form_data.password)
+    admin = await AsyncAuthService.authenticate_admin(db, form_data.username, form_data.password)
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,7 +43,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     
     return {"access_token": access_token, "token_type": "bearer"}
 
-async def get_current_admin(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_admin(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     """Get current authenticated administrator"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,10 +55,11 @@ async def get_current_admin(token: str = Depends(oauth2_scheme), db: Session = D
     if username is None:
         raise credentials_exception
     
-    admin = AuthService.get_admin_by_username(db, username)
+    admin = await AsyncAuthService.get_admin_by_username(db, username)
     if admin is None:
         raise credentials_exception
     
+    set_principal(f"admin:{admin.username}")
     return admin
 
 @router.get("/me", response_model=Admin)
@@ -1,18 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Header
 from sqlalchemy.orm import Session
+from typing import Optional
 
 from app.database import get_db
-from app.schemas import CheckInRequest, CheckOutRequest, Reservation, MessageResponse
-from app.services import ReservationService
+from app.schemas import (
+    CheckInRequest, CheckOutRequest, Reservation, MessageResponse,
+    BulkReservationRequest, BulkOperationResult
+)
+from app.services import ReservationService, IdempotencyService, IdempotencyConflictError
 from app.services.email_service import EmailService
 
 router = APIRouter(prefix="/checkin", tags=["Check-in/Check-out"])
 
+def checkin_email_data(reservation) -> dict:
+    """Build the welcome email data for a checked-in reservation"""
+    return {
+        'reservation_id': reservation.id,
+        'guest_name': f"{reservation.guest.first_name} {reservation.guest.last_name}",
+        'room_number': reservation.room.room_number,
+        'room_type': reservation.room.type,
+        'check_in_date': reservation.check_in_date.strftime('%d/%m/%Y'),
+        'check_out_date': reservation.check_out_date.strftime('%d/%m/%Y'),
+        'actual_check_in': reservation.actual_check_in,
+        'guests_count': reservation.guests_count
+    }
+
+def checkout_email_data(reservation) -> dict:
+    """Build the thank-you email data for a checked-out reservation"""
+    # Calculate nights stayed
+    nights = (reservation.check_out_date - reservation.check_in_date).days
+    
+    return {
+        'reservation_id': reservation.id,
+        'guest_name': f"{reservation.guest.first_name} {reservation.guest.last_name}",
+        'room_number': reservation.room.room_number,
+        'actual_check_out': reservation.actual_check_out,
+        'nights': nights
+    }
+
 @router.post("/", response_model=Reservation, status_code=status.HTTP_201_CREATED)
-async def check_in(
+def check_in(
     check_in_request: CheckInRequest, 
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
 ):
     """
     Process check-in (Create new reservation with immediate check-in)
@@ -21,34 +52,43 @@ async def check_in(
     - Creates reservation
     - Updates room status to OCCUPIED
     - Sends welcome email to guest
+    
+    Retries sent with the same Idempotency-Key header return the original
+    reservation without checking in (or emailing) the guest again.
     """
-    try:
-        reservation = ReservationService.check_in(db, check_in_request)
+    def process_check_in(session: Session = db):
+        reservation = ReservationService.check_in(session, check_in_request)
         
         # Send check-in email in background
-        reservation_data = {
-            'reservation_id': reservation.id,
-            'guest_name': f"{reservation.guest.first_name} {reservation.guest.last_name}",
-            'room_number': reservation.room.room_number,
-            'room_type': reservation.room.type,
-            'check_in_date': reservation.check_in_date.strftime('%d/%m/%Y'),
-            'check_out_date': reservation.check_out_date.strftime('%d/%m/%Y'),
-            'actual_check_in': reservation.actual_check_in,
-            'guests_count': reservation.guests_count
-        }
+        reservation_data = checkin_email_data(reservation)
         
-        background_tasks.add_task(
+        EmailService.queue(
+            background_tasks,
             EmailService.send_checkin_email,
-            reservation.guest.email,
-            reservation_data
+            [(reservation.guest.email, reservation_data)]
         )
         
         return reservation
+    
+    try:
+        if idempotency_key:
+            return IdempotencyService.execute(
+                db,
+                "checkin.create",
+                idempotency_key,
+                check_in_request,
+                process_check_in,
+                Reservation,
+                status.HTTP_201_CREATED
+            )
+        return process_check_in()
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/mark/{reservation_id}", response_model=Reservation)
-async def mark_reservation_checkin(
+def mark_reservation_checkin(
     reservation_id: int,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
@@ -64,21 +104,12 @@ async def mark_reservation_checkin(
         reservation = ReservationService.mark_checkin(db, reservation_id)
         
         # Send check-in email in background
-        reservation_data = {
-            'reservation_id': reservation.id,
-            'guest_name': f"{reservation.guest.first_name} {reservation.guest.last_name}",
-            'room_number': reservation.room.room_number,
-            'room_type': reservation.room.type,
-            'check_in_date': reservation.check_in_date.strftime('%d/%m/%Y'),
-            'check_out_date': reservation.check_out_date.strftime('%d/%m/%Y'),
-            'actual_check_in': reservation.actual_check_in,
-            'guests_count': reservation.guests_count
-        }
+        reservation_data = checkin_email_data(reservation)
         
-        background_tasks.add_task(
+        EmailService.queue(
+            background_tasks,
             EmailService.send_checkin_email,
-            reservation.guest.email,
-            reservation_data
+            [(reservation.guest.email, reservation_data)]
         )
         
         return reservation
@@ -86,7 +117,7 @@ async def mark_reservation_checkin(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/checkout", response_model=Reservation)
-async def check_out(
+def check_out(
     checkout_request: CheckOutRequest, 
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
@@ -101,28 +132,77 @@ async def check_out(
     try:
         reservation = ReservationService.check_out(db, checkout_request.reservation_id)
         
-        # Calculate nights stayed
-        nights = (reservation.check_out_date - reservation.check_in_date).days
-        
         # Send check-out email in background
-        reservation_data = {
-            'reservation_id': reservation.id,
-            'guest_name': f"{reservation.guest.first_name} {reservation.guest.last_name}",
-            'room_number': reservation.room.room_number,
-            'actual_check_out': reservation.actual_check_out,
-            'nights': nights
-        }
+        reservation_data = checkout_email_data(reservation)
         
-        background_tasks.add_task(
+        EmailService.queue(
+            background_tasks,
             EmailService.send_checkout_email,
-            reservation.guest.email,
-            reservation_data
+            [(reservation.guest.email, reservation_data)]
         )
         
         return reservation
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/bulk", response_model=BulkOperationResult)
+def bulk_check_in(
+    bulk_request: BulkReservationRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Check in a list of reservations or a whole group booking (tour buses)
+    - Updates all reservations and rooms in one transaction
+    - Skips reservations that are not Pending or not due yet
+    - Sends all welcome emails from a single background task
+    """
+    reservations, skipped = ReservationService.bulk_check_in(
+        db, bulk_request.reservation_ids, bulk_request.group_id
+    )
+    
+    if reservations:
+        EmailService.queue(
+            background_tasks,
+            EmailService.send_checkin_email,
+            [(reservation.guest.email, checkin_email_data(reservation)) for reservation in reservations]
+        )
+    
+    return BulkOperationResult(
+        processed=[reservation.id for reservation in reservations],
+        skipped=skipped,
+        message=f"{len(reservations)} reservations checked in, {len(skipped)} skipped"
+    )
+
+@router.post("/checkout/bulk", response_model=BulkOperationResult)
+def bulk_check_out(
+    bulk_request: BulkReservationRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Check out a list of reservations or a whole group booking
+    - Updates all reservations and rooms in one transaction
+    - Skips reservations that are not Active
+    - Sends all thank-you emails from a single background task
+    """
+    reservations, skipped = ReservationService.bulk_check_out(
+        db, bulk_request.reservation_ids, bulk_request.group_id
+    )
+    
+    if reservations:
+        EmailService.queue(
+            background_tasks,
+            EmailService.send_checkout_email,
+            [(reservation.guest.email, checkout_email_data(reservation)) for reservation in reservations]
+        )
+    
+    return BulkOperationResult(
+        processed=[reservation.id for reservation in reservations],
+        skipped=skipped,
+        message=f"{len(reservations)} reservations checked out, {len(skipped)} skipped"
+    )
+
 @router.get("/verify/{room_id}")
 def verify_availability(
     room_id: int,
@@ -0,0 +1,112 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.cache import cache, invalidation_bus
+from app.config import settings
+from app.diagnostics.memory import GroupBy, memory_diagnostics
+from app.diagnostics.profiler import profile_store
+from app.middleware.admin_middleware import verify_admin_token_async
+from app.services import room_catalog
+
+router = APIRouter(
+    prefix=f"{settings.ADMIN_ROUTE_PREFIX}/diagnostics",
+    tags=["Admin Diagnostics"],
+    dependencies=[Depends(verify_admin_token_async)]
+)
+
+@router.get("/profiles")
+def list_profiles():
+    """
+    Request profiles saved with `X-Profile: store`, newest first
+    Profiles are folded stacks: open them with speedscope or flamegraph.pl
+    """
+    return profile_store.list()
+
+@router.get("/profiles/{name}")
+def download_profile(name: str):
+    """Download a saved request profile"""
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+@router.post("/memory/start")
+def start_memory_tracing(frames: int = Query(10, ge=1, le=100)):
+    """
+    Start tracemalloc, keeping `frames` frames per allocation traceback
+    Allocations get slower while tracing: stop it when done
+    """
+    memory_diagnostics.start(frames)
+    return memory_diagnostics.status()
+
+@router.post("/memory/stop")
+def stop_memory_tracing():
+    """Stop tracemalloc and free its traces (snapshots are kept)"""
+    memory_diagnostics.stop()
+    return memory_diagnostics.status()
+
+@router.get("/memory")
+def get_memory_status(
+    limit: int = Query(20, ge=1, le=200),
+    group_by: GroupBy = "lineno"
+):
+    """
+    Tracing status, traced and RSS memory, and the top allocation sites
+    - group_by: lineno (source line), filename or traceback (full call path)
+    """
+    status = memory_diagnostics.status()
+    status["top"] = memory_diagnostics.top(limit, group_by) if memory_diagnostics.tracing else []
+    return status
+
+@router.post("/memory/snapshots")
+def take_memory_snapshot():
+    """Keep a snapshot of the traced memory to diff it with a later one"""
+    try:
+        return memory_diagnostics.take_snapshot()
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/memory/snapshots/{old_id}/diff/{new_id}")
+def diff_memory_snapshots(
+    old_id: int,
+    new_id: int,
+    limit: int = Query(20, ge=1, le=200),
+    group_by: GroupBy = "lineno"
+):
+    """Allocation sites that grew (or shrank) the most between two snapshots"""
+    try:
+        return memory_diagnostics.diff(old_id, new_id, limit, group_by)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/memory/endpoints")
+def get_endpoint_memory():
+    """
+    Peak traced memory and RSS high-water growth per route since tracing
+    started, highest peak first
+    """
+    return memory_diagnostics.endpoints()
+
+@router.get("/cache")
+def get_cache_stats():
+    """
+    Service cache backend, entries and hits/misses per cached function
+    A low hit_ratio means the function's results are invalidated (or its
+    arguments vary) faster than they are reused
+    - invalidation_bus: NOTIFY messages published to and received from other workers
+    - room_catalog: version and age of the room snapshot (hits under rooms.catalog)
+    """
+    return _cache_status()
+
+@router.delete("/cache")
+def clear_cache():
+    """Drop every cached value in every worker (e.g. after editing rows directly in the database)"""
+    cache.clear()
+    return _cache_status()
+
+def _cache_status() -> dict:
+    return {
+        **cache.stats(),
+        "invalidation_bus": invalidation_bus.status(),
+        "room_catalog": room_catalog.status()
+    }
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import timedelta
 
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.schemas import GuestCreate, GuestLogin, Token, GuestResponse
-from app.services import GuestAuthService
+from app.services import AsyncGuestAuthService, GuestAuthService
 from app.config import settings
 
 router = APIRouter(prefix="/auth/guest", tags=["Guest Authentication"])
@@ -53,11 +54,11 @@ def register_guest(guest_data: GuestCreate, db: Session = Depends(get_db)):
     }
 
 @router.post("/login", response_model=Token)
-def login_guest(credentials: GuestLogin, db: Session = Depends(get_db)):
+async def login_guest(credentials: GuestLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login guest and return JWT token
     """
-    guest = GuestAuthService.authenticate_guest(db, credentials.email, credentials.password)
+    guest = await AsyncGuestAuthService.authenticate_guest(db, credentials.email, credentials.password)
     
     if not guest:
         raise HTTPException(
@@ -87,8 +88,8 @@ def login_guest(credentials: GuestLogin, db: Session = Depends(get_db)):
     }
 
 @router.get("/me", response_model=GuestResponse)
-def get_current_guest(
-    current_guest = Depends(GuestAuthService.get_current_guest)
+async def get_current_guest(
+    current_guest = Depends(AsyncGuestAuthService.get_current_guest)
 ):
     """
     Get current authenticated guest
@@ -1,37 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.database import get_db
+from app.database import get_async_db, get_db
+from app.middleware.conditional import check_etag, entity_tag
+from app.models import Guest as GuestModel
 from app.schemas import Guest, GuestCreate, GuestUpdate, MessageResponse, Reservation
-from app.services import GuestService
+from app.services import AsyncGuestService, AsyncReservationService, AsyncVersionService, GuestService
 
 router = APIRouter(prefix="/guests", tags=["Guests"])
 
 @router.get("/", response_model=List[Guest])
-def get_guests(
+async def get_guests(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all guests"""
-    guests = GuestService.get_all_guests(db, skip=skip, limit=limit)
+    check_etag(request, response, entity_tag(await AsyncVersionService.guests_page(db, skip, limit)))
+    guests = await AsyncGuestService.get_all_guests(db, skip=skip, limit=limit)
     return guests
 
 @router.get("/{guest_id}", response_model=Guest)
-def get_guest(guest_id: int, db: Session = Depends(get_db)):
+async def get_guest(guest_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get guest by ID"""
-    guest = GuestService.get_guest_by_id(db, guest_id)
+    guest = await AsyncGuestService.get_guest_by_id(db, guest_id)
     if not guest:
         raise HTTPException(status_code=404, detail="Guest not found")
+    check_etag(request, response, entity_tag(await AsyncVersionService.guests(db, GuestModel.id == guest_id)))
     return guest
 
 @router.get("/email/{email}", response_model=Guest)
-def get_guest_by_email(email: str, db: Session = Depends(get_db)):
+async def get_guest_by_email(email: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get guest by email"""
-    guest = GuestService.get_guest_by_email(db, email)
+    guest = await AsyncGuestService.get_guest_by_email(db, email)
     if not guest:
         raise HTTPException(status_code=404, detail="Guest not found")
+    check_etag(request, response, entity_tag(await AsyncVersionService.guests(db, GuestModel.email == email)))
     return guest
 
 @router.post("/", response_model=Guest, status_code=status.HTTP_201_CREATED)
@@ -66,29 +74,32 @@ def delete_guest(guest_id: int, db: Session = Depends(get_db)):
     return MessageResponse(message="Guest deleted successfully")
 
 @router.get("/search/{query}", response_model=List[Guest])
-def search_guests(query: str, db: Session = Depends(get_db)):
+async def search_guests(query: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Search guests by name, email or document"""
-    guests = GuestService.search_guests(db, query)
+    check_etag(request, response, entity_tag(
+        await AsyncVersionService.guests(db, GuestService._search_filter(query))
+    ))
+    guests = await AsyncGuestService.search_guests(db, query)
     return guests
 
 @router.get("/{guest_id}/history", response_model=List)
-def get_guest_history(guest_id: int, db: Session = Depends(get_db)):
+async def get_guest_history(guest_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get guest reservation history"""
-    guest = GuestService.get_guest_by_id(db, guest_id)
+    guest = await AsyncGuestService.get_guest_by_id(db, guest_id)
     if not guest:
         raise HTTPException(status_code=404, detail="Guest not found")
+    check_etag(request, response, entity_tag(await AsyncVersionService.guest_reservations(db, guest_id)))
     
-    from app.services import ReservationService
-    reservations = ReservationService.get_reservations_by_guest(db, guest_id)
+    reservations = await AsyncReservationService.get_reservations_by_guest(db, guest_id)
     return reservations
 
 @router.get("/{guest_id}/reservations", response_model=List[Reservation])
-def get_guest_reservations(guest_id: int, db: Session = Depends(get_db)):
+async def get_guest_reservations(guest_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get all reservations for a specific guest with full details (room, etc.)"""
-    guest = GuestService.get_guest_by_id(db, guest_id)
+    guest = await AsyncGuestService.get_guest_by_id(db, guest_id)
     if not guest:
         raise HTTPException(status_code=404, detail="Guest not found")
+    check_etag(request, response, entity_tag(await AsyncVersionService.guest_reservations(db, guest_id)))
     
-    from app.services import ReservationService
-    reservations = ReservationService.get_reservations_by_guest(db, guest_id)
+    reservations = await AsyncReservationService.get_reservations_by_guest(db, guest_id)
     return reservations
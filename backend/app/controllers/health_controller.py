@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.config import settings
+from app.services.health_service import readiness_probe
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+@router.get("")
+def health_check():
+    """Health check endpoint"""
+    return {
+        "status": "healthy",
+        "environment": settings.ENVIRONMENT
+    }
+
+@router.get("/live")
+async def liveness():
+    """
+    Liveness: the process and its event loop answer
+    Never touches the database, so a database outage doesn't restart workers
+    """
+    return {"status": "alive"}
+
+@router.get("/ready")
+async def readiness():
+    """
+    Readiness: whether the load balancer should route traffic to this worker
+    - 503 while warming up, shutting down or when a check fails (database
+      round trip, pool headroom, hold expiry thread, email backlog)
+    - Result cached for HEALTH_CACHE_SECONDS
+    """
+    ready, report = await readiness_probe.check()
+    return JSONResponse(report, status_code=200 if ready else 503)
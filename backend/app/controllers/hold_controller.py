@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas import RoomHold, RoomHoldCreate, RoomHoldConfirm, Reservation, MessageResponse
+from app.services import HoldService, GuestAuthService
+from app.models import Guest
+
+router = APIRouter(prefix="/holds", tags=["Room Holds"])
+
+@router.post("/", response_model=RoomHold, status_code=status.HTTP_201_CREATED)
+def create_hold(
+    hold: RoomHoldCreate,
+    db: Session = Depends(get_db),
+    current_guest: Guest = Depends(GuestAuthService.get_current_guest)
+):
+    """
+    Hold a room while the guest completes the PayPal payment
+    - Fails if the room is booked or held by another guest
+    - The hold expires after ROOM_HOLD_MINUTES
+    """
+    try:
+        return HoldService.create_hold(db, hold, current_guest.id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/{hold_token}", response_model=RoomHold)
+def get_hold(
+    hold_token: str,
+    db: Session = Depends(get_db),
+    current_guest: Guest = Depends(GuestAuthService.get_current_guest)
+):
+    """Get hold status and expiration time"""
+    hold = HoldService.get_hold_by_token(db, hold_token)
+    if not hold or hold.guest_id != current_guest.id:
+        raise HTTPException(status_code=404, detail="Hold not found")
+    return hold
+
+@router.delete("/{hold_token}", response_model=MessageResponse)
+def release_hold(
+    hold_token: str,
+    db: Session = Depends(get_db),
+    current_guest: Guest = Depends(GuestAuthService.get_current_guest)
+):
+    """Release a hold (payment cancelled by the guest)"""
+    if not HoldService.release_hold(db, hold_token, current_guest.id):
+        raise HTTPException(status_code=404, detail="Hold not found")
+    return MessageResponse(message="Hold released successfully")
+
+@router.post("/{hold_token}/confirm", response_model=Reservation, status_code=status.HTTP_201_CREATED)
+def confirm_hold(
+    hold_token: str,
+    confirm: RoomHoldConfirm,
+    db: Session = Depends(get_db),
+    current_guest: Guest = Depends(GuestAuthService.get_current_guest)
+):
+    """
+    Convert a hold into a reservation after payment
+    - The reservation is created and the hold consumed in one transaction
+    - Confirming the same hold again returns the same reservation
+    """
+    hold = HoldService.get_hold_by_token(db, hold_token)
+    if not hold or hold.guest_id != current_guest.id:
+        raise HTTPException(status_code=404, detail="Hold not found")
+    
+    try:
+        return HoldService.convert_hold(db, hold_token, current_guest.id, confirm)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
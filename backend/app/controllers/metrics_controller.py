@@ -0,0 +1,58 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+
+from app.config import settings
+from app.diagnostics import runtime_metrics
+from app.diagnostics.prometheus import CONTENT_TYPE, Gauge, registry
+from app.middleware.admin_middleware import verify_admin_token_async
+
+# Async all the way down (including the admin check) so the metrics stay
+# reachable when the worker threads are exhausted
+router = APIRouter(
+    prefix=f"{settings.ADMIN_ROUTE_PREFIX}/metrics",
+    tags=["Admin Metrics"],
+    dependencies=[Depends(verify_admin_token_async)]
+)
+
+@router.get("/runtime")
+async def get_runtime_metrics():
+    """
+    Event loop lag, thread pool and DB pool usage over the last window
+    - loop_lag_ms: how late the event loop runs scheduled callbacks
+    - threadpool: worker threads busy and requests queued for one (sync endpoints)
+    - db_pool: connections checked out/overflow and checkout wait times
+    - alerts: metrics whose p95 exceeds the METRICS_ALERT_* thresholds
+    """
+    return runtime_metrics.snapshot()
+
+def _runtime_gauges() -> List[Gauge]:
+    """Runtime metrics window (p95) and DB pool status as Prometheus gauges"""
+    snapshot = runtime_metrics.snapshot()
+    pools = snapshot["db_pool"]["pools"]
+    return [
+        Gauge("hotel_event_loop_lag_p95_ms", "Event loop lag p95 over the runtime metrics window",
+              lambda: {(): snapshot["loop_lag_ms"]["p95"]}),
+        Gauge("hotel_threadpool_busy_p95", "Worker threads busy, p95 over the window",
+              lambda: {(): snapshot["threadpool"]["busy"]["p95"]}),
+        Gauge("hotel_threadpool_queued_p95", "Requests waiting for a worker thread, p95 over the window",
+              lambda: {(): snapshot["threadpool"]["queued"]["p95"]}),
+        Gauge("hotel_db_pool_checkout_wait_p95_ms", "DB connection checkout wait p95 over the window",
+              lambda: {(): snapshot["db_pool"]["checkout_wait_ms"]["p95"]}),
+        Gauge("hotel_db_pool_checked_out", "DB connections checked out, by pool",
+              lambda: {(name,): pool.get("checked_out", 0) for name, pool in pools.items()}, ("pool",)),
+        Gauge("hotel_db_pool_overflow", "DB connections beyond pool_size, by pool",
+              lambda: {(name,): max(pool.get("overflow", 0), 0) for name, pool in pools.items()}, ("pool",)),
+    ]
+
+@router.get("/prometheus", response_class=Response)
+async def get_prometheus_metrics():
+    """
+    All metrics in the Prometheus text format, for scraping
+    - hotel_http_*: requests, latency histogram and in-flight per route template
+    - hotel_bookings/checkins/checkouts/cancellations/emails_total: business counters
+    - hotel_event_loop/threadpool/db_pool_*: runtime gauges
+    Counters are per worker process: aggregate them with sum() across workers.
+    """
+    return Response(registry.render(extra=_runtime_gauges()), media_type=CONTENT_TYPE)
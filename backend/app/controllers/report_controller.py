@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.database import get_read_db
+from app.middleware.conditional import check_etag, entity_tag, etag_headers
 from app.schemas import DashboardStats
-from app.services import ReportService
+from app.services import ReportService, VersionService
 from app.middleware.admin_middleware import verify_admin_token
 from app.config import settings
 
@@ -15,15 +16,17 @@ router = APIRouter(
 )
 
 @router.get("/dashboard", response_model=DashboardStats)
-def get_dashboard_statistics(db: Session = Depends(get_db)):
+def get_dashboard_statistics(request: Request, response: Response, db: Session = Depends(get_read_db)):
     """Get dashboard statistics"""
+    check_etag(request, response, entity_tag(VersionService.reports(db)))
     return ReportService.get_dashboard_stats(db)
 
 @router.get("/occupancy/pdf")
 def download_occupancy_pdf(
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     """Download occupancy report as PDF"""
     try:
@@ -35,13 +38,16 @@ def download_occupancy_pdf(
     if end <= start:
         raise HTTPException(status_code=400, detail="End date must be after start date")
     
+    etag = entity_tag(VersionService.reports(db))
+    check_etag(request, None, etag)
     pdf_buffer = ReportService.generate_occupancy_pdf(db, start, end)
     
     return Response(
         content=pdf_buffer.getvalue(),
         media_type="application/pdf",
         headers={
-            "Content-Disposition": f"attachment; filename=occupancy_report_{start_date}_to_{end_date}.pdf"
+            "Content-Disposition": f"attachment; filename=occupancy_report_{start_date}_to_{end_date}.pdf",
+            **etag_headers(etag)
         }
     )
 
@@ -49,7 +55,8 @@ def download_occupancy_pdf(
 def download_occupancy_excel(
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     """Download occupancy report as Excel"""
     try:
@@ -61,24 +68,29 @@ def download_occupancy_excel(
     if end <= start:
         raise HTTPException(status_code=400, detail="End date must be after start date")
     
+    etag = entity_tag(VersionService.reports(db))
+    check_etag(request, None, etag)
     excel_buffer = ReportService.generate_occupancy_excel(db, start, end)
     
     return Response(
         content=excel_buffer.getvalue(),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={
-            "Content-Disposition": f"attachment; filename=occupancy_report_{start_date}_to_{end_date}.xlsx"
+            "Content-Disposition": f"attachment; filename=occupancy_report_{start_date}_to_{end_date}.xlsx",
+            **etag_headers(etag)
         }
     )
 
 @router.get("/rooms-status")
-def get_room_status_report(db: Session = Depends(get_db)):
+def get_room_status_report(request: Request, response: Response, db: Session = Depends(get_read_db)):
     """Get current status of all rooms"""
+    check_etag(request, response, entity_tag(VersionService.rooms(db)))
     return ReportService.get_room_status_report(db)
 
 @router.get("/occupancy-rate")
-def get_occupancy_rate(db: Session = Depends(get_db)):
+def get_occupancy_rate(request: Request, response: Response, db: Session = Depends(get_read_db)):
     """Get current occupancy rate"""
+    check_etag(request, response, entity_tag(VersionService.reports(db)))
     stats = ReportService.get_dashboard_stats(db)
     return {
         "occupancy_rate": stats.occupancy_rate,
@@ -1,42 +1,120 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, Header, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime, date
 
-from app.database import get_db
+from app.database import get_async_db, get_db
+from app.middleware.conditional import check_etag, entity_tag
 from app.schemas import (
     Reservation, ReservationCreate, ReservationCreateAuthenticated, ReservationUpdate, 
-    CheckInRequest, CheckOutRequest, MessageResponse
+    CheckInRequest, CheckOutRequest, MessageResponse, GroupBookingCreate, ReservationGroup
+)
+from app.services import (
+    ReservationService, AsyncReservationService, AsyncHoldService, AsyncVersionService, VersionService,
+    IdempotencyService, IdempotencyConflictError
 )
-from app.services import ReservationService
 from app.services.email_service import EmailService
-from app.models import Reservation as ReservationModel
+from app.models import Reservation as ReservationModel, ReservationStatus
 
 router = APIRouter(prefix="/reservations", tags=["Reservations"])
 
 @router.get("/", response_model=List[Reservation])
-def get_reservations(
+async def get_reservations(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all reservations"""
-    reservations = ReservationService.get_all_reservations(db, skip=skip, limit=limit)
+    check_etag(request, response, entity_tag(await AsyncVersionService.reservations_page(db, skip, limit)))
+    reservations = await AsyncReservationService.get_all_reservations(db, skip=skip, limit=limit)
     return reservations
 
+@router.post("/groups", response_model=ReservationGroup, status_code=status.HTTP_201_CREATED)
+def create_group_booking(
+    group: GroupBookingCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
+):
+    """
+    Book a block of rooms (wedding, conference, tour) in one transaction
+    - All rooms must be available for the group dates, otherwise nothing is booked
+    - Returns the group ID used by the bulk check-in/check-out endpoints
+    """
+    try:
+        if idempotency_key:
+            return IdempotencyService.execute(
+                db,
+                "reservations.groups.create",
+                idempotency_key,
+                group,
+                lambda session: ReservationService.create_group_booking(session, group),
+                ReservationGroup,
+                status.HTTP_201_CREATED
+            )
+        return ReservationService.create_group_booking(db, group)
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/groups/{group_id}", response_model=ReservationGroup)
+def get_group_booking(group_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Get a group booking with its reservations"""
+    group = ReservationService.get_group_by_id(db, group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail="Reservation group not found")
+    check_etag(request, response, entity_tag(VersionService.group(db, group_id)))
+    return group
+
+@router.get("/groups/{group_id}/reservations", response_model=List[Reservation])
+async def get_group_reservations(group_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Get full details of all reservations in a group booking"""
+    check_etag(request, response, entity_tag(
+        await AsyncVersionService.reservations(db, ReservationModel.group_id == group_id)
+    ))
+    return await AsyncReservationService.get_reservations_by_group(db, group_id)
+
 @router.get("/{reservation_id}", response_model=Reservation)
-def get_reservation(reservation_id: int, db: Session = Depends(get_db)):
+async def get_reservation(reservation_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get reservation by ID"""
-    reservation = ReservationService.get_reservation_by_id(db, reservation_id)
+    reservation = await AsyncReservationService.get_reservation_by_id(db, reservation_id)
     if not reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
+    check_etag(request, response, entity_tag(
+        await AsyncVersionService.reservations(db, ReservationModel.id == reservation_id)
+    ))
     return reservation
 
 @router.post("/", response_model=Reservation, status_code=status.HTTP_201_CREATED)
-def create_reservation(reservation: ReservationCreateAuthenticated, db: Session = Depends(get_db)):
-    """Create new reservation for authenticated user"""
+def create_reservation(
+    reservation: ReservationCreateAuthenticated,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
+):
+    """
+    Create new reservation for authenticated user
+    
+    Send an Idempotency-Key header to make retries safe: a repeated request
+    with the same key returns the original reservation instead of a new one.
+    """
     try:
+        if idempotency_key:
+            return IdempotencyService.execute(
+                db,
+                "reservations.create",
+                idempotency_key,
+                reservation,
+                lambda session: ReservationService.create_reservation_authenticated(session, reservation),
+                Reservation,
+                status.HTTP_201_CREATED
+            )
         return ReservationService.create_reservation_authenticated(db, reservation)
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -53,7 +131,7 @@ def update_reservation(
     return reservation
 
 @router.delete("/{reservation_id}", response_model=MessageResponse)
-async def cancel_reservation(
+def cancel_reservation(
     reservation_id: int, 
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
@@ -80,10 +158,10 @@ async def cancel_reservation(
         }
         
         # Send cancellation email in background
-        background_tasks.add_task(
+        EmailService.queue(
+            background_tasks,
             EmailService.send_cancellation_email,
-            reservation.guest.email,
-            reservation_data
+            [(reservation.guest.email, reservation_data)]
         )
         
         return MessageResponse(message="Reservation cancelled successfully")
@@ -91,47 +169,58 @@ async def cancel_reservation(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/status/active", response_model=List[Reservation])
-def get_active_reservations(db: Session = Depends(get_db)):
+async def get_active_reservations(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get all active reservations"""
-    return ReservationService.get_active_reservations(db)
+    check_etag(request, response, entity_tag(
+        await AsyncVersionService.reservations(db, ReservationModel.status == ReservationStatus.ACTIVE)
+    ))
+    return await AsyncReservationService.get_active_reservations(db)
 
 @router.get("/status/pending", response_model=List[Reservation])
-def get_pending_reservations(db: Session = Depends(get_db)):
+async def get_pending_reservations(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get all pending reservations"""
-    return ReservationService.get_pending_reservations(db)
+    check_etag(request, response, entity_tag(
+        await AsyncVersionService.reservations(db, ReservationModel.status == ReservationStatus.PENDING)
+    ))
+    return await AsyncReservationService.get_pending_reservations(db)
 
 @router.get("/today/checkins", response_model=List[Reservation])
-def get_todays_checkins(db: Session = Depends(get_db)):
+async def get_todays_checkins(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get today's check-ins"""
-    return ReservationService.get_todays_checkins(db)
+    check_etag(request, response, entity_tag(await AsyncVersionService.todays_checkins(db)))
+    return await AsyncReservationService.get_todays_checkins(db)
 
 @router.get("/today/checkouts", response_model=List[Reservation])
-def get_todays_checkouts(db: Session = Depends(get_db)):
+async def get_todays_checkouts(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get today's check-outs"""
-    return ReservationService.get_todays_checkouts(db)
+    check_etag(request, response, entity_tag(await AsyncVersionService.todays_checkouts(db)))
+    return await AsyncReservationService.get_todays_checkouts(db)
 
 @router.get("/room/{room_id}", response_model=List[Reservation])
-def get_room_reservations(room_id: int, db: Session = Depends(get_db)):
+async def get_room_reservations(room_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get all reservations for a specific room"""
-    return ReservationService.get_reservations_by_room(db, room_id)
+    check_etag(request, response, entity_tag(
+        await AsyncVersionService.reservations(db, ReservationModel.room_id == room_id)
+    ))
+    return await AsyncReservationService.get_reservations_by_room(db, room_id)
 
 @router.get("/room/{room_id}/blocked-dates")
-def get_room_blocked_dates(room_id: int, db: Session = Depends(get_db)):
+async def get_room_blocked_dates(room_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get all blocked dates for a specific room (dates with active reservations + checkout day for cleaning)"""
     from app.models import Room
     from datetime import timedelta
     
     # Check if room exists
-    room = db.query(Room).filter(Room.id == room_id).first()
+    room = await db.get(Room, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Habitación no encontrada")
     
     # Get all active and pending reservations for this room
-    reservations = db.query(ReservationModel).filter(
+    reservations = (await db.scalars(select(ReservationModel).where(
         ReservationModel.room_id == room_id,
         ReservationModel.status.in_(["Active", "Pending"]),
         ReservationModel.check_out_date >= date.today()
-    ).all()
+    ))).all()
     
     # Build list of all blocked dates
     # Include check-in date through check-out date (inclusive) for cleaning buffer
@@ -152,17 +241,18 @@ def get_room_blocked_dates(room_id: int, db: Session = Depends(get_db)):
     }
 
 @router.get("/guest/{guest_id}", response_model=List[Reservation])
-def get_guest_reservations(guest_id: int, db: Session = Depends(get_db)):
+async def get_guest_reservations(guest_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get all reservations for a specific guest"""
-    return ReservationService.get_reservations_by_guest(db, guest_id)
+    check_etag(request, response, entity_tag(await AsyncVersionService.guest_reservations(db, guest_id)))
+    return await AsyncReservationService.get_reservations_by_guest(db, guest_id)
 
 @router.post("/check-availability")
-def check_room_availability(
+async def check_room_availability(
     room_id: int,
     check_in: date,
     check_out: date,
     guests_count: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Check if a room is available for the specified dates and capacity
@@ -184,7 +274,7 @@ def check_room_availability(
         
         # Get room from database
         from app.models import Room
-        room = db.query(Room).filter(Room.id == room_id).first()
+        room = await db.get(Room, room_id)
         
         if not room:
             raise HTTPException(status_code=404, detail="Habitación no encontrada")
@@ -203,13 +293,13 @@ def check_room_availability(
             }
         
         # Check for conflicting reservations
-        from app.models import Reservation as ReservationModel
-        conflicting_reservations = db.query(ReservationModel).filter(
+        from app.models import Reservation as ReservationModel, ReservationStatus
+        conflicting_reservations = (await db.scalars(select(ReservationModel).where(
             ReservationModel.room_id == room_id,
             ReservationModel.status.in_(["Pending", "Active"]),
             ReservationModel.check_in_date < check_out,
             ReservationModel.check_out_date > check_in
-        ).all()
+        ))).all()
         
         if conflicting_reservations:
             conflicts = [
@@ -227,6 +317,14 @@ def check_room_availability(
                 "conflicts": conflicts
             }
         
+        # Check for holds of guests currently in the payment step
+        if await AsyncHoldService.has_active_hold(db, room_id, check_in, check_out):
+            return {
+                "available": False,
+                "reason": "La habitación está retenida temporalmente por otro huésped que está completando su pago",
+                "room_id": room_id
+            }
+        
         # Room is available
         return {
             "available": True,
@@ -246,25 +344,20 @@ def check_room_availability(
 @router.post("/{reservation_id}/send-confirmation")
 async def send_reservation_confirmation(
     reservation_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Send confirmation email for a reservation
     """
     try:
-        # Get reservation with related data
-        from app.models import Reservation as ReservationModel, Guest, Room
-        
-        reservation = db.query(ReservationModel)\
-            .filter(ReservationModel.id == reservation_id)\
-            .first()
+        # Get reservation with guest and room
+        reservation = await AsyncReservationService.get_reservation_by_id(db, reservation_id)
         
         if not reservation:
             raise HTTPException(status_code=404, detail="Reserva no encontrada")
         
-        # Get guest and room info
-        guest = db.query(Guest).filter(Guest.id == reservation.guest_id).first()
-        room = db.query(Room).filter(Room.id == reservation.room_id).first()
+        guest = reservation.guest
+        room = reservation.room
         
         if not guest or not room:
             raise HTTPException(status_code=404, detail="Información de huésped o habitación no encontrada")
@@ -1,38 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db, get_db
+from app.middleware.conditional import check_etag, entity_tag, etag_headers
 from app.schemas import Room, RoomCreate, RoomUpdate, AvailabilityCheck, AvailabilityResponse, MessageResponse
-from app.services import RoomService
+from app.services import AsyncRoomService, AsyncVersionService, RoomService, room_catalog
 
 router = APIRouter(prefix="/rooms", tags=["Rooms"])
 
 @router.get("/", response_model=List[Room])
-def get_rooms(
+async def get_rooms(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all rooms"""
-    rooms = RoomService.get_all_rooms(db, skip=skip, limit=limit)
-    return rooms
+    """Get all rooms (pre-serialized from the room catalog)"""
+    if not room_catalog.enabled:
+        # Without the cache a snapshot would load every room per request
+        check_etag(request, response, entity_tag(await AsyncVersionService.rooms(db)))
+        return await AsyncRoomService.get_all_rooms(db, skip, limit)
+    catalog = await room_catalog.snapshot(db)
+    etag = entity_tag(catalog.digest)
+    check_etag(request, None, etag)
+    return Response(content=catalog.page(skip, limit), media_type="application/json", headers=etag_headers(etag))
 
 @router.get("/{room_id}", response_model=Room)
-def get_room(room_id: int, db: Session = Depends(get_db)):
-    """Get room by ID"""
-    room = RoomService.get_room_by_id(db, room_id)
-    if not room:
+async def get_room(
+    room_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get room by ID (pre-serialized from the room catalog)"""
+    if not room_catalog.enabled:
+        room = await AsyncRoomService.get_room_by_id(db, room_id)
+        if room is None:
+            raise HTTPException(status_code=404, detail="Room not found")
+        check_etag(request, response, entity_tag(await AsyncVersionService.rooms(db)))
+        return room
+    catalog = await room_catalog.snapshot(db)
+    room = catalog.room(room_id)
+    if room is None:
         raise HTTPException(status_code=404, detail="Room not found")
-    return room
+    etag = entity_tag(catalog.digest)
+    check_etag(request, None, etag)
+    return Response(content=room, media_type="application/json", headers=etag_headers(etag))
 
 @router.get("/number/{room_number}", response_model=Room)
-def get_room_by_number(room_number: str, db: Session = Depends(get_db)):
+async def get_room_by_number(
+    room_number: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get room by room number"""
-    room = RoomService.get_room_by_number(db, room_number)
+    room = await AsyncRoomService.get_room_by_number(db, room_number)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
+    check_etag(request, response, entity_tag(await AsyncVersionService.rooms(db)))
     return room
 
 @router.post("/", response_model=Room, status_code=status.HTTP_201_CREATED)
@@ -62,18 +92,18 @@ def delete_room(room_id: int, db: Session = Depends(get_db)):
     return MessageResponse(message="Room deleted successfully")
 
 @router.get("/available/search", response_model=List[Room])
-def search_available_rooms(
+async def search_available_rooms(
     check_in: datetime,
     check_out: datetime,
     room_type: Optional[str] = None,
     min_capacity: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Search available rooms for specific dates"""
     if check_out <= check_in:
         raise HTTPException(status_code=400, detail="Check-out date must be after check-in date")
     
-    rooms = RoomService.get_available_rooms(
+    rooms = await AsyncRoomService.get_available_rooms(
         db, 
         check_in, 
         check_out, 
@@ -83,12 +113,12 @@ def search_available_rooms(
     return rooms
 
 @router.post("/check-availability", response_model=AvailabilityResponse)
-def check_availability(availability: AvailabilityCheck, db: Session = Depends(get_db)):
+async def check_availability(availability: AvailabilityCheck, db: AsyncSession = Depends(get_async_db)):
     """Check if a specific room is available"""
     if availability.check_out_date <= availability.check_in_date:
         raise HTTPException(status_code=400, detail="Check-out date must be after check-in date")
     
-    is_available = RoomService.check_room_availability(
+    is_available = await AsyncRoomService.check_room_availability(
         db,
         availability.room_id,
         availability.check_in_date,
@@ -99,7 +129,7 @@ def check_availability(availability: AvailabilityCheck, db: Session = Depends(ge
     message = ""
     
     if is_available:
-        room = RoomService.get_room_by_id(db, availability.room_id)
+        room = await AsyncRoomService.get_room_by_id(db, availability.room_id)
         message = "Room is available for selected dates"
     else:
         message = "Room is not available for selected dates"
@@ -111,14 +141,20 @@ def check_availability(availability: AvailabilityCheck, db: Session = Depends(ge
     )
 
 @router.get("/status/{status}", response_model=List[Room])
-def get_rooms_by_status(status: str, db: Session = Depends(get_db)):
+async def get_rooms_by_status(
+    status: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get rooms by status (Available, Occupied, Maintenance)"""
     # Validate status value
     valid_statuses = ["Available", "Occupied", "Maintenance"]
     if status not in valid_statuses:
         raise HTTPException(status_code=400, detail=f"Invalid room status. Must be one of: {', '.join(valid_statuses)}")
     
-    rooms = RoomService.get_rooms_by_status(db, status)
+    check_etag(request, response, entity_tag(await AsyncVersionService.rooms(db)))
+    rooms = await AsyncRoomService.get_rooms_by_status(db, status)
     return rooms
 
 @router.patch("/{room_id}/status", response_model=Room)
@@ -1,19 +1,160 @@
-from sqlalchemy import create_engine
+import asyncio
+import logging
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import Select, create_engine, text
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.config import settings
+from app.diagnostics import PoolMonitor, runtime_metrics, track_statements
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout took
+    
+    Covers the wait for a free connection, opening an overflow connection
+    and the pre-ping: everything a request waits for before its first query.
+    """
+    
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            runtime_metrics.record_pool_wait((time.perf_counter() - started) * 1000)
+
+def pool_options() -> dict:
+    """create_engine pool arguments from Settings"""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING == "always",
+    }
+
+# One per engine, reported by the runtime metrics
+pool_monitors: List[PoolMonitor] = []
+
+def instrument_engine(name: str, engine: Engine) -> None:
+    """
+    Attach a PoolMonitor (event counters and the "idle" pre-ping) and the
+    per-request statement counters to an engine
+    """
+    monitor = PoolMonitor(name)
+    monitor.attach(engine, settings.DB_POOL_PRE_PING, settings.DB_POOL_PING_IDLE_SECONDS)
+    pool_monitors.append(monitor)
+    track_statements(engine)
 
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    poolclass=TimedQueuePool,
+    **pool_options()
 )
+instrument_engine("primary", engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def async_database_url(url: str) -> URL:
+    """DATABASE_URL with the asyncpg driver (sslmode is called ssl there)"""
+    async_url = make_url(url).set(drivername="postgresql+asyncpg")
+    if "sslmode" in async_url.query:
+        async_url = async_url.update_query_dict({"ssl": async_url.query["sslmode"]})
+        async_url = async_url.difference_update_query(["sslmode"])
+    return async_url
+
+# Async engine for the read endpoints that run on the event loop. It has its
+# own pool, so async traffic never waits for threadpool-bound sync sessions
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL),
+    **pool_options()
+)
+instrument_engine("primary-async", async_engine.sync_engine)
+
+# Read replicas (DATABASE_REPLICA_URLS), sync and async
+replica_engines = [
+    create_engine(url, **pool_options())
+    for url in settings.replica_urls
+]
+async_replica_engines = [
+    create_async_engine(async_database_url(url), **pool_options())
+    for url in settings.replica_urls
+]
+for i, replica in enumerate(replica_engines):
+    instrument_engine(f"replica{i}", replica)
+for i, replica in enumerate(async_replica_engines):
+    instrument_engine(f"replica{i}-async", replica.sync_engine)
+
+# Set for requests that must not read from a replica (read-your-writes)
+_read_from_primary: ContextVar[bool] = ContextVar("read_from_primary", default=False)
+
+def read_from_primary(enabled: bool = True):
+    """Route every session of the current request/context to the primary. Returns a reset token"""
+    return _read_from_primary.set(enabled)
+
+def reset_read_from_primary(token) -> None:
+    _read_from_primary.reset(token)
+
+class RoutingSession(Session):
+    """
+    Session that reads from a replica and writes to the primary
+    
+    Plain SELECTs go to one replica, picked once per session so a request
+    sees a single consistent snapshot. Flushes, DML, SELECT ... FOR UPDATE and
+    raw SQL go to the primary, and so does every statement after them: a
+    session that wrote reads its own writes. Without replicas, or inside
+    read_from_primary(), everything uses the primary.
+    """
+    
+    primary: Engine = engine
+    replicas: List[Engine] = replica_engines
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sticky_primary = False
+        self._replica: Optional[Engine] = None
+    
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if not self.replicas or _read_from_primary.get():
+            return self.primary
+        if self._flushing or not (isinstance(clause, Select) and clause._for_update_arg is None):
+            self._sticky_primary = True
+        if self._sticky_primary:
+            return self.primary
+        if self._replica is None:
+            self._replica = random.choice(self.replicas)
+        return self._replica
+
+class AsyncRoutingSession(RoutingSession):
+    """RoutingSession over the async engines (sync_session_class of AsyncSession)"""
+    
+    primary = async_engine.sync_engine
+    replicas = [async_replica.sync_engine for async_replica in async_replica_engines]
+
+# Sessions for read-only paths (reports); writes keep using SessionLocal
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+# expire_on_commit=False: attributes can't be lazy-loaded after the await
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    sync_session_class=AsyncRoutingSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -24,3 +165,86 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get a DB session for read-only endpoints (may use a replica)
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency to get an async DB session (reads may use a replica)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def warm_up_pools() -> None:
+    """
+    Open DB_POOL_WARMUP connections in each sync pool before traffic arrives
+    
+    A cold instance otherwise opens (TCP + TLS + auth) a connection inside
+    each of its first requests. Failures are logged, not raised.
+    """
+    for name, target in [("primary", engine)] + [(f"replica{i}", r) for i, r in enumerate(replica_engines)]:
+        connections = []
+        started = time.perf_counter()
+        try:
+            for _ in range(min(settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE)):
+                connections.append(target.connect())
+        except Exception as e:
+            logger.warning("Could not warm up the %s pool: %s", name, e)
+        finally:
+            for connection in connections:
+                connection.close()
+        logger.info("Warmed up %d %s connections in %.0f ms", len(connections), name, (time.perf_counter() - started) * 1000)
+
+async def warm_up_async_pools() -> None:
+    """warm_up_pools for the async engines; connections are opened concurrently"""
+    targets = [("primary-async", async_engine)] + [(f"replica{i}-async", r) for i, r in enumerate(async_replica_engines)]
+    for name, target in targets:
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *[target.connect() for _ in range(min(settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE))],
+            return_exceptions=True
+        )
+        connections = [result for result in results if not isinstance(result, BaseException)]
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning("Could not warm up the %s pool: %s", name, result)
+                break
+        for connection in connections:
+            await connection.close()
+        logger.info("Warmed up %d %s connections in %.0f ms", len(connections), name, (time.perf_counter() - started) * 1000)
+
+def check_schema_version() -> bool:
+    """
+    Compare the database revision with the latest Alembic migration
+    
+    Reads the head revision from the migration scripts and runs a single
+    SELECT on alembic_version. Never creates or alters tables: apply
+    migrations with `alembic upgrade head`.
+    
+    Returns:
+        True if the database is at the head revision
+    """
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+    
+    heads = set(ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_heads())
+    
+    try:
+        with engine.connect() as connection:
+            current = set(connection.execute(text("SELECT version_num FROM alembic_version")).scalars())
+    except Exception as e:
+        logger.warning("Could not read database schema version: %s. Run `alembic upgrade head`.", e)
+        return False
+    
+    if current != heads:
+        logger.warning(
+            "Database schema is at revision %s but the code expects %s. Run `alembic upgrade head`.",
+            ", ".join(sorted(current)) or "<none>",
+            ", ".join(sorted(heads))
+        )
+        return False
+    return True
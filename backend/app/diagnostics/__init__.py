@@ -0,0 +1,20 @@
+"""
+Diagnostics Module
+Runtime instrumentation used to find performance problems
+"""
+from .loop_monitor import LoopBlockDetector
+from .memory import MemoryDiagnostics, memory_diagnostics
+from .pool_monitor import PoolMonitor
+from .runtime_metrics import RuntimeMetrics, runtime_metrics
+from .sql_stats import RequestSqlStats, track_statements
+
+__all__ = [
+    'LoopBlockDetector',
+    'MemoryDiagnostics',
+    'memory_diagnostics',
+    'PoolMonitor',
+    'RuntimeMetrics',
+    'runtime_metrics',
+    'RequestSqlStats',
+    'track_statements'
+]
@@ -0,0 +1,80 @@
+"""
+Event Loop Monitor
+Detects code that blocks the asyncio event loop (sync DB calls, CPU work or
+blocking I/O inside an async def) and logs where it was blocked.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopBlockDetector:
+    """
+    Watchdog for the event loop
+
+    A callback on the loop records a heartbeat every few milliseconds and a
+    daemon thread checks how old it is. When the loop hasn't beaten for longer
+    than the threshold, the thread logs the loop thread's current stack, which
+    points at the coroutine doing the blocking work, and logs the total stall
+    once the loop is back.
+    """
+
+    def __init__(self, threshold_ms: int):
+        self.threshold = threshold_ms / 1000
+        # Beat and check several times per threshold so stalls are caught early
+        self.interval = max(self.threshold / 4, 0.005)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start watching a running loop. Must be called from the loop's thread"""
+        if self._thread:
+            return
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        loop.call_soon(self._beat)
+
+        self._thread = threading.Thread(target=self._run, name="loop-block-detector", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the watchdog thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _beat(self) -> None:
+        self._last_beat = time.monotonic()
+        if not self._stop.is_set():
+            self._loop.call_later(self.interval, self._beat)
+
+    def _run(self) -> None:
+        blocked_since: Optional[float] = None
+        while not self._stop.wait(self.interval):
+            last_beat = self._last_beat
+            # A beat is due every interval; anything beyond that is blocking
+            stalled = time.monotonic() - last_beat - self.interval
+
+            if stalled > self.threshold and blocked_since is None:
+                blocked_since = last_beat
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = "".join(traceback.format_stack(frame)) if frame else "(stack unavailable)\n"
+                logger.warning(
+                    "Event loop blocked for more than %.0f ms, currently in:\n%s",
+                    stalled * 1000, stack
+                )
+            elif blocked_since is not None and last_beat > blocked_since:
+                logger.warning("Event loop was blocked for %.0f ms", (last_beat - blocked_since) * 1000)
+                blocked_since = None
@@ -0,0 +1,206 @@
+"""
+Memory Diagnostics
+tracemalloc control, top allocation sites, snapshot diffs and the peak
+memory of each endpoint, to find the code paths that grow worker RSS.
+"""
+import linecache
+import resource
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+# Snapshots kept for diffs; each one holds every traced block
+MAX_SNAPSHOTS = 10
+
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def max_rss_kb() -> int:
+    """Highest resident set size of the process so far, in KB"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return usage // 1024 if sys.platform == "darwin" else usage
+
+
+def _kb(size: int) -> float:
+    return round(size / 1024, 1)
+
+
+def _format_stat(stat, group_by: GroupBy) -> Dict[str, Any]:
+    frame = stat.traceback[-1]
+    entry = {
+        "site": f"{frame.filename}:{frame.lineno}" if group_by != "filename" else frame.filename,
+        "size_kb": _kb(stat.size),
+        "count": stat.count,
+    }
+    if group_by == "lineno":
+        entry["line"] = linecache.getline(frame.filename, frame.lineno).strip()
+    elif group_by == "traceback":
+        entry["traceback"] = [f"{frame.filename}:{frame.lineno}" for frame in reversed(stat.traceback)]
+    if hasattr(stat, "size_diff"):
+        entry["size_diff_kb"] = _kb(stat.size_diff)
+        entry["count_diff"] = stat.count_diff
+    return entry
+
+
+class EndpointMemory:
+    """Memory use of the requests served by one route"""
+
+    __slots__ = ("requests", "peak_total", "peak_max", "rss_growth")
+
+    def __init__(self):
+        self.requests = 0
+        self.peak_total = 0
+        self.peak_max = 0
+        self.rss_growth = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "peak_max_kb": _kb(self.peak_max),
+            "peak_avg_kb": _kb(self.peak_total / self.requests) if self.requests else 0.0,
+            "rss_high_water_growth_kb": self.rss_growth,
+        }
+
+
+class MemoryDiagnostics:
+    """
+    Allocation tracing on demand
+
+    tracemalloc slows allocations down noticeably and keeps a traceback per
+    block, so it is off until an administrator starts it and should be
+    stopped when done. While on, every request records per route:
+      - the traced peak above the memory in use when it started. The peak
+        counter is global: it is reset when a request starts alone, and
+        requests served concurrently inflate each other's figure
+      - how much it raised the process RSS high-water mark, the number
+        that ends with the host killing the worker
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[int, Tuple[datetime, tracemalloc.Snapshot]]" = OrderedDict()
+        self._next_snapshot_id = 1
+        self._endpoints: Dict[Tuple[str, str], EndpointMemory] = {}
+        self.started_at: Optional[datetime] = None
+        self.active_requests = 0
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int) -> None:
+        """Start tracing with `frames` frames per traceback and reset the endpoint stats"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+        with self._lock:
+            self._endpoints = {}
+        self.started_at = datetime.now()
+
+    def stop(self) -> None:
+        """Stop tracing and free the traces. Snapshots already taken are kept"""
+        tracemalloc.stop()
+        self.started_at = None
+
+    def status(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": self.tracing,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "traceback_frames": tracemalloc.get_traceback_limit() if self.tracing else None,
+            "traced_kb": _kb(current),
+            "traced_peak_kb": _kb(peak),
+            "tracemalloc_overhead_kb": _kb(tracemalloc.get_tracemalloc_memory()),
+            "max_rss_kb": max_rss_kb(),
+            "snapshots": self.list_snapshots(),
+        }
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        if not self.tracing:
+            raise ValueError("tracemalloc no está activo")
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+    def top(self, limit: int, group_by: GroupBy) -> List[Dict[str, Any]]:
+        """Allocation sites holding the most memory right now"""
+        stats = self._snapshot().statistics(group_by)
+        return [_format_stat(stat, group_by) for stat in stats[:limit]]
+
+    def take_snapshot(self) -> Dict[str, Any]:
+        """Keep a snapshot for later diffs. The oldest is dropped beyond MAX_SNAPSHOTS"""
+        snapshot = self._snapshot()
+        taken_at = datetime.now()
+        with self._lock:
+            snapshot_id = self._next_snapshot_id
+            self._next_snapshot_id += 1
+            self._snapshots[snapshot_id] = (taken_at, snapshot)
+            while len(self._snapshots) > MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+        return self._describe(snapshot_id, taken_at, snapshot)
+
+    @staticmethod
+    def _describe(snapshot_id: int, taken_at: datetime, snapshot: tracemalloc.Snapshot) -> Dict[str, Any]:
+        return {
+            "id": snapshot_id,
+            "taken_at": taken_at.isoformat(),
+            "traced_kb": _kb(sum(trace.size for trace in snapshot.traces)),
+        }
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            snapshots = list(self._snapshots.items())
+        return [self._describe(snapshot_id, taken_at, snapshot) for snapshot_id, (taken_at, snapshot) in snapshots]
+
+    def diff(self, old_id: int, new_id: int, limit: int, group_by: GroupBy) -> List[Dict[str, Any]]:
+        """Sites whose memory changed most between two snapshots, growth first"""
+        with self._lock:
+            old = self._snapshots.get(old_id)
+            new = self._snapshots.get(new_id)
+        if old is None or new is None:
+            raise LookupError("Snapshot no encontrado")
+        stats = new[1].compare_to(old[1], group_by)
+        return [_format_stat(stat, group_by) for stat in stats[:limit]]
+
+    def request_started(self) -> Tuple[int, int]:
+        """Traced memory and RSS high-water mark at the start of a request"""
+        self.active_requests += 1
+        if self.active_requests == 1:
+            tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0], max_rss_kb()
+
+    def request_finished(self, method: str, route: str, started: Tuple[int, int]) -> None:
+        self.active_requests -= 1
+        traced_at_start, rss_at_start = started
+        peak = max(tracemalloc.get_traced_memory()[1] - traced_at_start, 0)
+        key = (method, route)
+        with self._lock:
+            endpoint = self._endpoints.get(key)
+            if endpoint is None:
+                endpoint = self._endpoints[key] = EndpointMemory()
+            endpoint.requests += 1
+            endpoint.peak_total += peak
+            endpoint.peak_max = max(endpoint.peak_max, peak)
+            endpoint.rss_growth += max_rss_kb() - rss_at_start
+
+    def endpoints(self) -> List[Dict[str, Any]]:
+        """Per-route memory since tracing started, highest peak first"""
+        with self._lock:
+            endpoints = [
+                {"method": method, "route": route, **endpoint.as_dict()}
+                for (method, route), endpoint in self._endpoints.items()
+            ]
+        return sorted(endpoints, key=lambda entry: entry["peak_max_kb"], reverse=True)
+
+
+memory_diagnostics = MemoryDiagnostics()
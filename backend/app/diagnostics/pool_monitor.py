@@ -0,0 +1,108 @@
+"""
+Pool Monitor
+Connection pool events (new connections, overflow use, pings, invalidations)
+counted per engine for the runtime metrics.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.pool import Pool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMonitor:
+    """
+    Counts pool events of one engine and applies its pre-ping strategy
+
+    Pre-ping strategies:
+      - "always": SQLAlchemy's pool_pre_ping, a round trip on every checkout
+      - "idle": ping only connections idle longer than `ping_idle_seconds`;
+        a busy pool pays nothing, a connection that sat unused (where the
+        server or a proxy may have dropped it) is still checked
+      - "never": rely on pool_recycle and on retrying failed requests
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Optional[Pool] = None
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.peak_overflow = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.invalidations = 0
+
+    def attach(self, engine: Engine, pre_ping: str, ping_idle_seconds: float) -> None:
+        pool = self.pool = engine.pool
+        dialect = engine.dialect
+
+        @event.listens_for(pool, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            connection_record.info["checked_in_at"] = time.monotonic()
+            with self._lock:
+                self.connects += 1
+
+        @event.listens_for(pool, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            connection_record.info["checked_in_at"] = time.monotonic()
+
+        @event.listens_for(pool, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            # size + overflow() is the number of open connections; overflow() > 0
+            # means this checkout needed a connection beyond pool_size
+            overflow = pool.overflow() if hasattr(pool, "overflow") else 0
+            with self._lock:
+                self.checkouts += 1
+                if overflow > 0:
+                    self.overflow_checkouts += 1
+                    self.peak_overflow = max(self.peak_overflow, overflow)
+
+            if pre_ping != "idle":
+                return
+            idle = time.monotonic() - connection_record.info.get("checked_in_at", 0)
+            if idle < ping_idle_seconds:
+                return
+            with self._lock:
+                self.pings += 1
+            try:
+                dialect.do_ping(dbapi_connection)
+            except Exception as e:
+                with self._lock:
+                    self.ping_failures += 1
+                # The pool discards this connection and retries with a new one
+                raise DisconnectionError(f"Connection idle for {idle:.0f}s failed the ping: {e}")
+
+        @event.listens_for(pool, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+            logger.warning("%s pool invalidated a connection: %s", self.name, exception)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current pool usage and the event counters since startup"""
+        status = {}
+        if hasattr(self.pool, "overflow"):
+            status = {
+                "size": self.pool.size(),
+                "checked_out": self.pool.checkedout(),
+                "overflow": self.pool.overflow(),
+            }
+        with self._lock:
+            return {
+                **status,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "peak_overflow": self.peak_overflow,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,145 @@
+"""
+Request Profiler
+Sampling profiler for a single request: the stacks of the event loop thread
+and of the busy worker threads, in the folded format flame graph tools read.
+"""
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+
+# anyio names the threads that run sync endpoints and dependencies this way
+WORKER_THREAD_NAME = "AnyIO worker thread"
+MAX_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{frame.f_globals.get('__name__', '?')}:{name}".replace(";", ",")
+
+
+class SamplingProfiler:
+    """
+    Samples thread stacks every `interval_ms` while a request runs
+
+    A daemon thread reads sys._current_frames(), so the profiled code runs
+    unmodified (no tracing hooks) and other requests pay nothing. Sampled:
+      - the event loop thread, where async endpoints run; awaiting the
+        database shows up as the selector wait in asyncio's loop
+      - worker threads running application code (sync endpoints); idle
+        workers are skipped
+
+    Stacks are not attributed to requests, so requests served concurrently
+    by the same threads are sampled too: profile on a quiet instance when
+    the numbers matter. Sampling stops after `max_seconds` regardless.
+    """
+
+    def __init__(self, interval_ms: float, max_seconds: float):
+        self.interval = max(interval_ms, 1) / 1000
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling. Must be called from the event loop thread"""
+        self._loop_thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.max_seconds
+        while True:
+            self._sample()
+            if self._stop.wait(self.interval) or time.monotonic() > deadline:
+                break
+        self.duration = time.perf_counter() - started
+
+    def _sample(self) -> None:
+        workers = {thread.ident for thread in threading.enumerate() if thread.name == WORKER_THREAD_NAME}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self._loop_thread_id:
+                self.stacks[("event-loop",) + self._stack(frame)] += 1
+            elif thread_id in workers:
+                stack = self._stack(frame)
+                if any(label.startswith("app.") for label in stack):
+                    self.stacks[("worker-thread",) + stack] += 1
+        self.samples += 1
+
+    @staticmethod
+    def _stack(frame) -> Tuple[str, ...]:
+        """Frame labels from the outermost call to `frame`"""
+        labels = []
+        while frame is not None and len(labels) < MAX_DEPTH:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        return tuple(reversed(labels))
+
+    def folded(self) -> str:
+        """
+        One "frame;frame;...;frame count" line per distinct stack, the input
+        of flamegraph.pl, speedscope and most flame graph viewers
+        """
+        lines = [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + "\n"
+
+
+class ProfileStore:
+    """Folded profiles saved on disk, newest `keep` files kept"""
+
+    SUFFIX = ".folded"
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = Path(directory)
+        self.keep = keep
+
+    def save(self, folded: str, method: str, route: str) -> str:
+        """Write a profile and prune old ones. Returns the file name"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-") or "root"
+        name = f"{datetime.now():%Y%m%d-%H%M%S}-{method.lower()}-{slug}-{uuid.uuid4().hex[:6]}{self.SUFFIX}"
+        (self.directory / name).write_text(folded, encoding="utf-8")
+
+        for old in self._files()[self.keep:]:
+            old.unlink(missing_ok=True)
+        return name
+
+    def list(self) -> List[Dict[str, object]]:
+        return [
+            {"name": path.name, "size": path.stat().st_size,
+             "created_at": datetime.fromtimestamp(path.stat().st_mtime).isoformat()}
+            for path in self._files()
+        ]
+
+    def path(self, name: str) -> Optional[Path]:
+        """Path of a stored profile; None for unknown or unsafe names"""
+        if Path(name).name != name or not name.endswith(self.SUFFIX):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+    def _files(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob(f"*{self.SUFFIX}"), key=lambda path: path.stat().st_mtime, reverse=True)
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_KEEP)
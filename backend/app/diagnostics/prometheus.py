@@ -0,0 +1,274 @@
+"""
+Prometheus Metrics
+Counters, gauges and histograms rendered in the Prometheus text exposition
+format (version 0.0.4), plus the HTTP and business metrics of the app.
+"""
+import contextlib
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency buckets in seconds: API calls are expected in the tens of
+# milliseconds, reports and PDF exports in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+# Counter increments held back by deferred() in the current context
+_deferred_increments: ContextVar[Optional[List[Tuple["Counter", Labels, float]]]] = ContextVar(
+    "prometheus_deferred_increments", default=None
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    A metric family: one value per combination of label values
+
+    Updates hold a per-family lock only for a dict update (no I/O, no
+    formatting), so an uncontended update costs well under a microsecond.
+    Rendering copies the values under the lock and formats outside it.
+    """
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic count, e.g. requests served or reservations created"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        pending = _deferred_increments.get()
+        if pending is not None:
+            pending.append((self, labels, amount))
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def values(self) -> Dict[Labels, float]:
+        """Current value of every label combination"""
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = self._header()
+        lines += [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in values]
+        return lines
+
+
+@contextlib.contextmanager
+def deferred():
+    """
+    Hold back the counter increments made inside the block until it exits
+
+    Same contract as Cache.deferred(): for service calls whose commit is not
+    the final one, the block must end after that commit. If it raises,
+    nothing was committed and the increments are dropped.
+    """
+    increments: List[Tuple[Counter, Labels, float]] = []
+    token = _deferred_increments.set(increments)
+    try:
+        yield
+    finally:
+        _deferred_increments.reset(token)
+    for counter, labels, amount in increments:
+        counter.inc(*labels, amount=amount)
+
+
+class Gauge(_Metric):
+    """
+    Current value read at scrape time from a callback
+
+    The callback returns {label values: value}, so gauges cost nothing
+    between scrapes (in-flight requests, pool usage...).
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Dict[Labels, float]],
+        labelnames: Sequence[str] = ()
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, value in sorted(self._collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observations in fixed buckets (request latencies)
+
+    An observation increments a single bucket; the cumulative counts
+    Prometheus expects are computed when rendering.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[Labels, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((labels, list(counts), total) for labels, (counts, total) in self._values.items())
+        lines = self._header()
+        bounds = self.buckets + (float("inf"),)
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metric families published by the /metrics/prometheus endpoint"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self, extra: Optional[Iterable[_Metric]] = None) -> str:
+        lines: List[str] = []
+        for metric in [*self._metrics, *(extra or ())]:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# Requests being served, by id(scope). Only touched on the event loop thread
+in_flight_requests: Dict[int, dict] = {}
+
+
+def route_template(scope: dict) -> str:
+    """
+    Route template of a request once routed, as declared in its router
+    (/rooms/{room_id}: the /api prefix every router is included with is not
+    part of it)
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _in_flight_by_route() -> Dict[Labels, float]:
+    counts: Dict[Labels, float] = {}
+    for scope in list(in_flight_requests.values()):
+        key = (route_template(scope),)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+# HTTP metrics, recorded by MetricsMiddleware. Routes are labelled by their
+# template, never the raw path, to bound cardinality; requests that matched
+# no route (404s, scanners) share the "unmatched" label
+http_requests = registry.register(Counter(
+    "hotel_http_requests_total", "HTTP requests by route template and status code",
+    ("method", "route", "status")
+))
+http_latency = registry.register(Histogram(
+    "hotel_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route")
+))
+http_in_flight = registry.register(Gauge(
+    "hotel_http_requests_in_flight", "HTTP requests being served, by route template",
+    _in_flight_by_route, ("route",)
+))
+
+# Business metrics, incremented by the services after their commit
+bookings = registry.register(Counter(
+    "hotel_bookings_total", "Reservations created, by channel", ("channel",)
+))
+checkins = registry.register(Counter(
+    "hotel_checkins_total", "Reservations checked in", ("mode",)
+))
+checkouts = registry.register(Counter(
+    "hotel_checkouts_total", "Reservations checked out", ("mode",)
+))
+cancellations = registry.register(Counter(
+    "hotel_cancellations_total", "Reservations cancelled, by cause", ("cause",)
+))
+emails = registry.register(Counter(
+    "hotel_emails_total", "Guest emails by kind and result (sent/failed)", ("kind", "result")
+))
+
+# Service-layer cache (app.cache), by cached function
+cache_requests = registry.register(Counter(
+    "hotel_cache_requests_total", "Cache lookups by cached function and result (hit/miss)", ("cache", "result")
+))
+cache_invalidations = registry.register(Counter(
+    "hotel_cache_invalidations_total", "Cache tags invalidated by mutations"
+))
+cache_evictions = registry.register(Counter(
+    "hotel_cache_evictions_total", "Cache entries evicted to stay within CACHE_MAX_ENTRIES"
+))
@@ -0,0 +1,181 @@
+"""
+Runtime Metrics
+Event loop lag, AnyIO thread pool saturation and DB pool checkout waits,
+sampled in process and summarized over a sliding window.
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from anyio import to_thread
+
+from app.config import settings
+from app.diagnostics.pool_monitor import PoolMonitor
+
+logger = logging.getLogger(__name__)
+
+
+class RollingWindow:
+    """Thread-safe samples of the last `seconds`, summarized on demand"""
+
+    # Hard cap so a burst of samples can't grow the window without bound
+    MAX_SAMPLES = 10000
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=self.MAX_SAMPLES)
+        self._lock = threading.Lock()
+
+    def add(self, value: float) -> None:
+        with self._lock:
+            self._samples.append((time.monotonic(), value))
+
+    def values(self) -> List[float]:
+        cutoff = time.monotonic() - self.seconds
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            return [value for _, value in self._samples]
+
+    def summary(self) -> Dict[str, float]:
+        """count, avg, p95 and max of the samples in the window"""
+        values = sorted(self.values())
+        if not values:
+            return {"count": 0, "avg": 0.0, "p95": 0.0, "max": 0.0}
+        p95 = values[min(len(values) - 1, math.ceil(len(values) * 0.95) - 1)]
+        return {
+            "count": len(values),
+            "avg": round(sum(values) / len(values), 2),
+            "p95": round(p95, 2),
+            "max": round(values[-1], 2),
+        }
+
+
+class RuntimeMetrics:
+    """
+    Samples the event loop and the AnyIO thread limiter from a task on the loop
+
+    Loop lag is how late `asyncio.sleep(interval)` wakes up: anything blocking
+    the loop shows up there. Sync endpoints and dependencies run on AnyIO's
+    default thread limiter; busy threads and tasks queued for one show whether
+    it is the bottleneck. Checkout times are recorded by the primary engine's
+    pool (see app.database.TimedQueuePool) through `record_pool_wait`, and
+    each pool's usage and events come from its PoolMonitor.
+    """
+
+    # Alerts are re-evaluated (and logged on change) at most this often
+    ALERT_CHECK_SECONDS = 1.0
+
+    def __init__(self, interval_ms: int, window_seconds: int):
+        self.interval = interval_ms / 1000
+        self.loop_lag_ms = RollingWindow(window_seconds)
+        self.threadpool_busy = RollingWindow(window_seconds)
+        self.threadpool_queued = RollingWindow(window_seconds)
+        self.pool_wait_ms = RollingWindow(window_seconds)
+        self._threadpool_limit = 0
+        self._task: Optional[asyncio.Task] = None
+        self._pool_monitors: List[PoolMonitor] = []
+        self._active_alerts: set = set()
+
+    def start(self, pool_monitors: List[PoolMonitor]) -> None:
+        """Start sampling on the running loop; the pools are reported under db_pool"""
+        if self._task:
+            return
+        self._pool_monitors = pool_monitors
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the sampler task"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def record_pool_wait(self, milliseconds: float) -> None:
+        self.pool_wait_ms.add(milliseconds)
+
+    @staticmethod
+    def thresholds() -> Dict[str, float]:
+        return {
+            "loop_lag_ms": settings.METRICS_ALERT_LOOP_LAG_MS,
+            "threadpool_queued": settings.METRICS_ALERT_THREADPOOL_QUEUED,
+            "pool_wait_ms": settings.METRICS_ALERT_POOL_WAIT_MS,
+        }
+
+    async def _run(self) -> None:
+        last_alert_check = 0.0
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.loop_lag_ms.add(max(0.0, (time.monotonic() - started - self.interval) * 1000))
+
+            statistics = to_thread.current_default_thread_limiter().statistics()
+            self._threadpool_limit = statistics.total_tokens
+            self.threadpool_busy.add(statistics.borrowed_tokens)
+            self.threadpool_queued.add(statistics.tasks_waiting)
+
+            if started - last_alert_check >= self.ALERT_CHECK_SECONDS:
+                last_alert_check = started
+                self._log_alert_changes()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Window summaries, current pool status and the thresholds exceeded"""
+        metrics = {
+            "loop_lag_ms": self.loop_lag_ms.summary(),
+            "threadpool": {
+                "limit": self._threadpool_limit,
+                "busy": self.threadpool_busy.summary(),
+                "queued": self.threadpool_queued.summary(),
+            },
+            "db_pool": {
+                "checkout_wait_ms": self.pool_wait_ms.summary(),
+                "pools": {monitor.name: monitor.snapshot() for monitor in self._pool_monitors},
+            },
+        }
+        thresholds = self.thresholds()
+        return {
+            "window_seconds": self.loop_lag_ms.seconds,
+            "sample_interval_ms": round(self.interval * 1000),
+            **metrics,
+            "thresholds": thresholds,
+            "alerts": list(self._alerts(metrics, thresholds).values()),
+        }
+
+    @staticmethod
+    def _alerts(metrics: Dict[str, Any], thresholds: Dict[str, float]) -> Dict[str, str]:
+        """Message for every threshold the window's p95 exceeds, by threshold name"""
+        observed = {
+            "loop_lag_ms": metrics["loop_lag_ms"]["p95"],
+            "threadpool_queued": metrics["threadpool"]["queued"]["p95"],
+            "pool_wait_ms": metrics["db_pool"]["checkout_wait_ms"]["p95"],
+        }
+        return {
+            name: f"{name} p95 {observed[name]} > {limit}"
+            for name, limit in thresholds.items()
+            if observed[name] > limit
+        }
+
+    def _log_alert_changes(self) -> None:
+        """Log each alert once when it fires and once when it clears"""
+        metrics = {
+            "loop_lag_ms": self.loop_lag_ms.summary(),
+            "threadpool": {"queued": self.threadpool_queued.summary()},
+            "db_pool": {"checkout_wait_ms": self.pool_wait_ms.summary()},
+        }
+        alerts = self._alerts(metrics, self.thresholds())
+        for name, message in alerts.items():
+            if name not in self._active_alerts:
+                logger.warning("Runtime alert: %s", message)
+        for name in self._active_alerts - alerts.keys():
+            logger.info("Runtime alert cleared: %s", name)
+        self._active_alerts = set(alerts)
+
+
+runtime_metrics = RuntimeMetrics(settings.METRICS_SAMPLE_INTERVAL_MS, settings.METRICS_WINDOW_SECONDS)
@@ -0,0 +1,77 @@
+"""
+SQL Statement Stats
+Statements and DB time per request, from SQLAlchemy cursor events, and the
+repeated-statement (N+1) signature of lazy loads in loops.
+"""
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestSqlStats:
+    """
+    Statements executed on behalf of one request
+
+    SQLAlchemy renders bound parameters as placeholders, so the statement text
+    is its shape: the same text many times in one request is one query per
+    row of something, the N+1 pattern.
+    """
+
+    __slots__ = ("statements", "db_time", "shapes")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.shapes: Counter = Counter()
+
+    @property
+    def db_time_ms(self) -> float:
+        return self.db_time * 1000
+
+    def most_repeated(self) -> Tuple[int, Optional[str]]:
+        """(count, statement) of the statement executed most often"""
+        if not self.shapes:
+            return 0, None
+        statement, count = self.shapes.most_common(1)[0]
+        return count, statement
+
+
+_current: ContextVar[Optional[RequestSqlStats]] = ContextVar("request_sql_stats", default=None)
+
+
+def start_request() -> Tuple[RequestSqlStats, object]:
+    """Collect the statements of the current context. Returns (stats, reset token)"""
+    stats = RequestSqlStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+def track_statements(engine: Engine) -> None:
+    """
+    Count statements and time of an engine into the current request's stats
+
+    The stats object travels in a ContextVar, which AnyIO copies into worker
+    threads, so statements of sync endpoints count too. Statements outside a
+    request (background jobs) are ignored.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("sql_stats_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is None or not conn.info.get("sql_stats_started"):
+            return
+        stats.db_time += time.perf_counter() - conn.info["sql_stats_started"].pop()
+        stats.statements += 1
+        stats.shapes[statement] += 1
@@ -0,0 +1,148 @@
+"""
+Structured Log
+JSON lines application and access log, written by a background thread
+through a QueueHandler, with the request id, route and principal of the
+request that emitted each record.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+class RequestLogContext:
+    """
+    Request fields added to every record logged while serving it
+
+    One mutable object per request, shared through a ContextVar: worker
+    threads get a copy of the context, so fields set there (the principal,
+    by the auth dependencies) must be attributes of this object rather than
+    ContextVar values to be seen by the access log.
+    """
+
+    __slots__ = ("request_id", "scope", "principal")
+
+    def __init__(self, request_id: str, scope: dict):
+        self.request_id = request_id
+        self.scope = scope
+        self.principal: Optional[str] = None
+
+    def fields(self) -> Dict[str, Any]:
+        route = self.scope.get("route")
+        return {
+            "request_id": self.request_id,
+            "route": getattr(route, "path", None),
+            "principal": self.principal,
+        }
+
+
+_request_context: ContextVar[Optional[RequestLogContext]] = ContextVar("request_log_context", default=None)
+
+
+def start_request_context(request_id: str, scope: dict):
+    """Set the log context of the current request. Returns (context, reset token)"""
+    context = RequestLogContext(request_id, scope)
+    return context, _request_context.set(context)
+
+
+def end_request_context(token) -> None:
+    _request_context.reset(token)
+
+
+def set_principal(principal: str) -> None:
+    """Record who the current request is authenticated as (admin:<user>, guest:<id>)"""
+    context = _request_context.get()
+    if context is not None:
+        context.principal = principal
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request fields and extras"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Puts records on an in-memory queue for the writer thread
+
+    The caller only renders the message (and traceback) and copies the
+    request fields, which live in this thread's context; formatting the
+    line and writing it happen in the QueueListener thread, so a slow
+    stdout or disk never blocks the event loop or a request.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        context = _request_context.get()
+        if context is not None:
+            for key, value in context.fields().items():
+                if not hasattr(record, key):
+                    setattr(record, key, value)
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(level: str, json_format: bool, log_file: str = "") -> None:
+    """
+    Send every log record through a ContextQueueHandler on the root logger
+
+    Uvicorn's loggers propagate to the root logger too, so its error log
+    ends up in the same stream (run uvicorn with --no-access-log: the
+    AccessLogMiddleware already writes one line per request).
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    target = logging.FileHandler(log_file, encoding="utf-8") if log_file else logging.StreamHandler(sys.stdout)
+    target.setFormatter(
+        JsonFormatter() if json_format
+        else logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s", defaults={"request_id": "-"})
+    )
+    # Unbounded: a full queue would make the caller block or drop records
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, target, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    root = logging.getLogger()
+    root.handlers = [ContextQueueHandler(log_queue)]
+    root.setLevel(level.upper())
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+
+def stop_logging() -> None:
+    """Flush the queue and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -2,6 +2,26 @@
 Middleware Module
 Contains authentication and authorization middleware
 """
-from .admin_middleware import verify_admin_token, require_admin
+from .access_log import AccessLogMiddleware
+from .admin_middleware import verify_admin_token, verify_admin_token_async, require_admin
+from .conditional import check_etag, entity_tag, etag_headers
+from .memory import MemoryTrackingMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .read_your_writes import ReadYourWritesMiddleware
+from .sql_stats import SqlStatsMiddleware
 
-__all__ = ['verify_admin_token', 'require_admin']
+__all__ = [
+    'verify_admin_token',
+    'verify_admin_token_async',
+    'require_admin',
+    'check_etag',
+    'entity_tag',
+    'etag_headers',
+    'AccessLogMiddleware',
+    'MemoryTrackingMiddleware',
+    'MetricsMiddleware',
+    'ProfilingMiddleware',
+    'ReadYourWritesMiddleware',
+    'SqlStatsMiddleware'
+]
@@ -0,0 +1,87 @@
+"""
+Access Log Middleware
+One structured log line per request with its timing breakdown, and the
+request id that ties it to the application log lines it produced.
+"""
+import logging
+import re
+import time
+import uuid
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.diagnostics.prometheus import route_template
+from app.diagnostics.structured_log import end_request_context, start_request_context
+
+logger = logging.getLogger("app.access")
+
+# Accept ids from a proxy or the frontend only if they are short and plain
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class AccessLogMiddleware:
+    """
+    Logs method, route template, status, latency, DB time and statement
+    count, principal and request id of every request
+
+    The request id comes from the X-Request-ID header when present (so a
+    proxy's id can be followed end to end) or is generated, and is returned
+    in the response's X-Request-ID. DB figures are those collected by
+    SqlStatsMiddleware, which must run inside this middleware.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self._request_id(scope)
+        status = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        context, token = start_request_context(request_id, scope)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if settings.ACCESS_LOG:
+                self._log(scope, status, (time.perf_counter() - started) * 1000, context.principal)
+            end_request_context(token)
+
+    @staticmethod
+    def _log(scope: Scope, status: int, latency_ms: float, principal: Optional[str]) -> None:
+        stats = scope.get("sql_stats")
+        logger.info(
+            "%s %s %d %.1f ms", scope["method"], route_template(scope), status, latency_ms,
+            extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "latency_ms": round(latency_ms, 1),
+                "db_time_ms": round(stats.db_time_ms, 1) if stats else None,
+                "db_statements": stats.statements if stats else None,
+                "principal": principal,
+            }
+        )
+
+    @staticmethod
+    def _request_id(scope: Scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(candidate):
+                    return candidate
+                break
+        return uuid.uuid4().hex
@@ -4,33 +4,22 @@ Verifies that requests are made by authenticated administrators
 """
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 
 from app.config import settings
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_async_db, get_db
+from app.diagnostics.structured_log import set_principal
 from app.models import Administrator
 
 security = HTTPBearer()
 
 
-def verify_admin_token(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Administrator:
-    """
-    Verify that the provided token belongs to an administrator
-    
-    Args:
-        credentials: HTTP Authorization credentials with Bearer token
-        db: Database session
-        
-    Returns:
-        Administrator: The authenticated administrator
-        
-    Raises:
-        HTTPException: If token is invalid or user is not an admin
-    """
+def _username_from_token(credentials: HTTPAuthorizationCredentials) -> str:
+    """Decode the Bearer token and return its subject. Raises 401 if invalid"""
     token = credentials.credentials
     
     try:
@@ -56,21 +45,83 @@ def verify_admin_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Verify admin exists in database
-    admin = db.query(Administrator).filter(
-        Administrator.username == username
-    ).first()
-    
+    return username
+
+
+def _admin_or_403(admin: Optional[Administrator]) -> Administrator:
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Acceso denegado: Solo administradores pueden acceder a este recurso",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+    set_principal(f"admin:{admin.username}")
     return admin
 
 
+def verify_admin_token(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Administrator:
+    """
+    Verify that the provided token belongs to an administrator
+    
+    Args:
+        credentials: HTTP Authorization credentials with Bearer token
+        db: Database session
+        
+    Returns:
+        Administrator: The authenticated administrator
+        
+    Raises:
+        HTTPException: If token is invalid or user is not an admin
+    """
+    username = _username_from_token(credentials)
+    
+    # Verify admin exists in database
+    admin = db.query(Administrator).filter(
+        Administrator.username == username
+    ).first()
+    
+    return _admin_or_403(admin)
+
+
+async def verify_admin_token_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Administrator:
+    """
+    verify_admin_token on the async session
+    
+    For admin endpoints that must answer even when every worker thread is
+    busy (diagnostics), since sync dependencies wait for a thread too.
+    """
+    username = _username_from_token(credentials)
+    
+    admin = await db.scalar(select(Administrator).where(Administrator.username == username))
+    
+    return _admin_or_403(admin)
+
+
+async def admin_from_bearer(authorization: Optional[str]) -> Optional[Administrator]:
+    """
+    Administrator of an "Authorization: Bearer ..." header value, or None
+    
+    For ASGI middleware that act on admin-only request flags, where
+    dependencies are not available and a bad token just means no admin.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        username = _username_from_token(HTTPAuthorizationCredentials(scheme=scheme, credentials=token))
+    except HTTPException:
+        return None
+    
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(Administrator).where(Administrator.username == username))
+
+
 def require_admin():
     """
     Dependency to require admin authentication
@@ -0,0 +1,61 @@
+"""
+Conditional GET
+ETags for read endpoints, built from the versions of the rows a response
+shows, so If-None-Match gets a 304 before the body is loaded or serialized.
+"""
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, Request, Response, status
+
+from app.config import settings
+
+
+def entity_tag(*versions: Any) -> str:
+    """
+    Weak ETag of a response made from rows with these versions
+
+    Responses served from the service cache can lag a change made outside
+    the app (psql, scripts) by up to CACHE_TTL_SECONDS, while the versions
+    see it at once. The tag also changes every CACHE_TTL_SECONDS so such a
+    response, or one serialized by an older deploy, isn't revalidated for
+    longer than that.
+    """
+    period = int(time.time() // max(settings.CACHE_TTL_SECONDS, 1))
+    digest = hashlib.sha1(repr((versions, period)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """Headers sent with a tagged response: the tag, and revalidate before reuse"""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def check_etag(request: Request, response: Optional[Response], etag: str) -> None:
+    """
+    Answer 304 Not Modified if the client already has `etag`
+
+    Otherwise the tag is added to `response` (the endpoint's Response
+    parameter) and the endpoint goes on to build the body. Endpoints that
+    return their own Response pass None and add etag_headers() to it.
+    """
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+    if response is not None:
+        response.headers.update(etag_headers(etag))
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison (RFC 9110): W/ prefixes are ignored
+
+    `*` matches any current representation, so endpoints that can answer
+    404 check the row exists before calling check_etag.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
@@ -0,0 +1,31 @@
+"""
+Memory Tracking Middleware
+Peak memory per route while the admin memory diagnostics are tracing.
+"""
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.diagnostics.memory import memory_diagnostics
+from app.diagnostics.prometheus import route_template
+
+
+class MemoryTrackingMiddleware:
+    """
+    Records each request's memory into memory_diagnostics
+
+    Does nothing unless tracemalloc was started from the diagnostics
+    endpoint, so it can stay installed in production.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not memory_diagnostics.tracing:
+            await self.app(scope, receive, send)
+            return
+
+        started = memory_diagnostics.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            memory_diagnostics.request_finished(scope["method"], route_template(scope), started)
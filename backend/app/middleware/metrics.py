@@ -0,0 +1,50 @@
+"""
+Metrics Middleware
+Records latency, status code and in-flight count of every request per route
+template for the Prometheus endpoint.
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.diagnostics.prometheus import http_latency, http_requests, in_flight_requests, route_template
+
+
+class MetricsMiddleware:
+    """
+    Per-route request metrics
+
+    The route template is only known once the router has matched the
+    request, so it is read from the scope when the request finishes; the
+    in-flight gauge resolves it at scrape time from the scopes still being
+    served. Latency covers the whole response, body streaming included.
+    Runs on the event loop thread: recording is two dict updates per request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        key = id(scope)
+        in_flight_requests[key] = scope
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            del in_flight_requests[key]
+            route = route_template(scope)
+            http_requests.inc(scope["method"], route, str(status))
+            http_latency.observe(elapsed, scope["method"], route)
@@ -0,0 +1,135 @@
+"""
+Profiling Middleware
+Profiles a single request on demand: an administrator adds the X-Profile
+header or the ?profile= query flag and gets a flame graph profile back.
+"""
+import logging
+from typing import Optional
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.diagnostics.profiler import SamplingProfiler, profile_store
+from app.diagnostics.prometheus import route_template
+from app.middleware.admin_middleware import admin_from_bearer
+
+logger = logging.getLogger(__name__)
+
+RETURN_MODES = {"1", "true", "return"}
+STORE_MODE = "store"
+
+
+class ProfilingMiddleware:
+    """
+    Samples one request when asked to by an administrator
+
+    Modes (header `X-Profile: <mode>` or query `?profile=<mode>`):
+      - "1"/"true"/"return": the response is replaced by the folded stacks
+        (text/plain); the original status travels in X-Profile-Status
+      - "store": the response is unchanged and the profile is saved in
+        PROFILE_DIR; its name travels in X-Profile-File and it can be
+        downloaded from the admin diagnostics endpoints
+
+    The flag is ignored unless the Authorization header holds an admin
+    token. Requests without the flag only pay for the flag lookup.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = self._requested_mode(scope)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        admin = await admin_from_bearer(headers.get("authorization"))
+        if admin is None:
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(settings.PROFILE_SAMPLE_INTERVAL_MS, settings.PROFILE_MAX_SECONDS)
+        if mode == STORE_MODE:
+            await self._profile_and_store(scope, receive, send, profiler)
+        else:
+            await self._profile_and_return(scope, receive, send, profiler)
+        logger.info(
+            "Profiled %s %s for %s: %d samples in %.0f ms",
+            scope["method"], route_template(scope), admin.username, profiler.samples, profiler.duration * 1000
+        )
+
+    @staticmethod
+    def _requested_mode(scope: Scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return ProfilingMiddleware._mode(value.decode("latin-1"))
+        query = scope["query_string"]
+        if b"profile=" in query:
+            values = parse_qs(query.decode("latin-1")).get("profile")
+            return ProfilingMiddleware._mode(values[0]) if values else None
+        return None
+
+    @staticmethod
+    def _mode(value: str) -> Optional[str]:
+        value = value.strip().lower()
+        if value == STORE_MODE:
+            return STORE_MODE
+        return "return" if value in RETURN_MODES else None
+
+    async def _profile_and_return(self, scope: Scope, receive: Receive, send: Send, profiler: SamplingProfiler) -> None:
+        status = 500
+
+        async def discard(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        response = PlainTextResponse(profiler.folded(), headers={
+            "X-Profile-Status": str(status),
+            "X-Profile-Samples": str(profiler.samples),
+            "X-Profile-Duration-Ms": f"{profiler.duration * 1000:.0f}",
+        })
+        await response(scope, receive, send)
+
+    async def _profile_and_store(self, scope: Scope, receive: Receive, send: Send, profiler: SamplingProfiler) -> None:
+        # The file name is only known at the end, but headers go out first:
+        # hold the start message until the body is complete
+        start: Optional[Message] = None
+        body = []
+
+        async def hold(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            else:
+                body.append(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, hold)
+        finally:
+            profiler.stop()
+
+        name = await run_in_threadpool(
+            profile_store.save, profiler.folded(), scope["method"], route_template(scope)
+        )
+        if start is not None:
+            start["headers"] = list(start.get("headers", [])) + [(b"x-profile-file", name.encode())]
+            await send(start)
+            for message in body:
+                await send(message)
@@ -0,0 +1,65 @@
+"""
+Read-Your-Writes Middleware
+Keeps a client on the primary database for a short while after it writes,
+so replica lag never hides the reservation or profile it just saved.
+"""
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.database import read_from_primary, reset_read_from_primary
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pins a client's reads to the primary after a successful write
+
+    A non-GET request that succeeds sets a cookie holding the time until
+    which the client must read from the primary (READ_YOUR_WRITES_SECONDS).
+    Requests carrying an unexpired cookie route every session to the primary.
+    The frontend's API client sends it cross-origin (withCredentials), which
+    CORS allows for the ALLOWED_ORIGINS.
+    It is stateless, so it works across workers. Pure ASGI (no
+    BaseHTTPMiddleware) to keep streaming responses and per-request cost low.
+    """
+
+    COOKIE = "read_primary_until"
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            sticky = float(HTTPConnection(scope).cookies.get(self.COOKIE, 0)) > time.time()
+        except ValueError:
+            sticky = False
+        writes = scope["method"] not in SAFE_METHODS
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                self._set_cookie(MutableHeaders(scope=message), scope["scheme"] == "https")
+            await send(message)
+
+        token = read_from_primary(sticky)
+        try:
+            await self.app(scope, receive, send_with_cookie if writes else send)
+        finally:
+            reset_read_from_primary(token)
+
+    def _set_cookie(self, headers: MutableHeaders, secure: bool) -> None:
+        seconds = settings.READ_YOUR_WRITES_SECONDS
+        # The frontend is usually on another site: cross-site cookies need SameSite=None; Secure
+        same_site = "SameSite=None; Secure" if secure else "SameSite=Lax"
+        headers.append(
+            "set-cookie",
+            f"{self.COOKIE}={time.time() + seconds:.0f}; Max-Age={seconds}; Path=/; HttpOnly; {same_site}"
+        )
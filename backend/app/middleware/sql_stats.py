@@ -0,0 +1,79 @@
+"""
+SQL Stats Middleware
+Counts the SQL statements and DB time of every request and flags N+1 query
+patterns: as response headers in DEBUG, in the log always.
+"""
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.diagnostics.sql_stats import RequestSqlStats, end_request, start_request
+
+logger = logging.getLogger(__name__)
+
+
+class SqlStatsMiddleware:
+    """
+    Per-request SQL statement counter and N+1 detector
+
+    With DEBUG on, responses carry X-DB-Statements, X-DB-Time-Ms,
+    X-DB-Repeated-Statement (the highest repeat count of a single statement)
+    and a Server-Timing entry for the browser dev tools. Requests where one
+    statement ran SQL_N_PLUS_ONE_THRESHOLD times or more, or that ran more
+    than SQL_STATEMENTS_WARN statements, are logged with their route
+    template so the offending endpoint can be found in production logs.
+    Headers only cover statements run before the response starts.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_request()
+        # For the access log, which runs outside this middleware
+        scope["sql_stats"] = stats
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self._add_headers(MutableHeaders(scope=message), stats)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers if settings.DEBUG else send)
+        finally:
+            end_request(token)
+            self._log_if_suspicious(scope, stats)
+
+    @staticmethod
+    def _add_headers(headers: MutableHeaders, stats: RequestSqlStats) -> None:
+        headers["X-DB-Statements"] = str(stats.statements)
+        headers["X-DB-Time-Ms"] = f"{stats.db_time_ms:.1f}"
+        headers["X-DB-Repeated-Statement"] = str(stats.most_repeated()[0])
+        headers.append("Server-Timing", f"db;desc=\"{stats.statements} statements\";dur={stats.db_time_ms:.1f}")
+
+    @staticmethod
+    def _log_if_suspicious(scope: Scope, stats: RequestSqlStats) -> None:
+        repeats, statement = stats.most_repeated()
+        n_plus_one = repeats >= settings.SQL_N_PLUS_ONE_THRESHOLD
+        if not n_plus_one and stats.statements <= settings.SQL_STATEMENTS_WARN:
+            return
+
+        route = scope.get("route")
+        path = getattr(route, "path", scope["path"])
+        if n_plus_one:
+            logger.warning(
+                "N+1 queries in %s %s: %d statements (%.1f ms), one repeated %d times: %s",
+                scope["method"], path, stats.statements, stats.db_time_ms, repeats,
+                " ".join(statement.split())[:300]
+            )
+        else:
+            logger.warning(
+                "%s %s ran %d statements (%.1f ms)",
+                scope["method"], path, stats.statements, stats.db_time_ms
+            )
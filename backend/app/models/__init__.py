@@ -3,10 +3,14 @@ from .models import (
     RoomImage, 
     Guest, 
     Reservation, 
+    ReservationGroup,
     Administrator,
+    RoomHold,
+    IdempotencyKey,
     RoomType,
     RoomStatus,
-    ReservationStatus
+    ReservationStatus,
+    HoldStatus
 )
 
 __all__ = [
@@ -14,8 +18,12 @@ __all__ = [
     "RoomImage",
     "Guest",
     "Reservation",
+    "ReservationGroup",
     "Administrator",
+    "RoomHold",
+    "IdempotencyKey",
     "RoomType",
     "RoomStatus",
-    "ReservationStatus"
+    "ReservationStatus",
+    "HoldStatus"
 ]
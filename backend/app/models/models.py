@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Enum, DECIMAL
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Enum, DECIMAL, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -24,11 +24,22 @@ class ReservationStatus(str, enum.Enum):
     COMPLETED = "Completed"
     CANCELLED = "Cancelled"
 
+class HoldStatus(str, enum.Enum):
+    HELD = "Held"
+    CONVERTED = "Converted"
+    RELEASED = "Released"
+    EXPIRED = "Expired"
+
 class Room(Base):
     __tablename__ = "rooms"
+    __table_args__ = (
+        Index("idx_rooms_status", "status"),
+        Index("idx_rooms_type", "type"),
+        Index("idx_rooms_room_number", "room_number"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    room_number = Column(String(10), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    room_number = Column(String(10), unique=True, nullable=False)
     type = Column(String(20), nullable=False)  # Changed from Enum to String
     price_per_night = Column(DECIMAL(10, 2), nullable=False)
     capacity = Column(Integer, nullable=False)
@@ -46,8 +57,11 @@ class Room(Base):
 
 class RoomImage(Base):
     __tablename__ = "room_images"
+    __table_args__ = (
+        Index("idx_room_images_room_id", "room_id"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
     image_url = Column(String(500), nullable=False)
     is_primary = Column(Boolean, default=False)
@@ -58,11 +72,15 @@ class RoomImage(Base):
 
 class Guest(Base):
     __tablename__ = "guests"
+    __table_args__ = (
+        Index("idx_guests_email", "email"),
+        Index("idx_guests_id_document", "id_document"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
-    email = Column(String(255), unique=True, index=True, nullable=False)
+    email = Column(String(255), unique=True, nullable=False)
     phone = Column(String(20), nullable=False)
     id_document = Column(String(50), unique=True, nullable=False)
     nationality = Column(String(100))
@@ -77,32 +95,77 @@ class Guest(Base):
 
 class Reservation(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        Index("idx_reservations_room_id", "room_id"),
+        Index("idx_reservations_guest_id", "guest_id"),
+        Index("idx_reservations_status", "status"),
+        Index("idx_reservations_check_in_date", "check_in_date"),
+        Index("idx_reservations_check_out_date", "check_out_date"),
+        Index("idx_reservations_group_id", "group_id"),
+        # Overlap checks: room_id = ? AND status IN (Pending, Active) AND check_in_date < ? AND check_out_date > ?
+        Index(
+            "idx_reservations_room_open_dates", "room_id", "check_in_date", "check_out_date",
+            postgresql_where=text("status IN ('Pending', 'Active')")
+        ),
+        # Today's check-ins and the no-show sweep
+        Index(
+            "idx_reservations_open_check_in", "check_in_date",
+            postgresql_where=text("status IN ('Pending', 'Active')")
+        ),
+        # Today's check-outs and the overdue check-out sweep
+        Index(
+            "idx_reservations_active_check_out", "check_out_date",
+            postgresql_where=text("status = 'Active'")
+        ),
+        # Revenue by creation date, answered from the index alone
+        Index(
+            "idx_reservations_created_at_revenue", "created_at",
+            postgresql_include=["total_price"],
+            postgresql_where=text("status <> 'Cancelled'")
+        ),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     room_id = Column(Integer, ForeignKey("rooms.id"), nullable=False)
     guest_id = Column(Integer, ForeignKey("guests.id"), nullable=False)
     check_in_date = Column(DateTime, nullable=False)
     check_out_date = Column(DateTime, nullable=False)
     actual_check_in = Column(DateTime)  # Real check-in timestamp
     actual_check_out = Column(DateTime)  # Real check-out timestamp
-    status = Column(String(50), default="Pending")
+    status = Column(String(20), default="Pending")
     total_price = Column(DECIMAL(10, 2), nullable=False)
     guests_count = Column(Integer, default=1)
     special_requests = Column(Text)
     payment_method = Column(String(50), default="Cash")
     payment_status = Column(String(50), default="Pending")
+    group_id = Column(Integer, ForeignKey("reservation_groups.id"))  # Set for group bookings
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     room = relationship("Room", back_populates="reservations")
     guest = relationship("Guest", back_populates="reservations")
+    group = relationship("ReservationGroup", back_populates="reservations")
+
+class ReservationGroup(Base):
+    __tablename__ = "reservation_groups"
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(200), nullable=False)  # e.g. wedding or conference name
+    guest_id = Column(Integer, ForeignKey("guests.id"), nullable=False)  # Organizer
+    check_in_date = Column(DateTime, nullable=False)
+    check_out_date = Column(DateTime, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    guest = relationship("Guest")
+    reservations = relationship("Reservation", back_populates="group")
 
 class Administrator(Base):
     __tablename__ = "administrators"
     
-    id = Column(Integer, primary_key=True, index=True)
-    username = Column(String(50), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    username = Column(String(50), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     full_name = Column(String(200), nullable=False)
     email = Column(String(255), unique=True, nullable=False)
@@ -110,3 +173,46 @@ class Administrator(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class RoomHold(Base):
+    __tablename__ = "room_holds"
+    __table_args__ = (
+        Index("idx_room_holds_room_id", "room_id"),
+        # Availability checks only look at unexpired Held rows
+        Index(
+            "idx_room_holds_room_held_dates", "room_id", "check_in_date", "check_out_date",
+            postgresql_where=text("status = 'Held'")
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    hold_token = Column(String(36), unique=True, nullable=False)
+    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
+    guest_id = Column(Integer, ForeignKey("guests.id"), nullable=False)
+    check_in_date = Column(DateTime, nullable=False)
+    check_out_date = Column(DateTime, nullable=False)
+    guests_count = Column(Integer, default=1)
+    status = Column(String(20), default="Held")
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    reservation_id = Column(Integer, ForeignKey("reservations.id"))  # Set when converted
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    room = relationship("Room")
+    guest = relationship("Guest")
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),
+        Index("idx_idempotency_keys_expires_at", "expires_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    key = Column(String(255), nullable=False)
+    scope = Column(String(100), nullable=False)  # Endpoint that owns the key
+    request_hash = Column(String(64), nullable=False)  # SHA-256 of the request body
+    status_code = Column(Integer)  # Committed together with the booking it answers
+    response_body = Column(JSONB)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -6,6 +6,9 @@ __all__ = [
     "GuestBase", "GuestCreate", "GuestUpdate", "Guest",
     "ReservationBase", "ReservationCreate", "ReservationUpdate", "Reservation",
     "CheckInRequest", "CheckOutRequest",
+    "BulkReservationRequest", "BulkSkippedReservation", "BulkOperationResult",
+    "GroupBookingRoom", "GroupBookingCreate", "GroupReservation", "ReservationGroup",
+    "RoomHoldCreate", "RoomHoldConfirm", "RoomHold",
     "AdminBase", "AdminCreate", "AdminLogin", "Admin",
     "Token", "TokenData",
     "AvailabilityCheck", "AvailabilityResponse",
@@ -139,6 +139,26 @@ class CheckInRequest(ReservationCreate):
 class CheckOutRequest(BaseModel):
     reservation_id: int
 
+class BulkReservationRequest(BaseModel):
+    reservation_ids: Optional[List[int]] = None
+    group_id: Optional[int] = None
+    
+    @validator('group_id', always=True)
+    def ids_or_group(cls, v, values):
+        has_ids = bool(values.get('reservation_ids'))
+        if has_ids == (v is not None):
+            raise ValueError('Provide either reservation_ids or group_id')
+        return v
+
+class BulkSkippedReservation(BaseModel):
+    reservation_id: int
+    reason: str
+
+class BulkOperationResult(BaseModel):
+    processed: List[int]
+    skipped: List[BulkSkippedReservation] = []
+    message: str
+
 class Reservation(ReservationBase):
     id: int
     guest_id: int
@@ -146,6 +166,7 @@ class Reservation(ReservationBase):
     total_price: Decimal
     actual_check_in: Optional[datetime] = None
     actual_check_out: Optional[datetime] = None
+    group_id: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     guest: Guest
@@ -154,6 +175,82 @@ class Reservation(ReservationBase):
     class Config:
         from_attributes = True
 
+# Group Booking Schemas
+class GroupBookingRoom(BaseModel):
+    room_id: int
+    guests_count: int = Field(default=1, gt=0)
+    special_requests: Optional[str] = None
+
+class GroupBookingCreate(BaseModel):
+    name: str = Field(..., max_length=200)
+    guest_id: int
+    check_in_date: datetime
+    check_out_date: datetime
+    rooms: List[GroupBookingRoom] = Field(..., min_length=1)
+    payment_method: Optional[str] = "Cash"
+    payment_status: Optional[str] = "Pending"
+    
+    @validator('check_out_date')
+    def check_out_after_check_in(cls, v, values):
+        if 'check_in_date' in values and v <= values['check_in_date']:
+            raise ValueError('check_out_date must be after check_in_date')
+        return v
+
+class GroupReservation(BaseModel):
+    id: int
+    room_id: int
+    guests_count: int
+    total_price: Decimal
+    status: str
+    
+    class Config:
+        from_attributes = True
+
+class ReservationGroup(BaseModel):
+    id: int
+    name: str
+    guest_id: int
+    check_in_date: datetime
+    check_out_date: datetime
+    created_at: datetime
+    reservations: List[GroupReservation] = []
+    
+    class Config:
+        from_attributes = True
+
+# Room Hold Schemas
+class RoomHoldCreate(BaseModel):
+    room_id: int
+    check_in_date: datetime
+    check_out_date: datetime
+    guests_count: int = Field(default=1, gt=0)
+    
+    @validator('check_out_date')
+    def check_out_after_check_in(cls, v, values):
+        if 'check_in_date' in values and v <= values['check_in_date']:
+            raise ValueError('check_out_date must be after check_in_date')
+        return v
+
+class RoomHoldConfirm(BaseModel):
+    payment_method: Optional[str] = "PayPal"
+    payment_status: Optional[str] = "Paid"
+    special_requests: Optional[str] = None
+
+class RoomHold(BaseModel):
+    hold_token: str
+    room_id: int
+    guest_id: int
+    check_in_date: datetime
+    check_out_date: datetime
+    guests_count: int
+    status: str
+    expires_at: datetime
+    reservation_id: Optional[int] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
 # Administrator Schemas
 class AdminBase(BaseModel):
     username: str = Field(..., max_length=50)
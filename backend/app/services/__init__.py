@@ -1,15 +1,32 @@
-from .room_service import RoomService
-from .guest_service import GuestService
-from .reservation_service import ReservationService
-from .auth_service import AuthService
+from .room_service import RoomService, AsyncRoomService
+from .room_catalog import RoomCatalog, room_catalog
+from .guest_service import GuestService, AsyncGuestService
+from .reservation_service import ReservationService, AsyncReservationService
+from .auth_service import AuthService, AsyncAuthService
 from .report_service import ReportService
-from .guest_auth_service import GuestAuthService
+from .guest_auth_service import GuestAuthService, AsyncGuestAuthService
+from .hold_service import HoldService, AsyncHoldService
+from .idempotency_service import IdempotencyService, IdempotencyConflictError
+from .version_service import VersionService, AsyncVersionService
 
 __all__ = [
     "RoomService",
+    "AsyncRoomService",
+    "RoomCatalog",
+    "room_catalog",
     "GuestService",
+    "AsyncGuestService",
     "ReservationService",
+    "AsyncReservationService",
     "AuthService",
+    "AsyncAuthService",
     "ReportService",
-    "GuestAuthService"
+    "GuestAuthService",
+    "AsyncGuestAuthService",
+    "HoldService",
+    "AsyncHoldService",
+    "IdempotencyService",
+    "IdempotencyConflictError",
+    "VersionService",
+    "AsyncVersionService"
 ]
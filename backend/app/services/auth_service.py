@@ -2,6 +2,9 @@ import bcrypt
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models import Administrator
@@ -80,3 +83,22 @@ class AuthService:
     def get_admin_by_username(db: Session, username: str) -> Optional[Administrator]:
         """Get admin by username"""
         return db.query(Administrator).filter(Administrator.username == username).first()
+
+
+class AsyncAuthService:
+    """Administrator authentication on the event loop (bcrypt runs in the thread pool)"""
+    
+    @staticmethod
+    async def get_admin_by_username(db: AsyncSession, username: str) -> Optional[Administrator]:
+        """Get administrator by username"""
+        return (await db.scalars(select(Administrator).where(Administrator.username == username))).first()
+    
+    @staticmethod
+    async def authenticate_admin(db: AsyncSession, username: str, password: str) -> Optional[Administrator]:
+        """Authenticate administrator"""
+        admin = await AsyncAuthService.get_admin_by_username(db, username)
+        if not admin:
+            return None
+        if not await run_in_threadpool(AuthService.verify_password, password, admin.password_hash):
+            return None
+        return admin
@@ -2,10 +2,16 @@
 Email Service
 Handles sending confirmation emails to guests
 """
+import logging
+import threading
+from fastapi import BackgroundTasks
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from typing import Dict, Any
+from typing import Dict, Any, Awaitable, Callable, List, Tuple
 from datetime import datetime
 from app.config import settings
+from app.diagnostics.prometheus import emails
+
+logger = logging.getLogger(__name__)
 
 # Email configuration with direct credentials
 conf = ConnectionConfig(
@@ -20,6 +26,26 @@ conf = ConnectionConfig(
     VALIDATE_CERTS=True
 )
 
+
+class EmailBacklog:
+    """Emails of running background tasks that have not been attempted yet"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pending = 0
+    
+    def add(self, count: int) -> None:
+        with self._lock:
+            self.pending += count
+    
+    def done(self, count: int = 1) -> None:
+        with self._lock:
+            self.pending -= count
+
+
+email_backlog = EmailBacklog()
+
+
 class EmailService:
     """Service for sending emails"""
     
@@ -209,11 +235,13 @@ class EmailService:
             
             fm = FastMail(conf)
             await fm.send_message(message)
+            emails.inc("confirmation", "sent")
             
             return True
             
         except Exception as e:
-            print(f"Error sending email: {str(e)}")
+            logger.error("Error sending confirmation email for reservation %s: %s", reservation_data.get('reservation_id'), e)
+            emails.inc("confirmation", "failed")
             return False
     
     @staticmethod
@@ -458,11 +486,13 @@ class EmailService:
             
             fm = FastMail(conf)
             await fm.send_message(message)
+            emails.inc("cancellation", "sent")
             
             return True
             
         except Exception as e:
-            print(f"Error sending cancellation email: {str(e)}")
+            logger.error("Error sending cancellation email for reservation %s: %s", reservation_data.get('reservation_id'), e)
+            emails.inc("cancellation", "failed")
             return False
     
     @staticmethod
@@ -681,11 +711,13 @@ class EmailService:
             
             fm = FastMail(conf)
             await fm.send_message(message)
+            emails.inc("checkin", "sent")
             
             return True
             
         except Exception as e:
-            print(f"Error sending check-in email: {str(e)}")
+            logger.error("Error sending check-in email for reservation %s: %s", reservation_data.get('reservation_id'), e)
+            emails.inc("checkin", "failed")
             return False
     
     @staticmethod
@@ -939,9 +971,71 @@ class EmailService:
             
             fm = FastMail(conf)
             await fm.send_message(message)
+            emails.inc("checkout", "sent")
             
             return True
             
         except Exception as e:
-            print(f"Error sending check-out email: {str(e)}")
+            logger.error("Error sending check-out email for reservation %s: %s", reservation_data.get('reservation_id'), e)
+            emails.inc("checkout", "failed")
             return False
+    
+    @staticmethod
+    async def send_batch(
+        send_email: Callable[[str, Dict[str, Any]], Awaitable[bool]],
+        messages: List[Tuple[str, Dict[str, Any]]]
+    ) -> int:
+        """
+        Send a batch of emails from a single background task
+        
+        Args:
+            send_email: One of the send_*_email methods
+            messages: List of (recipient_email, reservation_data) tuples
+            
+        Returns:
+            Number of emails sent successfully
+        """
+        sent = 0
+        for recipient_email, reservation_data in messages:
+            if await send_email(recipient_email, reservation_data):
+                sent += 1
+        return sent
+    
+    @staticmethod
+    def queue(
+        background_tasks: BackgroundTasks,
+        send_email: Callable[[str, Dict[str, Any]], Awaitable[bool]],
+        messages: List[Tuple[str, Dict[str, Any]]]
+    ) -> None:
+        """
+        Send emails after the response in a single background task
+        
+        The batch counts in email_backlog from the moment the task starts
+        until each email is attempted: a slow SMTP server shows up as a
+        growing backlog, which the readiness check reports. Counting starts
+        in the task so responses that never run it cannot leak the count.
+        
+        Args:
+            background_tasks: The request's BackgroundTasks
+            send_email: One of the send_*_email methods
+            messages: List of (recipient_email, reservation_data) tuples
+        """
+        remaining = len(messages)
+        
+        async def send_tracked(recipient_email: str, reservation_data: Dict[str, Any]) -> bool:
+            nonlocal remaining
+            try:
+                return await send_email(recipient_email, reservation_data)
+            finally:
+                remaining -= 1
+                email_backlog.done()
+        
+        async def send_all() -> int:
+            email_backlog.add(len(messages))
+            try:
+                return await EmailService.send_batch(send_tracked, messages)
+            finally:
+                # Only non-zero when the task was cancelled mid-batch
+                email_backlog.done(remaining)
+        
+        background_tasks.add_task(send_all)
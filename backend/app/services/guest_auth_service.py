@@ -1,15 +1,20 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from app.cache import cache, keys
 from app.models import Guest
 from app.schemas import GuestCreate
 from app.config import settings
-from app.database import get_db
+from app.database import get_async_db, get_db
+from app.diagnostics.structured_log import set_principal
 
 # JWT Bearer token
 security = HTTPBearer()
@@ -76,6 +81,7 @@ class GuestAuthService:
         
         db.add(db_guest)
         db.commit()
+        cache.invalidate(keys.GUESTS)
         db.refresh(db_guest)
         return db_guest
     
@@ -92,11 +98,8 @@ class GuestAuthService:
         return guest
     
     @staticmethod
-    def get_current_guest(
-        credentials: HTTPAuthorizationCredentials = Depends(security),
-        db: Session = Depends(get_db)
-    ) -> Guest:
-        """Get current authenticated guest from JWT token"""
+    def email_from_token(credentials: HTTPAuthorizationCredentials) -> str:
+        """Email of the guest a JWT belongs to. Raises 401 if it isn't a guest token"""
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="No se pudo validar las credenciales",
@@ -115,8 +118,66 @@ class GuestAuthService:
         except JWTError:
             raise credentials_exception
         
+        return email
+    
+    @staticmethod
+    def get_current_guest(
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+        db: Session = Depends(get_db)
+    ) -> Guest:
+        """Get current authenticated guest from JWT token"""
+        email = GuestAuthService.email_from_token(credentials)
+        
         guest = GuestAuthService.get_guest_by_email(db, email=email)
         if guest is None:
-            raise credentials_exception
-            
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="No se pudo validar las credenciales",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        set_principal(f"guest:{guest.id}")
+        return guest
+
+
+class AsyncGuestAuthService:
+    """
+    Guest authentication on the event loop
+    
+    bcrypt takes a few hundred milliseconds of CPU, so password checks run in
+    the thread pool instead of blocking the loop.
+    """
+    
+    @staticmethod
+    async def get_guest_by_email(db: AsyncSession, email: str) -> Optional[Guest]:
+        """Get guest by email"""
+        return (await db.scalars(select(Guest).where(Guest.email == email))).first()
+    
+    @staticmethod
+    async def authenticate_guest(db: AsyncSession, email: str, password: str) -> Optional[Guest]:
+        """Authenticate guest with email and password"""
+        guest = await AsyncGuestAuthService.get_guest_by_email(db, email)
+        if not guest or not guest.password_hash:
+            return None
+        if not await run_in_threadpool(GuestAuthService.verify_password, password, guest.password_hash):
+            return None
+        return guest
+    
+    @staticmethod
+    async def get_current_guest(
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+        db: AsyncSession = Depends(get_async_db)
+    ) -> Guest:
+        """Get current authenticated guest from JWT token"""
+        email = GuestAuthService.email_from_token(credentials)
+        
+        guest = await AsyncGuestAuthService.get_guest_by_email(db, email)
+        if guest is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="No se pudo validar las credenciales",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        set_principal(f"guest:{guest.id}")
         return guest
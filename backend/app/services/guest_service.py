@@ -1,7 +1,11 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
+from app import schemas
+from app.cache import cache, keys
 from app.models import Guest
 from app.schemas import GuestCreate, GuestUpdate
 
@@ -42,6 +46,7 @@ class GuestService:
         )
         db.add(db_guest)
         db.commit()
+        cache.invalidate(keys.GUESTS)
         db.refresh(db_guest)
         return db_guest
     
@@ -57,6 +62,7 @@ class GuestService:
             setattr(db_guest, field, value)
         
         db.commit()
+        cache.invalidate(keys.guest(guest_id), keys.GUESTS)
         db.refresh(db_guest)
         return db_guest
     
@@ -69,18 +75,23 @@ class GuestService:
         
         db.delete(db_guest)
         db.commit()
+        cache.invalidate(keys.guest(guest_id), keys.GUESTS)
         return True
     
     @staticmethod
     def search_guests(db: Session, query: str) -> List[Guest]:
         """Search guests by name, email or document"""
+        return db.query(Guest).filter(GuestService._search_filter(query)).all()
+    
+    @staticmethod
+    def _search_filter(query: str):
         search_pattern = f"%{query}%"
-        return db.query(Guest).filter(
+        return (
             Guest.first_name.ilike(search_pattern) |
             Guest.last_name.ilike(search_pattern) |
             Guest.email.ilike(search_pattern) |
             Guest.id_document.ilike(search_pattern)
-        ).all()
+        )
     
     @staticmethod
     def get_or_create_guest(db: Session, guest_data: GuestCreate) -> Guest:
@@ -97,3 +108,39 @@ class GuestService:
         
         # Create new guest
         return GuestService.create_guest(db, guest_data)
+
+
+def _guest_schemas(guests: List[Guest]) -> List[schemas.Guest]:
+    return [schemas.Guest.model_validate(guest) for guest in guests]
+
+
+class AsyncGuestService:
+    """
+    Read-only GuestService variants for endpoints served on the event loop
+    
+    Lookups and lists are cached as Guest schemas until GuestService changes
+    the guest. Searches are not cached: their keys hardly ever repeat.
+    """
+    
+    @staticmethod
+    @cache.cached("guests.all", tags=lambda guests, **_: [keys.GUESTS], convert=_guest_schemas)
+    async def get_all_guests(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[schemas.Guest]:
+        """Get all guests with pagination"""
+        return (await db.scalars(select(Guest).order_by(Guest.id).offset(skip).limit(limit))).all()
+    
+    @staticmethod
+    @cache.cached("guests.by_id", tags=lambda guest, guest_id: [keys.guest(guest_id)], convert=schemas.Guest.model_validate)
+    async def get_guest_by_id(db: AsyncSession, guest_id: int) -> Optional[schemas.Guest]:
+        """Get guest by ID"""
+        return await db.get(Guest, guest_id)
+    
+    @staticmethod
+    @cache.cached("guests.by_email", tags=lambda guest, **_: [keys.guest(guest.id)], convert=schemas.Guest.model_validate)
+    async def get_guest_by_email(db: AsyncSession, email: str) -> Optional[schemas.Guest]:
+        """Get guest by email"""
+        return (await db.scalars(select(Guest).where(Guest.email == email))).first()
+    
+    @staticmethod
+    async def search_guests(db: AsyncSession, query: str) -> List[Guest]:
+        """Search guests by name, email or document"""
+        return (await db.scalars(select(Guest).where(GuestService._search_filter(query)))).all()
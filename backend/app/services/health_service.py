@@ -0,0 +1,130 @@
+"""
+Health Service
+Liveness and readiness of this worker for the load balancer: readiness
+checks the database round trip, pool headroom, the hold expiry thread and
+the email backlog, and is cached briefly so frequent probes stay cheap.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.cache import invalidation_bus
+from app.config import settings
+from app.database import async_engine, pool_monitors
+from app.services.email_service import email_backlog
+from app.services.hold_service import hold_expiry_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessProbe:
+    """
+    Readiness of the worker, cached for HEALTH_CACHE_SECONDS
+
+    Not ready (503) while starting up (until the pools are warmed up and
+    the background jobs run), while shutting down, and when any check fails:
+      - database: SELECT 1 on the async pool within HEALTH_DB_TIMEOUT_MS and
+        faster than HEALTH_MAX_DB_RTT_MS
+      - pools: at least HEALTH_MIN_FREE_CONNECTIONS free in every pool
+      - scheduler: hold expiry thread alive and awake recently
+      - email_backlog: at most HEALTH_MAX_EMAIL_BACKLOG emails pending
+      - cache_listener: listening for other workers' cache invalidations,
+        when enabled (otherwise this worker could serve stale entries)
+    Concurrent probes share one check instead of each running their own.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._stopping = False
+        self._cached: Optional[Tuple[bool, Dict[str, Any]]] = None
+        self._cached_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def mark_started(self) -> None:
+        self._started = True
+
+    def mark_stopping(self) -> None:
+        self._stopping = True
+
+    async def check(self) -> Tuple[bool, Dict[str, Any]]:
+        """(ready, report). Must be awaited on the event loop"""
+        if not self._started or self._stopping:
+            status = "warming_up" if not self._started else "shutting_down"
+            return False, {"status": status, "checked_at": datetime.now().isoformat()}
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._cached is None or time.monotonic() - self._cached_at > settings.HEALTH_CACHE_SECONDS:
+                self._cached = await self._run_checks()
+                self._cached_at = time.monotonic()
+                if not self._cached[0]:
+                    logger.warning("Worker not ready: %s", self._failures(self._cached[1]))
+            return self._cached
+
+    @staticmethod
+    def _failures(report: Dict[str, Any]) -> str:
+        return ", ".join(name for name, check in report["checks"].items() if not check["ok"])
+
+    async def _run_checks(self) -> Tuple[bool, Dict[str, Any]]:
+        checks = {
+            "database": await self._check_database(),
+            "pools": self._check_pools(),
+            "scheduler": self._check_scheduler(),
+            "email_backlog": self._check_email_backlog(),
+        }
+        if invalidation_bus.running:
+            checks["cache_listener"] = {"ok": invalidation_bus.connected}
+        ready = all(check["ok"] for check in checks.values())
+        return ready, {
+            "status": "ready" if ready else "not_ready",
+            "checked_at": datetime.now().isoformat(),
+            "checks": checks,
+        }
+
+    @staticmethod
+    async def _check_database() -> Dict[str, Any]:
+        async def select_one():
+            async with async_engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(select_one(), timeout=settings.HEALTH_DB_TIMEOUT_MS / 1000)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"no response in {settings.HEALTH_DB_TIMEOUT_MS} ms"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)[:200]}
+        rtt_ms = round((time.perf_counter() - started) * 1000, 1)
+        return {"ok": rtt_ms <= settings.HEALTH_MAX_DB_RTT_MS, "rtt_ms": rtt_ms}
+
+    @staticmethod
+    def _check_pools() -> Dict[str, Any]:
+        pools = {}
+        for monitor in pool_monitors:
+            snapshot = monitor.snapshot()
+            if "size" not in snapshot:
+                continue
+            capacity = snapshot["size"] + settings.DB_MAX_OVERFLOW
+            pools[monitor.name] = {"checked_out": snapshot["checked_out"], "free": capacity - snapshot["checked_out"]}
+        ok = all(pool["free"] >= settings.HEALTH_MIN_FREE_CONNECTIONS for pool in pools.values())
+        return {"ok": ok, "pools": pools}
+
+    @staticmethod
+    def _check_scheduler() -> Dict[str, Any]:
+        age = hold_expiry_scheduler.heartbeat_age()
+        if age is None:
+            return {"ok": False, "error": "hold expiry thread not running"}
+        return {"ok": age <= settings.HEALTH_SCHEDULER_STALE_SECONDS, "heartbeat_age_seconds": round(age, 1)}
+
+    @staticmethod
+    def _check_email_backlog() -> Dict[str, Any]:
+        pending = email_backlog.pending
+        return {"ok": pending <= settings.HEALTH_MAX_EMAIL_BACKLOG, "pending": pending}
+
+
+readiness_probe = ReadinessProbe()
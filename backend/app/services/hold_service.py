@@ -0,0 +1,348 @@
+"""
+Room Hold Service
+Short-lived room holds that keep a room reserved while the guest completes
+the PayPal checkout, and the timer that expires them.
+"""
+import heapq
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.cache import cache, keys
+from app.config import settings
+from app.diagnostics.prometheus import bookings
+from app.models import HoldStatus, Reservation, ReservationStatus, Room, RoomHold
+from app.schemas import RoomHoldConfirm, RoomHoldCreate
+
+logger = logging.getLogger(__name__)
+
+
+class HoldExpiryScheduler:
+    """
+    Expires holds at their deadline using a min-heap of (expires_at, hold_id)
+
+    A single daemon thread sleeps until the earliest deadline, so the table is
+    never scanned periodically. Availability queries already ignore holds past
+    expires_at; the timer flips their status so they stop showing as Held and
+    drops the availability answers cached while they were active.
+    """
+
+    # Upper bound for a single wait so the thread notices shutdown promptly
+    MAX_WAIT_SECONDS = 30
+    # Wait between attempts to load the pending holds while the database is down
+    LOAD_RETRY_SECONDS = 5
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int]] = []
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._last_beat = 0.0
+
+    def start(self, session_factory: Callable[[], Session]) -> None:
+        """
+        Start the expiry thread, which first loads the pending holds
+
+        Nothing is queried here: an unreachable database must not stop the
+        app from starting (/health/ready reports it). The thread retries the
+        load every LOAD_RETRY_SECONDS until it succeeds.
+        """
+        if self._running:
+            return
+        self._session_factory = session_factory
+
+        with self._condition:
+            self._running = True
+            self._last_beat = time.monotonic()
+
+        self._thread = threading.Thread(target=self._run, name="hold-expiry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the expiry thread"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def schedule(self, hold_id: int, expires_at: datetime) -> None:
+        """Register a new hold deadline"""
+        with self._condition:
+            heapq.heappush(self._heap, (expires_at.timestamp(), hold_id))
+            # Wake the thread only if this deadline is now the earliest one
+            if self._heap[0][1] == hold_id:
+                self._condition.notify()
+
+    def pending_count(self) -> int:
+        """Number of deadlines waiting in the heap"""
+        with self._condition:
+            return len(self._heap)
+
+    def heartbeat_age(self) -> Optional[float]:
+        """
+        Seconds since the expiry thread last woke up, None when not running
+
+        The thread wakes at least every MAX_WAIT_SECONDS, so a much older
+        heartbeat means it died or is stuck expiring holds.
+        """
+        if not self._running or not (self._thread and self._thread.is_alive()):
+            return None
+        return time.monotonic() - self._last_beat
+
+    def _pop_due(self) -> List[int]:
+        """Wait for the next deadline and pop every hold that is due"""
+        with self._condition:
+            while self._running:
+                self._last_beat = time.monotonic()
+                now = datetime.now(timezone.utc).timestamp()
+                if self._heap and self._heap[0][0] <= now:
+                    due = []
+                    while self._heap and self._heap[0][0] <= now:
+                        due.append(heapq.heappop(self._heap)[1])
+                    return due
+
+                timeout = self.MAX_WAIT_SECONDS
+                if self._heap:
+                    timeout = min(timeout, self._heap[0][0] - now)
+                self._condition.wait(timeout=timeout)
+            return []
+
+    def _load_pending(self) -> bool:
+        """Add the deadlines of the holds already in the database. False if it failed"""
+        try:
+            db = self._session_factory()
+            try:
+                pending = db.query(RoomHold.id, RoomHold.expires_at).filter(
+                    RoomHold.status == HoldStatus.HELD
+                ).all()
+            finally:
+                db.close()
+        except Exception as exc:
+            logger.warning("Could not load pending room holds (%s), retrying in %d s", exc, self.LOAD_RETRY_SECONDS)
+            return False
+
+        # Holds created meanwhile were already scheduled; expiring twice is harmless
+        with self._condition:
+            for hold_id, expires_at in pending:
+                heapq.heappush(self._heap, (expires_at.timestamp(), hold_id))
+        return True
+
+    def _run(self) -> None:
+        while self._running and not self._load_pending():
+            with self._condition:
+                self._last_beat = time.monotonic()
+                if self._running:
+                    self._condition.wait(timeout=self.LOAD_RETRY_SECONDS)
+        while self._running:
+            due = self._pop_due()
+            if not due:
+                continue
+            db = self._session_factory()
+            try:
+                HoldService.expire_holds(db, due)
+            except Exception:
+                logger.exception("Failed to expire room holds %s", due)
+            finally:
+                db.close()
+
+
+hold_expiry_scheduler = HoldExpiryScheduler()
+
+
+class HoldService:
+
+    @staticmethod
+    def active_holds_filter(room_id: int, check_in: datetime, check_out: datetime):
+        """Filter for unexpired holds overlapping the given dates"""
+        return and_(
+            RoomHold.room_id == room_id,
+            RoomHold.status == HoldStatus.HELD,
+            RoomHold.expires_at > func.now(),
+            RoomHold.check_in_date < check_out,
+            RoomHold.check_out_date > check_in
+        )
+
+    @staticmethod
+    def has_active_hold(
+        db: Session,
+        room_id: int,
+        check_in: datetime,
+        check_out: datetime,
+        exclude_guest_id: Optional[int] = None
+    ) -> bool:
+        """Check if another guest holds the room for overlapping dates"""
+        query = db.query(RoomHold.id).filter(
+            HoldService.active_holds_filter(room_id, check_in, check_out)
+        )
+        if exclude_guest_id is not None:
+            query = query.filter(RoomHold.guest_id != exclude_guest_id)
+        return query.first() is not None
+
+    @staticmethod
+    def has_conflicting_reservation(db: Session, room_id: int, check_in: datetime, check_out: datetime) -> bool:
+        """Check for Pending/Active reservations overlapping the given dates"""
+        return db.query(Reservation.id).filter(
+            Reservation.room_id == room_id,
+            Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.ACTIVE]),
+            Reservation.check_in_date < check_out,
+            Reservation.check_out_date > check_in
+        ).first() is not None
+
+    @staticmethod
+    def get_hold_by_token(db: Session, hold_token: str) -> Optional[RoomHold]:
+        """Get hold by token"""
+        return db.query(RoomHold).filter(RoomHold.hold_token == hold_token).first()
+
+    @staticmethod
+    def create_hold(db: Session, hold: RoomHoldCreate, guest_id: int) -> RoomHold:
+        """Hold a room for the guest for ROOM_HOLD_MINUTES"""
+        # Lock the room row so concurrent holds for the same room serialize
+        room = db.query(Room).filter(Room.id == hold.room_id).with_for_update().first()
+        if not room:
+            raise ValueError("Room not found")
+
+        if hold.guests_count > room.capacity:
+            raise ValueError(f"Room capacity is {room.capacity} guests")
+
+        if HoldService.has_conflicting_reservation(db, hold.room_id, hold.check_in_date, hold.check_out_date):
+            raise ValueError("Room is not available for selected dates")
+
+        if HoldService.has_active_hold(db, hold.room_id, hold.check_in_date, hold.check_out_date, exclude_guest_id=guest_id):
+            raise ValueError("Room is temporarily held by another guest")
+
+        # A guest starting checkout again replaces their previous hold
+        db.query(RoomHold).filter(
+            HoldService.active_holds_filter(hold.room_id, hold.check_in_date, hold.check_out_date),
+            RoomHold.guest_id == guest_id
+        ).update({RoomHold.status: HoldStatus.RELEASED}, synchronize_session=False)
+
+        db_hold = RoomHold(
+            hold_token=str(uuid.uuid4()),
+            room_id=hold.room_id,
+            guest_id=guest_id,
+            check_in_date=hold.check_in_date,
+            check_out_date=hold.check_out_date,
+            guests_count=hold.guests_count,
+            status=HoldStatus.HELD,
+            expires_at=datetime.now(timezone.utc) + timedelta(minutes=settings.ROOM_HOLD_MINUTES)
+        )
+        db.add(db_hold)
+        db.commit()
+        db.refresh(db_hold)
+        cache.invalidate(*keys.bookings_changed([db_hold.room_id]))
+
+        hold_expiry_scheduler.schedule(db_hold.id, db_hold.expires_at)
+        return db_hold
+
+    @staticmethod
+    def release_hold(db: Session, hold_token: str, guest_id: int) -> bool:
+        """Release a hold before it expires"""
+        db_hold = HoldService.get_hold_by_token(db, hold_token)
+        if not db_hold or db_hold.guest_id != guest_id:
+            return False
+
+        if db_hold.status == HoldStatus.HELD:
+            room_id = db_hold.room_id
+            db_hold.status = HoldStatus.RELEASED
+            db.commit()
+            cache.invalidate(*keys.bookings_changed([room_id]))
+        return True
+
+    @staticmethod
+    def convert_hold(db: Session, hold_token: str, guest_id: int, confirm: RoomHoldConfirm) -> Reservation:
+        """
+        Turn a hold into a reservation once payment is complete
+
+        The hold row is locked and the reservation is inserted in the same
+        transaction that marks the hold Converted, so a hold converts exactly
+        once and never after it expired.
+        """
+        db_hold = db.query(RoomHold).filter(
+            RoomHold.hold_token == hold_token
+        ).with_for_update().populate_existing().first()
+        if not db_hold or db_hold.guest_id != guest_id:
+            raise ValueError("Hold not found")
+
+        # Retried confirmations return the reservation created the first time
+        if db_hold.status == HoldStatus.CONVERTED:
+            db.rollback()
+            return db.query(Reservation).filter(Reservation.id == db_hold.reservation_id).first()
+
+        if db_hold.status != HoldStatus.HELD or db_hold.expires_at <= datetime.now(timezone.utc):
+            db.rollback()
+            raise ValueError("Hold has expired, please select the room again")
+
+        room = db.query(Room).filter(Room.id == db_hold.room_id).with_for_update().first()
+        if not room:
+            db.rollback()
+            raise ValueError("Room not found")
+
+        if HoldService.has_conflicting_reservation(db, db_hold.room_id, db_hold.check_in_date, db_hold.check_out_date):
+            db.rollback()
+            raise ValueError("Room is not available for selected dates")
+
+        nights = (db_hold.check_out_date.date() - db_hold.check_in_date.date()).days
+        db_reservation = Reservation(
+            room_id=db_hold.room_id,
+            guest_id=db_hold.guest_id,
+            check_in_date=db_hold.check_in_date,
+            check_out_date=db_hold.check_out_date,
+            guests_count=db_hold.guests_count,
+            special_requests=confirm.special_requests,
+            total_price=room.price_per_night * max(nights, 1),
+            status=ReservationStatus.PENDING,
+            payment_method=confirm.payment_method,
+            payment_status=confirm.payment_status
+        )
+        db.add(db_reservation)
+        db.flush()
+
+        db_hold.status = HoldStatus.CONVERTED
+        db_hold.reservation_id = db_reservation.id
+
+        db.commit()
+        bookings.inc("online_hold")
+        db.refresh(db_reservation)
+        cache.invalidate(*keys.bookings_changed(
+            [db_reservation.room_id], [db_reservation.guest_id], [db_reservation.id]
+        ))
+        return db_reservation
+
+    @staticmethod
+    def expire_holds(db: Session, hold_ids: List[int]) -> int:
+        """Mark due holds as Expired. Returns number of expired holds"""
+        expired_rooms = db.execute(
+            update(RoomHold)
+            .where(
+                RoomHold.id.in_(hold_ids),
+                RoomHold.status == HoldStatus.HELD
+            )
+            .values(status=HoldStatus.EXPIRED)
+            .returning(RoomHold.room_id)
+        ).scalars().all()
+        db.commit()
+        if expired_rooms:
+            cache.invalidate(*keys.bookings_changed(expired_rooms))
+        return len(expired_rooms)
+
+
+class AsyncHoldService:
+    """HoldService checks used by the availability endpoints on the event loop"""
+
+    @staticmethod
+    async def has_active_hold(db: AsyncSession, room_id: int, check_in: datetime, check_out: datetime) -> bool:
+        """Check if any guest holds the room for overlapping dates"""
+        result = await db.execute(
+            select(RoomHold.id).where(HoldService.active_holds_filter(room_id, check_in, check_out)).limit(1)
+        )
+        return result.first() is not None
@@ -0,0 +1,165 @@
+"""
+Idempotency Service
+Stores the response of POST requests sent with an Idempotency-Key header so
+that client retries replay the original result instead of booking twice.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional, Type
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.cache import cache
+from app.config import settings
+from app.database import engine
+from app.diagnostics import prometheus as metrics
+from app.models import IdempotencyKey
+
+
+class IdempotencyConflictError(ValueError):
+    """Raised when a key is reused with another body or is still in progress"""
+    pass
+
+
+class IdempotencyService:
+
+    # Expired keys are purged at most once per interval per worker
+    PURGE_INTERVAL = timedelta(minutes=10)
+    _last_purge: Optional[datetime] = None
+
+    @staticmethod
+    def hash_request(payload: BaseModel) -> str:
+        """Hash the request body so a reused key with a different body is detected"""
+        body = json.dumps(payload.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_key(db: Session, scope: str, key: str) -> Optional[IdempotencyKey]:
+        """Get stored key for an endpoint"""
+        return db.query(IdempotencyKey).filter(
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key
+        ).first()
+
+    @staticmethod
+    def purge_expired(db: Session) -> int:
+        """Delete expired keys. Returns number of deleted rows"""
+        result = db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now(timezone.utc))
+        )
+        db.commit()
+        IdempotencyService._last_purge = datetime.now(timezone.utc)
+        return result.rowcount
+
+    @staticmethod
+    def lookup(db: Session, scope: str, key: str, request_hash: str) -> Optional[IdempotencyKey]:
+        """
+        Get the stored result of a completed request with this key
+
+        Returns:
+            The stored key (replay), or None if the request must run
+
+        Raises:
+            IdempotencyConflictError: If the key belongs to a different request body
+        """
+        now = datetime.now(timezone.utc)
+        last_purge = IdempotencyService._last_purge
+        if last_purge is None or now - last_purge > IdempotencyService.PURGE_INTERVAL:
+            IdempotencyService.purge_expired(db)
+
+        record = IdempotencyService.get_key(db, scope, key)
+        # Keys are only committed with their result; a key without one was
+        # left by a request that stored its result separately and never did
+        if record and (record.expires_at <= now or record.status_code is None):
+            db.delete(record)
+            db.commit()
+            record = None
+
+        if record and record.request_hash != request_hash:
+            raise IdempotencyConflictError("Idempotency-Key was already used with a different request")
+        return record
+
+    @staticmethod
+    def replay(record: IdempotencyKey) -> JSONResponse:
+        """Build the response for a retried request from the stored result"""
+        return JSONResponse(
+            content=record.response_body,
+            status_code=record.status_code,
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    @staticmethod
+    def execute(
+        db: Session,
+        scope: str,
+        key: str,
+        payload: BaseModel,
+        handler: Callable[[Session], Any],
+        response_schema: Type[BaseModel],
+        status_code: int
+    ) -> JSONResponse:
+        """
+        Run handler once per idempotency key
+
+        The key is inserted, handler(session) runs and its serialized result
+        is stored in one transaction, on a primary connection of its own:
+        the commits inside handler only release savepoints. If the worker
+        dies or the database fails midway nothing is kept, so a retry simply
+        runs again. A retry arriving while the first request runs waits for
+        it on the key's unique index, then replays its response. Cache
+        invalidations and business counters from handler are applied after
+        the final commit. If handler raises, the exception propagates to the
+        caller. `db` is closed after the lookup, so that a request holds one
+        connection at a time.
+        """
+        request_hash = IdempotencyService.hash_request(payload)
+        record = IdempotencyService.lookup(db, scope, key, request_hash)
+        # Give the request session's connection back before taking another
+        db.close()
+        if record:
+            return IdempotencyService.replay(record)
+
+        stored = False
+        # Invalidations and counters are released after the connection is,
+        # so publishing them doesn't hold a second one
+        with cache.deferred(), metrics.deferred():
+            with engine.connect() as connection:
+                transaction = connection.begin()
+                session = Session(bind=connection, join_transaction_mode="create_savepoint")
+                try:
+                    record = IdempotencyKey(
+                        key=key,
+                        scope=scope,
+                        request_hash=request_hash,
+                        expires_at=datetime.now(timezone.utc) + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+                    )
+                    session.add(record)
+                    try:
+                        session.flush()
+                    except IntegrityError:
+                        # A concurrent request with the key committed first
+                        transaction.rollback()
+                    else:
+                        result = handler(session)
+                        body = jsonable_encoder(response_schema.model_validate(result))
+                        record.status_code = status_code
+                        record.response_body = body
+                        session.commit()
+                        transaction.commit()
+                        stored = True
+                finally:
+                    session.close()
+
+        if not stored:
+            record = IdempotencyService.lookup(db, scope, key, request_hash)
+            db.close()
+            if record is None:
+                raise IdempotencyConflictError("A request with this Idempotency-Key is still being processed")
+            return IdempotencyService.replay(record)
+        return JSONResponse(content=body, status_code=status_code)
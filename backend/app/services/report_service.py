@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -17,6 +17,7 @@ from openpyxl.styles import Font, Alignment, PatternFill
 
 from app.models import Room, Reservation, ReservationStatus, RoomStatus
 from app.schemas import DashboardStats
+from app.services.reservation_service import ReservationService
 
 class ReportService:
     
@@ -39,13 +40,16 @@ class ReportService:
         
         # Today's check-ins/check-outs
         today = datetime.now().date()
+        today_start, today_end = ReservationService.day_range(today)
         today_checkins = db.query(func.count(Reservation.id)).filter(
-            func.date(Reservation.check_in_date) == today,
+            Reservation.check_in_date >= today_start,
+            Reservation.check_in_date < today_end,
             Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.ACTIVE])
         ).scalar()
         
         today_checkouts = db.query(func.count(Reservation.id)).filter(
-            func.date(Reservation.check_out_date) == today,
+            Reservation.check_out_date >= today_start,
+            Reservation.check_out_date < today_end,
             Reservation.status == ReservationStatus.ACTIVE
         ).scalar()
         
@@ -55,7 +59,8 @@ class ReportService:
         
         # Revenue
         revenue_today = db.query(func.sum(Reservation.total_price)).filter(
-            func.date(Reservation.created_at) == today,
+            Reservation.created_at >= today_start,
+            Reservation.created_at < today_end,
             Reservation.status != ReservationStatus.CANCELLED
         ).scalar() or Decimal('0.00')
         
@@ -109,10 +114,13 @@ class ReportService:
         elements.append(Spacer(1, 0.3 * inch))
         
         # Get data
-        reservations = db.query(Reservation).filter(
+        reservations = db.query(Reservation).options(
+            joinedload(Reservation.room),
+            joinedload(Reservation.guest)
+        ).filter(
             Reservation.check_in_date >= start_date,
             Reservation.check_in_date <= end_date
-        ).all()
+        ).order_by(Reservation.check_in_date).all()
         
         # Summary statistics
         stats = ReportService.get_dashboard_stats(db)
@@ -241,10 +249,13 @@ class ReportService:
             cell.alignment = Alignment(horizontal='center')
         
         # Get reservations
-        reservations = db.query(Reservation).filter(
+        reservations = db.query(Reservation).options(
+            joinedload(Reservation.room),
+            joinedload(Reservation.guest)
+        ).filter(
             Reservation.check_in_date >= start_date,
             Reservation.check_in_date <= end_date
-        ).all()
+        ).order_by(Reservation.check_in_date).all()
         
         # Write data
         for row, res in enumerate(reservations, 2):
@@ -1,20 +1,42 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from typing import List, Optional
-from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Select, and_, func, insert, select, update
+from typing import List, Optional, Tuple
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
 
-from app.models import Reservation, ReservationStatus, Room, RoomStatus
-from app.schemas import ReservationCreate, ReservationCreateAuthenticated, ReservationUpdate, CheckInRequest
+from app import schemas
+from app.cache import cache, keys
+from app.diagnostics.prometheus import bookings, cancellations, checkins, checkouts
+from app.models import Reservation, ReservationGroup, ReservationStatus, Room, RoomStatus, RoomHold, HoldStatus, Guest
+from app.schemas import ReservationCreate, ReservationCreateAuthenticated, ReservationUpdate, CheckInRequest, GroupBookingCreate
 from app.services.guest_service import GuestService
 from app.services.room_service import RoomService
 
 class ReservationService:
     
+    @staticmethod
+    def _with_details(query):
+        """
+        Eager-load what the Reservation response schema serializes
+        
+        Guest and room come in the same query and room images in one extra
+        query for the whole list, instead of lazy loads per reservation.
+        """
+        return query.options(
+            joinedload(Reservation.guest),
+            joinedload(Reservation.room).selectinload(Room.images)
+        )
+    
+    @staticmethod
+    def _with_details_where(*criteria) -> Select:
+        """SELECT of reservations with details, shared with AsyncReservationService"""
+        return ReservationService._with_details(select(Reservation)).where(*criteria)
+    
     @staticmethod
     def get_all_reservations(db: Session, skip: int = 0, limit: int = 100) -> List[Reservation]:
         """Get all reservations with pagination"""
-        return db.query(Reservation).offset(skip).limit(limit).all()
+        return ReservationService._with_details(db.query(Reservation)).order_by(Reservation.id).offset(skip).limit(limit).all()
     
     @staticmethod
     def get_reservation_by_id(db: Session, reservation_id: int) -> Optional[Reservation]:
@@ -49,17 +71,42 @@ class ReservationService:
         
         db.add(db_reservation)
         db.commit()
+        bookings.inc("reception")
         db.refresh(db_reservation)
+        cache.invalidate(*keys.bookings_changed([db_reservation.room_id], [db_reservation.guest_id], [db_reservation.id]))
         return db_reservation
     
     @staticmethod
     def create_reservation_authenticated(db: Session, reservation: ReservationCreateAuthenticated) -> Reservation:
-        """Create new reservation for authenticated user"""
+        """
+        Create new reservation for authenticated user
+        
+        The room row is locked while availability is checked, so concurrent
+        bookings and holds of the same room serialize (same checks as
+        HoldService.convert_hold and create_group_booking). A hold of the
+        same guest on these dates is converted (released if its dates
+        differ) in the same transaction.
+        """
+        from app.services.hold_service import HoldService
+        
         # Verify room exists
-        room = RoomService.get_room_by_id(db, reservation.room_id)
+        room = db.query(Room).filter(Room.id == reservation.room_id).with_for_update().first()
         if not room:
+            db.rollback()
             raise ValueError("Room not found")
         
+        conflicting_reservation = db.execute(
+            RoomService._conflicting_reservation_statement(
+                reservation.room_id, reservation.check_in_date, reservation.check_out_date
+            ).limit(1)
+        ).first()
+        if conflicting_reservation is not None or HoldService.has_active_hold(
+            db, reservation.room_id, reservation.check_in_date, reservation.check_out_date,
+            exclude_guest_id=reservation.guest_id
+        ):
+            db.rollback()
+            raise ValueError("Room is not available for selected dates")
+        
         # Create reservation
         db_reservation = Reservation(
             room_id=reservation.room_id,
@@ -75,10 +122,128 @@ class ReservationService:
         )
         
         db.add(db_reservation)
+        db.flush()
+        
+        # The guest's own hold was allowed above; it is used up by this
+        # booking instead of blocking the room for others until it expires
+        own_holds = and_(
+            HoldService.active_holds_filter(reservation.room_id, reservation.check_in_date, reservation.check_out_date),
+            RoomHold.guest_id == reservation.guest_id
+        )
+        db.query(RoomHold).filter(
+            own_holds,
+            RoomHold.check_in_date == reservation.check_in_date,
+            RoomHold.check_out_date == reservation.check_out_date
+        ).update(
+            {RoomHold.status: HoldStatus.CONVERTED, RoomHold.reservation_id: db_reservation.id},
+            synchronize_session=False
+        )
+        db.query(RoomHold).filter(own_holds).update({RoomHold.status: HoldStatus.RELEASED}, synchronize_session=False)
         db.commit()
+        bookings.inc("online")
         db.refresh(db_reservation)
+        cache.invalidate(*keys.bookings_changed([db_reservation.room_id], [db_reservation.guest_id], [db_reservation.id]))
         return db_reservation
     
+    @staticmethod
+    def create_group_booking(db: Session, group: GroupBookingCreate) -> ReservationGroup:
+        """
+        Create one reservation per room for a group (wedding, conference...)
+        
+        Availability for every room is validated with a single query and all
+        reservations are bulk-inserted in the same transaction, so either the
+        whole block is booked or nothing is.
+        """
+        room_ids = [item.room_id for item in group.rooms]
+        if len(set(room_ids)) != len(room_ids):
+            raise ValueError("Each room can only appear once in a group booking")
+        
+        if not db.query(Guest.id).filter(Guest.id == group.guest_id).first():
+            raise ValueError("Guest not found")
+        
+        # Lock the requested rooms (in id order to avoid deadlocks between groups)
+        rooms = {
+            room.id: room
+            for room in db.query(Room).filter(Room.id.in_(room_ids)).order_by(Room.id).with_for_update().all()
+        }
+        missing = [room_id for room_id in room_ids if room_id not in rooms]
+        if missing:
+            db.rollback()
+            raise ValueError(f"Rooms not found: {', '.join(str(room_id) for room_id in missing)}")
+        
+        for item in group.rooms:
+            room = rooms[item.room_id]
+            if item.guests_count > room.capacity:
+                message = f"Room {room.room_number} has capacity for {room.capacity} guests"
+                db.rollback()
+                raise ValueError(message)
+        
+        # Rooms with overlapping reservations or other guests' holds, in one query
+        booked = select(Reservation.room_id).where(
+            Reservation.room_id.in_(room_ids),
+            Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.ACTIVE]),
+            Reservation.check_in_date < group.check_out_date,
+            Reservation.check_out_date > group.check_in_date
+        )
+        held = select(RoomHold.room_id).where(
+            RoomHold.room_id.in_(room_ids),
+            RoomHold.status == HoldStatus.HELD,
+            RoomHold.expires_at > func.now(),
+            RoomHold.guest_id != group.guest_id,
+            RoomHold.check_in_date < group.check_out_date,
+            RoomHold.check_out_date > group.check_in_date
+        )
+        unavailable = sorted(db.execute(booked.union(held)).scalars().all())
+        if unavailable:
+            numbers = ", ".join(rooms[room_id].room_number for room_id in unavailable)
+            db.rollback()
+            raise ValueError(f"Rooms not available for selected dates: {numbers}")
+        
+        db_group = ReservationGroup(
+            name=group.name,
+            guest_id=group.guest_id,
+            check_in_date=group.check_in_date,
+            check_out_date=group.check_out_date
+        )
+        db.add(db_group)
+        db.flush()
+        
+        nights = max((group.check_out_date.date() - group.check_in_date.date()).days, 1)
+        db.execute(insert(Reservation), [
+            {
+                "room_id": item.room_id,
+                "guest_id": group.guest_id,
+                "group_id": db_group.id,
+                "check_in_date": group.check_in_date,
+                "check_out_date": group.check_out_date,
+                "guests_count": item.guests_count,
+                "special_requests": item.special_requests,
+                "total_price": rooms[item.room_id].price_per_night * nights,
+                "status": ReservationStatus.PENDING,
+                "payment_method": group.payment_method,
+                "payment_status": group.payment_status
+            }
+            for item in group.rooms
+        ])
+        
+        db.commit()
+        bookings.inc("group", amount=len(group.rooms))
+        db.refresh(db_group)
+        cache.invalidate(keys.group(db_group.id), *keys.bookings_changed(room_ids, [group.guest_id]))
+        return db_group
+    
+    @staticmethod
+    def get_group_by_id(db: Session, group_id: int) -> Optional[ReservationGroup]:
+        """Get reservation group by ID"""
+        return db.query(ReservationGroup).filter(ReservationGroup.id == group_id).first()
+    
+    @staticmethod
+    def get_reservations_by_group(db: Session, group_id: int) -> List[Reservation]:
+        """Get all reservations of a group booking"""
+        return ReservationService._with_details(db.query(Reservation)).filter(
+            Reservation.group_id == group_id
+        ).order_by(Reservation.id).all()
+    
     @staticmethod
     def check_in(db: Session, check_in_request: CheckInRequest) -> Reservation:
         """Process check-in"""
@@ -104,7 +269,9 @@ class ReservationService:
         RoomService.update_room_status(db, check_in_request.room_id, RoomStatus.OCCUPIED)
         
         db.commit()
+        checkins.inc("walk_in")
         db.refresh(reservation)
+        cache.invalidate(*keys.bookings_changed([reservation.room_id], [reservation.guest_id], [reservation.id]))
         return reservation
     
     @staticmethod
@@ -142,7 +309,9 @@ class ReservationService:
         RoomService.update_room_status(db, reservation.room_id, RoomStatus.OCCUPIED)
         
         db.commit()
+        checkins.inc("reservation")
         db.refresh(reservation)
+        cache.invalidate(*keys.bookings_changed([reservation.room_id], [reservation.guest_id], [reservation.id]))
         return reservation
     
     @staticmethod
@@ -163,9 +332,146 @@ class ReservationService:
         RoomService.update_room_status(db, reservation.room_id, RoomStatus.AVAILABLE)
         
         db.commit()
+        checkouts.inc("single")
         db.refresh(reservation)
+        cache.invalidate(*keys.bookings_changed([reservation.room_id], [reservation.guest_id], [reservation.id]))
         return reservation
     
+    @staticmethod
+    def _lock_bulk_targets(
+        db: Session,
+        reservation_ids: Optional[List[int]],
+        group_id: Optional[int]
+    ) -> Tuple[List[int], list]:
+        """Lock the reservations targeted by a bulk operation"""
+        query = db.query(
+            Reservation.id, Reservation.room_id, Reservation.guest_id, Reservation.status, Reservation.check_in_date
+        )
+        if group_id is not None:
+            query = query.filter(Reservation.group_id == group_id)
+            requested = None
+        else:
+            query = query.filter(Reservation.id.in_(reservation_ids))
+            requested = list(dict.fromkeys(reservation_ids))
+        
+        rows = query.order_by(Reservation.id).with_for_update().all()
+        if requested is None:
+            requested = [row.id for row in rows]
+        return requested, rows
+    
+    @staticmethod
+    def _invalidate_bulk(rows: list) -> None:
+        """Drop cached values of reservations and rooms changed by a bulk UPDATE"""
+        room_ids = {row.room_id for row in rows}
+        tags = keys.bookings_changed(room_ids, [row.guest_id for row in rows], [row.id for row in rows])
+        for room_id in room_ids:
+            tags += keys.room_changed(room_id)
+        cache.invalidate(*tags)
+    
+    @staticmethod
+    def _load_for_notification(db: Session, reservation_ids: List[int]) -> List[Reservation]:
+        """Load processed reservations with guest and room in one query"""
+        if not reservation_ids:
+            return []
+        return db.query(Reservation).options(
+            joinedload(Reservation.guest),
+            joinedload(Reservation.room)
+        ).filter(Reservation.id.in_(reservation_ids)).order_by(Reservation.id).all()
+    
+    @staticmethod
+    def bulk_check_in(
+        db: Session,
+        reservation_ids: Optional[List[int]] = None,
+        group_id: Optional[int] = None
+    ) -> Tuple[List[Reservation], List[dict]]:
+        """
+        Check in many reservations at once (tour buses, group arrivals)
+        
+        Reservations and rooms are updated with one UPDATE each inside a single
+        transaction. Reservations that cannot be checked in are skipped.
+        Returns the checked-in reservations and the skipped ones with a reason.
+        """
+        requested, rows = ReservationService._lock_bulk_targets(db, reservation_ids, group_id)
+        found = {row.id: row for row in rows}
+        today = datetime.now().date()
+        
+        eligible = []
+        skipped = []
+        for reservation_id in requested:
+            row = found.get(reservation_id)
+            if row is None:
+                skipped.append({"reservation_id": reservation_id, "reason": "Reservation not found"})
+            elif row.status != ReservationStatus.PENDING:
+                skipped.append({"reservation_id": reservation_id, "reason": f"Reservation is {row.status}"})
+            elif row.check_in_date.date() > today:
+                skipped.append({"reservation_id": reservation_id, "reason": "Check-in date has not arrived yet"})
+            else:
+                eligible.append(row)
+        
+        if eligible:
+            db.execute(
+                update(Reservation)
+                .where(Reservation.id.in_([row.id for row in eligible]))
+                .values(status=ReservationStatus.ACTIVE, actual_check_in=datetime.now())
+                .execution_options(synchronize_session=False)
+            )
+            db.execute(
+                update(Room)
+                .where(Room.id.in_(sorted({row.room_id for row in eligible})))
+                .values(status=RoomStatus.OCCUPIED)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        ReservationService._invalidate_bulk(eligible)
+        checkins.inc("bulk", amount=len(eligible))
+        
+        return ReservationService._load_for_notification(db, [row.id for row in eligible]), skipped
+    
+    @staticmethod
+    def bulk_check_out(
+        db: Session,
+        reservation_ids: Optional[List[int]] = None,
+        group_id: Optional[int] = None
+    ) -> Tuple[List[Reservation], List[dict]]:
+        """
+        Check out many reservations at once
+        
+        Same transaction shape as bulk_check_in: one UPDATE for reservations,
+        one for rooms. Returns the completed reservations and the skipped ones.
+        """
+        requested, rows = ReservationService._lock_bulk_targets(db, reservation_ids, group_id)
+        found = {row.id: row for row in rows}
+        
+        eligible = []
+        skipped = []
+        for reservation_id in requested:
+            row = found.get(reservation_id)
+            if row is None:
+                skipped.append({"reservation_id": reservation_id, "reason": "Reservation not found"})
+            elif row.status != ReservationStatus.ACTIVE:
+                skipped.append({"reservation_id": reservation_id, "reason": "Reservation is not active"})
+            else:
+                eligible.append(row)
+        
+        if eligible:
+            db.execute(
+                update(Reservation)
+                .where(Reservation.id.in_([row.id for row in eligible]))
+                .values(status=ReservationStatus.COMPLETED, actual_check_out=datetime.now())
+                .execution_options(synchronize_session=False)
+            )
+            db.execute(
+                update(Room)
+                .where(Room.id.in_(sorted({row.room_id for row in eligible})))
+                .values(status=RoomStatus.AVAILABLE)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        ReservationService._invalidate_bulk(eligible)
+        checkouts.inc("bulk", amount=len(eligible))
+        
+        return ReservationService._load_for_notification(db, [row.id for row in eligible]), skipped
+    
     @staticmethod
     def cancel_reservation(db: Session, reservation_id: int) -> Reservation:
         """Cancel reservation"""
@@ -183,7 +489,9 @@ class ReservationService:
             RoomService.update_room_status(db, reservation.room_id, RoomStatus.AVAILABLE)
         
         db.commit()
+        cancellations.inc("manual")
         db.refresh(reservation)
+        cache.invalidate(*keys.bookings_changed([reservation.room_id], [reservation.guest_id], [reservation.id]))
         return reservation
     
     @staticmethod
@@ -209,49 +517,67 @@ class ReservationService:
         
         db.commit()
         db.refresh(db_reservation)
+        cache.invalidate(*keys.bookings_changed([db_reservation.room_id], [db_reservation.guest_id], [reservation_id]))
         return db_reservation
     
     @staticmethod
     def get_reservations_by_guest(db: Session, guest_id: int) -> List[Reservation]:
         """Get all reservations for a guest"""
-        return db.query(Reservation).filter(Reservation.guest_id == guest_id).all()
+        return ReservationService._with_details(db.query(Reservation)).filter(Reservation.guest_id == guest_id).all()
     
     @staticmethod
     def get_reservations_by_room(db: Session, room_id: int) -> List[Reservation]:
         """Get all reservations for a room"""
-        return db.query(Reservation).filter(Reservation.room_id == room_id).all()
+        return ReservationService._with_details(db.query(Reservation)).filter(Reservation.room_id == room_id).all()
     
     @staticmethod
     def get_active_reservations(db: Session) -> List[Reservation]:
         """Get all active reservations"""
-        return db.query(Reservation).filter(Reservation.status == ReservationStatus.ACTIVE).all()
+        return ReservationService._with_details(db.query(Reservation)).filter(Reservation.status == ReservationStatus.ACTIVE).all()
     
     @staticmethod
     def get_pending_reservations(db: Session) -> List[Reservation]:
         """Get all pending reservations"""
-        return db.query(Reservation).filter(Reservation.status == ReservationStatus.PENDING).all()
+        return ReservationService._with_details(db.query(Reservation)).filter(Reservation.status == ReservationStatus.PENDING).all()
+    
+    @staticmethod
+    def day_range(day: date) -> Tuple[datetime, datetime]:
+        """
+        Half-open [start, end) bounds of a calendar day
+        
+        Comparing a column against these bounds matches the same rows as
+        func.date(column) == day but lets PostgreSQL use an index on the column.
+        """
+        start = datetime.combine(day, time.min)
+        return start, start + timedelta(days=1)
     
     @staticmethod
     def get_todays_checkins(db: Session) -> List[Reservation]:
         """Get today's check-ins"""
-        today = datetime.now().date()
-        return db.query(Reservation).filter(
-            and_(
-                func.date(Reservation.check_in_date) == today,
-                Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.ACTIVE])
-            )
-        ).all()
+        return db.scalars(ReservationService._todays_checkins_statement()).all()
+    
+    @staticmethod
+    def _todays_checkins_statement() -> Select:
+        start, end = ReservationService.day_range(datetime.now().date())
+        return ReservationService._with_details_where(
+            Reservation.check_in_date >= start,
+            Reservation.check_in_date < end,
+            Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.ACTIVE])
+        )
     
     @staticmethod
     def get_todays_checkouts(db: Session) -> List[Reservation]:
         """Get today's check-outs"""
-        today = datetime.now().date()
-        return db.query(Reservation).filter(
-            and_(
-                func.date(Reservation.check_out_date) == today,
-                Reservation.status == ReservationStatus.ACTIVE
-            )
-        ).all()
+        return db.scalars(ReservationService._todays_checkouts_statement()).all()
+    
+    @staticmethod
+    def _todays_checkouts_statement() -> Select:
+        start, end = ReservationService.day_range(datetime.now().date())
+        return ReservationService._with_details_where(
+            Reservation.check_out_date >= start,
+            Reservation.check_out_date < end,
+            Reservation.status == ReservationStatus.ACTIVE
+        )
     
     @staticmethod
     def get_reservations_by_date_range(
@@ -260,9 +586,11 @@ class ReservationService:
         end_date: datetime
     ) -> List[Reservation]:
         """Get reservations within date range"""
-        return db.query(Reservation).filter(
+        return ReservationService._with_details(db.query(Reservation)).filter(
             and_(
                 Reservation.check_in_date >= start_date,
+                # Implied by check_out_date <= end_date; bounds the index range scan
+                Reservation.check_in_date < end_date,
                 Reservation.check_out_date <= end_date
             )
         ).all()
@@ -275,23 +603,26 @@ class ReservationService:
         """
         now = datetime.now()
         
-        # Find Pending reservations where check-in date has passed (more than 24 hours)
-        expired_reservations = db.query(Reservation).filter(
-            and_(
+        # Pending reservations whose check-in passed more than 24 hours ago, in one UPDATE
+        cancelled = db.execute(
+            update(Reservation)
+            .where(
                 Reservation.status == ReservationStatus.PENDING,
                 Reservation.check_in_date < now - timedelta(hours=24)
             )
+            .values(status=ReservationStatus.CANCELLED)
+            .returning(Reservation.id, Reservation.room_id, Reservation.guest_id)
+            .execution_options(synchronize_session=False)
         ).all()
         
-        count = 0
-        for reservation in expired_reservations:
-            reservation.status = ReservationStatus.CANCELLED
-            count += 1
-        
-        if count > 0:
+        if cancelled:
             db.commit()
+            cache.invalidate(*keys.bookings_changed(
+                [row.room_id for row in cancelled], [row.guest_id for row in cancelled], [row.id for row in cancelled]
+            ))
+            cancellations.inc("no_show", amount=len(cancelled))
         
-        return count
+        return len(cancelled)
     
     @staticmethod
     def auto_complete_overdue_checkouts(db: Session) -> int:
@@ -302,28 +633,34 @@ class ReservationService:
         now = datetime.now()
         
         # Find Active reservations where check-out date has passed
-        overdue_reservations = db.query(Reservation).filter(
+        overdue = db.query(Reservation.id, Reservation.room_id, Reservation.guest_id).filter(
             and_(
                 Reservation.status == ReservationStatus.ACTIVE,
                 Reservation.check_out_date < now
             )
-        ).all()
+        ).with_for_update().all()
         
-        count = 0
-        for reservation in overdue_reservations:
-            reservation.status = ReservationStatus.COMPLETED
-            reservation.actual_check_out = now
-            
-            # Free up the room
-            if reservation.room:
-                RoomService.update_room_status(db, reservation.room_id, RoomStatus.AVAILABLE)
-            
-            count += 1
+        if not overdue:
+            return 0
         
-        if count > 0:
-            db.commit()
+        # Complete them and free their rooms with one UPDATE each
+        db.execute(
+            update(Reservation)
+            .where(Reservation.id.in_([row.id for row in overdue]))
+            .values(status=ReservationStatus.COMPLETED, actual_check_out=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(Room)
+            .where(Room.id.in_(sorted({row.room_id for row in overdue})))
+            .values(status=RoomStatus.AVAILABLE)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        ReservationService._invalidate_bulk(overdue)
+        checkouts.inc("overdue", amount=len(overdue))
         
-        return count
+        return len(overdue)
     
     @staticmethod
     def process_expired_reservations(db: Session) -> dict:
@@ -339,3 +676,100 @@ class ReservationService:
             'completed_overdue': completed,
             'total_processed': cancelled + completed
         }
+
+
+def _reservation_schemas(reservations: List[Reservation]) -> List[schemas.Reservation]:
+    return [schemas.Reservation.model_validate(reservation) for reservation in reservations]
+
+
+def _reservation_tags(reservations: List[schemas.Reservation]) -> List[str]:
+    """Each reservation and the guest and room shown with it"""
+    tags = []
+    for reservation in reservations:
+        tags += [keys.reservation(reservation.id), keys.guest(reservation.guest_id), keys.room(reservation.room_id)]
+    return tags
+
+
+class AsyncReservationService:
+    """
+    Read-only ReservationService variants for endpoints served on the event loop
+    
+    Guest, room and room images are always eager-loaded, since an
+    AsyncSession can't lazy-load them while the response is serialized.
+    Single reservations and the per-guest and per-group lists are cached as
+    Reservation schemas; the status lists change with every check-in and
+    are not.
+    """
+    
+    @staticmethod
+    async def _all(db: AsyncSession, statement: Select) -> List[Reservation]:
+        return (await db.scalars(statement)).all()
+    
+    @staticmethod
+    async def get_all_reservations(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Reservation]:
+        """Get all reservations with pagination"""
+        return await AsyncReservationService._all(
+            db, ReservationService._with_details_where().order_by(Reservation.id).offset(skip).limit(limit)
+        )
+    
+    @staticmethod
+    @cache.cached(
+        "reservations.by_id",
+        tags=lambda reservation, **_: _reservation_tags([reservation]),
+        convert=schemas.Reservation.model_validate
+    )
+    async def get_reservation_by_id(db: AsyncSession, reservation_id: int) -> Optional[schemas.Reservation]:
+        """Get reservation by ID, with details"""
+        return (await db.scalars(ReservationService._with_details_where(Reservation.id == reservation_id))).first()
+    
+    @staticmethod
+    @cache.cached(
+        "reservations.by_group",
+        tags=lambda reservations, group_id: [keys.group(group_id), *_reservation_tags(reservations)],
+        convert=_reservation_schemas
+    )
+    async def get_reservations_by_group(db: AsyncSession, group_id: int) -> List[schemas.Reservation]:
+        """Get all reservations of a group booking"""
+        return await AsyncReservationService._all(
+            db, ReservationService._with_details_where(Reservation.group_id == group_id).order_by(Reservation.id)
+        )
+    
+    @staticmethod
+    @cache.cached(
+        "reservations.by_guest",
+        tags=lambda reservations, guest_id: [keys.guest_reservations(guest_id), *_reservation_tags(reservations)],
+        convert=_reservation_schemas
+    )
+    async def get_reservations_by_guest(db: AsyncSession, guest_id: int) -> List[schemas.Reservation]:
+        """Get all reservations for a guest"""
+        return await AsyncReservationService._all(db, ReservationService._with_details_where(Reservation.guest_id == guest_id))
+    
+    @staticmethod
+    async def get_reservations_by_room(db: AsyncSession, room_id: int) -> List[Reservation]:
+        """Get all reservations for a room"""
+        return await AsyncReservationService._all(db, ReservationService._with_details_where(Reservation.room_id == room_id))
+    
+    @staticmethod
+    async def get_active_reservations(db: AsyncSession) -> List[Reservation]:
+        """Get all active reservations"""
+        return await AsyncReservationService._all(
+            db, ReservationService._with_details_where(Reservation.status == ReservationStatus.ACTIVE)
+        )
+    
+    @staticmethod
+    async def get_pending_reservations(db: AsyncSession) -> List[Reservation]:
+        """Get all pending reservations"""
+        return await AsyncReservationService._all(
+            db, ReservationService._with_details_where(Reservation.status == ReservationStatus.PENDING)
+        )
+    
+    @staticmethod
+    async def get_todays_checkins(db: AsyncSession) -> List[Reservation]:
+        """Get today's check-ins"""
+        return await AsyncReservationService._all(db, ReservationService._todays_checkins_statement())
+    
+    @staticmethod
+    async def get_todays_checkouts(db: AsyncSession) -> List[Reservation]:
+        """Get today's check-outs"""
+        return await AsyncReservationService._all(db, ReservationService._todays_checkouts_statement())
+
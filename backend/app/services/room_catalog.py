@@ -0,0 +1,156 @@
+"""
+Room Catalog
+In-memory snapshot of every room, kept as the JSON the room endpoints send,
+so browsing rooms costs neither queries nor serialization.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app import schemas
+from app.cache import cache, keys
+from app.config import settings
+from app.diagnostics.prometheus import cache_requests
+from app.models import Room
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """Every room of one catalog version, serialized as the Room schema"""
+
+    # Pages (skip, limit) whose JSON is kept; others are joined per request
+    MAX_PAGES = 256
+
+    def __init__(self, version: int, rooms: List[Tuple[int, bytes]]):
+        self.version = version
+        self.ids = [room_id for room_id, _ in rooms]
+        self._rooms = dict(rooms)
+        self._pages: Dict[Tuple[int, int], bytes] = {}
+        # Same rooms, same digest, in every worker
+        self.digest = hashlib.sha1(b"\n".join(body for _, body in rooms)).hexdigest()[:16]
+        self.built_at = time.monotonic()
+
+    def room(self, room_id: int) -> Optional[bytes]:
+        """JSON of one room, None if it doesn't exist"""
+        return self._rooms.get(room_id)
+
+    def page(self, skip: int, limit: int) -> bytes:
+        """JSON list of the rooms GET /rooms/ returns for skip and limit (ordered by id)"""
+        key = (max(skip, 0), max(limit, 0))
+        body = self._pages.get(key)
+        if body is None:
+            body = b"[" + b",".join(self._rooms[room_id] for room_id in self.ids[key[0]:key[0] + key[1]]) + b"]"
+            if len(self._pages) < self.MAX_PAGES:
+                self._pages[key] = body
+        return body
+
+
+class RoomCatalog:
+    """
+    Serves the room list and room details from a snapshot of all rooms
+
+    The snapshot is loaded with one query and serialized once. Any room
+    change (RoomService mutations, check-ins and check-outs changing a
+    status) invalidates the `rooms` cache tag, which bumps `version` and
+    drops the snapshot here and, through the invalidation bus, in every
+    other worker; the next request rebuilds it. Concurrent requests wait
+    for one rebuild instead of each running their own.
+
+    The same guards as the service cache apply: a snapshot loaded across an
+    invalidation, or within the replica fill guard after one, is served to
+    its request but not kept, and snapshots expire after CACHE_TTL_SECONDS
+    to pick up changes made outside the app.
+    """
+
+    def __init__(self, ttl_seconds: int, enabled: bool = True, fill_guard_seconds: float = 0):
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.fill_guard_seconds = fill_guard_seconds
+        # Bumped on every room change
+        self.version = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._invalidated_at = float("-inf")
+        self._lock = threading.Lock()
+        self._build_lock: Optional[asyncio.Lock] = None
+        self._build_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def invalidate(self, tags: Optional[FrozenSet[str]] = None) -> None:
+        """Drop the snapshot if `tags` include rooms (None: always). Subscribed to the cache"""
+        if tags is not None and keys.ROOMS not in tags:
+            return
+        with self._lock:
+            self.version += 1
+            self._snapshot = None
+            self._invalidated_at = time.monotonic()
+
+    async def snapshot(self, db: AsyncSession) -> CatalogSnapshot:
+        """The current snapshot, loaded with `db` if there is none"""
+        current = self._current()
+        if current is None:
+            async with self._rebuilding():
+                current = self._current()
+                if current is None:
+                    cache_requests.inc("rooms.catalog", "miss")
+                    return await self._build(db)
+        cache_requests.inc("rooms.catalog", "hit")
+        return current
+
+    def status(self) -> Dict[str, Any]:
+        current = self._current()
+        return {
+            "enabled": self.enabled,
+            "version": self.version,
+            "loaded": current is not None,
+            "rooms": len(current.ids) if current else None,
+            "digest": current.digest if current else None,
+            "age_seconds": round(time.monotonic() - current.built_at, 1) if current else None,
+        }
+
+    def _current(self) -> Optional[CatalogSnapshot]:
+        current = self._snapshot
+        if current is None or time.monotonic() - current.built_at > self.ttl_seconds:
+            return None
+        return current
+
+    def _rebuilding(self) -> asyncio.Lock:
+        # asyncio locks belong to one event loop; there is one per worker,
+        # but tests and scripts may run several in turn
+        loop = asyncio.get_running_loop()
+        if self._build_loop is not loop:
+            self._build_loop = loop
+            self._build_lock = asyncio.Lock()
+        return self._build_lock
+
+    async def _build(self, db: AsyncSession) -> CatalogSnapshot:
+        version = self.version
+        rooms = (await db.scalars(
+            select(Room).options(selectinload(Room.images)).order_by(Room.id)
+        )).all()
+        snapshot = CatalogSnapshot(version, [
+            (room.id, schemas.Room.model_validate(room).model_dump_json().encode()) for room in rooms
+        ])
+        with self._lock:
+            if (
+                self.enabled
+                and self.version == version
+                and time.monotonic() - self._invalidated_at >= self.fill_guard_seconds
+            ):
+                self._snapshot = snapshot
+        logger.debug("Room catalog version %d loaded: %d rooms", version, len(rooms))
+        return snapshot
+
+
+room_catalog = RoomCatalog(
+    settings.CACHE_TTL_SECONDS,
+    enabled=settings.CACHE_ENABLED,
+    fill_guard_seconds=cache.fill_guard_seconds
+)
+cache.subscribe(room_catalog.invalidate)
@@ -1,9 +1,12 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import Select, and_, select
 from datetime import datetime, timedelta
 from typing import List, Optional
 from decimal import Decimal
 
+from app import schemas
+from app.cache import cache, keys
 from app.models import Room, RoomImage, RoomStatus, RoomType
 from app.schemas import RoomCreate, RoomUpdate
 
@@ -12,7 +15,7 @@ class RoomService:
     @staticmethod
     def get_all_rooms(db: Session, skip: int = 0, limit: int = 100) -> List[Room]:
         """Get all rooms with pagination"""
-        return db.query(Room).offset(skip).limit(limit).all()
+        return db.query(Room).options(selectinload(Room.images)).order_by(Room.id).offset(skip).limit(limit).all()
     
     @staticmethod
     def get_room_by_id(db: Session, room_id: int) -> Optional[Room]:
@@ -54,6 +57,7 @@ class RoomService:
                 db.add(room_image)
         
         db.commit()
+        cache.invalidate(keys.ROOMS, keys.AVAILABILITY)
         db.refresh(db_room)
         return db_room
     
@@ -90,6 +94,7 @@ class RoomService:
                 db.add(room_image)
         
         db.commit()
+        cache.invalidate(*keys.room_changed(room_id))
         db.refresh(db_room)
         return db_room
     
@@ -102,6 +107,7 @@ class RoomService:
         
         db.delete(db_room)
         db.commit()
+        cache.invalidate(*keys.room_changed(room_id))
         return True
     
     @staticmethod
@@ -113,50 +119,58 @@ class RoomService:
         min_capacity: Optional[int] = None
     ) -> List[Room]:
         """Get available rooms for specific dates"""
-        from app.models import Reservation, ReservationStatus
+        return db.scalars(
+            RoomService._available_rooms_statement(check_in, check_out, room_type, min_capacity)
+        ).all()
+    
+    @staticmethod
+    def _available_rooms_statement(
+        check_in: datetime,
+        check_out: datetime,
+        room_type: Optional[str] = None,
+        min_capacity: Optional[int] = None
+    ) -> Select:
+        """Statement behind get_available_rooms, shared with AsyncRoomService"""
+        from app.models import RoomHold
+        from app.services.hold_service import HoldService
         
-        # Base query for available rooms
-        query = db.query(Room).filter(Room.status == "Available")
+        # Base query for available rooms (images are serialized with each room)
+        statement = select(Room).options(selectinload(Room.images)).where(Room.status == "Available")
         
         # Filter by room type
         if room_type:
-            query = query.filter(Room.type == room_type)
+            statement = statement.where(Room.type == room_type)
         
         # Filter by exact capacity (not greater than or equal)
         if min_capacity:
-            query = query.filter(Room.capacity == min_capacity)
-        
-        # Get all potentially available rooms
-        rooms = query.all()
-        
-        # Filter out rooms with conflicting reservations
-        available_rooms = []
-        for room in rooms:
-            conflicting_reservation = db.query(Reservation).filter(
-                and_(
-                    Reservation.room_id == room.id,
-                    Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.ACTIVE]),
-                    or_(
-                        and_(
-                            Reservation.check_in_date <= check_in,
-                            Reservation.check_out_date > check_in
-                        ),
-                        and_(
-                            Reservation.check_in_date < check_out,
-                            Reservation.check_out_date >= check_out
-                        ),
-                        and_(
-                            Reservation.check_in_date >= check_in,
-                            Reservation.check_out_date <= check_out
-                        )
-                    )
-                )
-            ).first()
-            
-            if not conflicting_reservation:
-                available_rooms.append(room)
+            statement = statement.where(Room.capacity == min_capacity)
+        
+        # Exclude rooms with an overlapping Pending/Active reservation or an
+        # active hold in the same statement (anti-join on the partial indexes)
+        conflicting_reservation = RoomService._conflicting_reservation_statement(Room.id, check_in, check_out)
+        active_hold = select(RoomHold.id).where(
+            HoldService.active_holds_filter(Room.id, check_in, check_out)
+        )
+        
+        return statement.where(
+            ~conflicting_reservation.exists(),
+            ~active_hold.exists()
+        )
+    
+    @staticmethod
+    def _conflicting_reservation_statement(room_id, check_in: datetime, check_out: datetime) -> Select:
+        """Pending/Active reservations of the room overlapping the dates"""
+        from app.models import Reservation, ReservationStatus
         
-        return available_rooms
+        # Two stays overlap when each starts before the other ends
+        return select(Reservation.id).where(
+            and_(
+                Reservation.room_id == room_id,
+                Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.ACTIVE]),
+                Reservation.check_in_date < check_out,
+                Reservation.check_out_date > check_in
+            )
+        )
     
     @staticmethod
     def check_room_availability(
@@ -166,39 +180,25 @@ class RoomService:
         check_out: datetime
     ) -> bool:
         """Check if a specific room is available"""
-        from app.models import Reservation, ReservationStatus
+        from app.services.hold_service import HoldService
         
         room = RoomService.get_room_by_id(db, room_id)
         if not room or room.status != RoomStatus.AVAILABLE:
             return False
         
-        conflicting_reservation = db.query(Reservation).filter(
-            and_(
-                Reservation.room_id == room_id,
-                Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.ACTIVE]),
-                or_(
-                    and_(
-                        Reservation.check_in_date <= check_in,
-                        Reservation.check_out_date > check_in
-                    ),
-                    and_(
-                        Reservation.check_in_date < check_out,
-                        Reservation.check_out_date >= check_out
-                    ),
-                    and_(
-                        Reservation.check_in_date >= check_in,
-                        Reservation.check_out_date <= check_out
-                    )
-                )
-            )
+        conflicting_reservation = db.execute(
+            RoomService._conflicting_reservation_statement(room_id, check_in, check_out).limit(1)
         ).first()
         
-        return conflicting_reservation is None
+        if conflicting_reservation is not None:
+            return False
+        
+        return not HoldService.has_active_hold(db, room_id, check_in, check_out)
     
     @staticmethod
     def get_rooms_by_status(db: Session, status: str) -> List[Room]:
         """Get rooms by status"""
-        return db.query(Room).filter(Room.status == status).all()
+        return db.query(Room).options(selectinload(Room.images)).filter(Room.status == status).all()
     
     @staticmethod
     def update_room_status(db: Session, room_id: int, status: str) -> Optional[Room]:
@@ -209,6 +209,7 @@ class RoomService:
         
         db_room.status = status
         db.commit()
+        cache.invalidate(*keys.room_changed(room_id))
         db.refresh(db_room)
         return db_room
     
@@ -222,6 +223,7 @@ class RoomService:
         )
         db.add(db_image)
         db.commit()
+        cache.invalidate(*keys.room_changed(room_id))
         db.refresh(db_image)
         return db_image
     
@@ -237,6 +239,93 @@ class RoomService:
         if not db_image:
             return False
         
+        room_id = db_image.room_id
         db.delete(db_image)
         db.commit()
+        cache.invalidate(*keys.room_changed(room_id))
         return True
+
+
+def _room_schemas(rooms: List[Room]) -> List[schemas.Room]:
+    return [schemas.Room.model_validate(room) for room in rooms]
+
+
+class AsyncRoomService:
+    """
+    Read-only RoomService variants for endpoints served on the event loop
+    
+    Statements are shared with RoomService. Everything the Room schema
+    serializes is eager-loaded, since an AsyncSession can't lazy-load.
+    Results are cached as Room schemas until RoomService, ReservationService
+    or HoldService change the rooms or bookings they depend on.
+    """
+    
+    @staticmethod
+    @cache.cached("rooms.all", tags=lambda rooms, **_: [keys.ROOMS], convert=_room_schemas)
+    async def get_all_rooms(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[schemas.Room]:
+        """Get all rooms with pagination"""
+        return (await db.scalars(
+            select(Room).options(selectinload(Room.images)).order_by(Room.id).offset(skip).limit(limit)
+        )).all()
+    
+    @staticmethod
+    @cache.cached("rooms.by_id", tags=lambda room, room_id: [keys.room(room_id)], convert=schemas.Room.model_validate)
+    async def get_room_by_id(db: AsyncSession, room_id: int) -> Optional[schemas.Room]:
+        """Get room by ID, with its images"""
+        return await db.get(Room, room_id, options=[selectinload(Room.images)])
+    
+    @staticmethod
+    @cache.cached("rooms.by_number", tags=lambda room, **_: [keys.room(room.id)], convert=schemas.Room.model_validate)
+    async def get_room_by_number(db: AsyncSession, room_number: str) -> Optional[schemas.Room]:
+        """Get room by room number, with its images"""
+        return (await db.scalars(
+            select(Room).options(selectinload(Room.images)).where(Room.room_number == room_number)
+        )).first()
+    
+    @staticmethod
+    @cache.cached("rooms.available", tags=lambda rooms, **_: [keys.AVAILABILITY], convert=_room_schemas)
+    async def get_available_rooms(
+        db: AsyncSession,
+        check_in: datetime,
+        check_out: datetime,
+        room_type: Optional[str] = None,
+        min_capacity: Optional[int] = None
+    ) -> List[schemas.Room]:
+        """Get available rooms for specific dates"""
+        return (await db.scalars(
+            RoomService._available_rooms_statement(check_in, check_out, room_type, min_capacity)
+        )).all()
+    
+    @staticmethod
+    @cache.cached("rooms.availability", tags=lambda available, room_id, **_: [keys.room_availability(room_id)])
+    async def check_room_availability(
+        db: AsyncSession,
+        room_id: int,
+        check_in: datetime,
+        check_out: datetime
+    ) -> bool:
+        """Check if a specific room is available"""
+        from app.services.hold_service import AsyncHoldService
+        
+        # Only the status: a Room loaded here without images would be served
+        # from the identity map to a later get_room_by_id
+        room_status = await db.scalar(select(Room.status).where(Room.id == room_id))
+        if room_status != RoomStatus.AVAILABLE:
+            return False
+        
+        conflicting_reservation = (await db.execute(
+            RoomService._conflicting_reservation_statement(room_id, check_in, check_out).limit(1)
+        )).first()
+        
+        if conflicting_reservation is not None:
+            return False
+        
+        return not await AsyncHoldService.has_active_hold(db, room_id, check_in, check_out)
+    
+    @staticmethod
+    @cache.cached("rooms.by_status", tags=lambda rooms, **_: [keys.ROOMS], convert=_room_schemas)
+    async def get_rooms_by_status(db: AsyncSession, status: str) -> List[schemas.Room]:
+        """Get rooms by status"""
+        return (await db.scalars(
+            select(Room).options(selectinload(Room.images)).where(Room.status == status)
+        )).all()
@@ -0,0 +1,139 @@
+"""
+Version Service
+Versions of the rows behind the read endpoints, used for their ETags. A
+version changes whenever one of its rows is inserted, updated or deleted,
+and is read with one aggregate query instead of loading the rows.
+"""
+from datetime import date
+from typing import Any, Tuple
+
+from sqlalchemy import ColumnElement, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Guest, ReservationGroup, Reservation, Room, RoomImage
+from app.services.reservation_service import ReservationService
+from app.services.room_catalog import room_catalog
+
+
+def _version(model, *criteria) -> ColumnElement:
+    """
+    Row count, latest change and sum of change times of the matching rows
+
+    The maximum alone could miss a change: two transactions can commit in
+    the opposite order of their now(). The sum still moves, since every
+    update raises one row's time, and the count catches deletions.
+    """
+    stamp = func.coalesce(model.updated_at, model.created_at) if hasattr(model, "updated_at") else model.created_at
+    return select(
+        func.concat_ws("/", func.count(), func.max(stamp), func.sum(func.extract("epoch", stamp)))
+    ).select_from(model).where(*criteria).scalar_subquery()
+
+
+def _page_version(model, skip: int, limit: int, *criteria) -> Tuple[ColumnElement, ColumnElement]:
+    """
+    Criteria for the rows on one page of a list ordered by id, and the sum
+    of their ids
+
+    Only the rows on the page are read. The ids are part of the version: a
+    row added or removed before the page shifts it onto other rows, which
+    may have been stamped at the same time as the ones they replace.
+    """
+    page = model.id.in_(select(model.id).where(*criteria).order_by(model.id).offset(skip).limit(limit))
+    return page, select(func.sum(model.id)).where(page).scalar_subquery()
+
+
+def _reservations_versions(*criteria) -> Tuple[ColumnElement, ColumnElement]:
+    """Versions of the matching reservations and of the guests they embed"""
+    return (
+        _version(Reservation, *criteria),
+        _version(Guest, Guest.id.in_(select(Reservation.guest_id).where(*criteria)))
+    )
+
+
+class VersionService:
+    """Versions for the endpoints using a sync Session (reports, group bookings)"""
+
+    @staticmethod
+    def rooms(db: Session) -> Tuple[Any, ...]:
+        """Rooms (without images), for reports"""
+        return tuple(db.execute(select(_version(Room))).one())
+
+    @staticmethod
+    def reports(db: Session) -> Tuple[Any, ...]:
+        """Everything the dashboard statistics and occupancy reports count, for today"""
+        row = db.execute(select(_version(Room), _version(Reservation), _version(Guest))).one()
+        return (date.today(), *row)
+
+    @staticmethod
+    def group(db: Session, group_id: int) -> Tuple[Any, ...]:
+        """A group booking and its reservations"""
+        return tuple(db.execute(select(
+            _version(ReservationGroup, ReservationGroup.id == group_id),
+            _version(Reservation, Reservation.group_id == group_id)
+        )).one())
+
+
+class AsyncVersionService:
+    """
+    Versions for the endpoints served on the event loop
+
+    Rooms are versioned by the room catalog digest, which covers images too
+    and costs nothing once the catalog is loaded. With the catalog disabled
+    every snapshot would be a full load, so the rooms and their images get
+    an aggregate version instead (images are only added and deleted).
+    """
+
+    @staticmethod
+    async def rooms(db: AsyncSession) -> Any:
+        """Every room, with images"""
+        if room_catalog.enabled:
+            return (await room_catalog.snapshot(db)).digest
+        return tuple((await db.execute(select(_version(Room), _version(RoomImage)))).one())
+
+    @staticmethod
+    async def guests(db: AsyncSession, *criteria) -> Tuple[Any, ...]:
+        """Guests matching the criteria (all of them by default)"""
+        return tuple((await db.execute(select(_version(Guest, *criteria)))).one())
+
+    @staticmethod
+    async def guests_page(db: AsyncSession, skip: int, limit: int) -> Tuple[Any, ...]:
+        """One page of the guest list"""
+        page, ids = _page_version(Guest, skip, limit)
+        return tuple((await db.execute(select(_version(Guest, page), ids))).one())
+
+    @staticmethod
+    async def reservations_page(db: AsyncSession, skip: int, limit: int) -> Tuple[Any, ...]:
+        """One page of the reservation list, with its guests and rooms"""
+        page, ids = _page_version(Reservation, skip, limit)
+        row = (await db.execute(select(*_reservations_versions(page), ids))).one()
+        return (*row, await AsyncVersionService.rooms(db))
+
+    @staticmethod
+    async def reservations(db: AsyncSession, *criteria) -> Tuple[Any, ...]:
+        """Reservations matching the criteria, with their guests and rooms"""
+        row = (await db.execute(select(*_reservations_versions(*criteria)))).one()
+        return (*row, await AsyncVersionService.rooms(db))
+
+    @staticmethod
+    async def guest_reservations(db: AsyncSession, guest_id: int) -> Tuple[Any, ...]:
+        """A guest and their reservations"""
+        row = (await db.execute(select(
+            _version(Guest, Guest.id == guest_id),
+            _version(Reservation, Reservation.guest_id == guest_id)
+        ))).one()
+        return (*row, await AsyncVersionService.rooms(db))
+
+    @staticmethod
+    async def todays_checkins(db: AsyncSession) -> Tuple[Any, ...]:
+        """Today's check-in list"""
+        return (date.today(), *await AsyncVersionService.reservations(
+            db, ReservationService._todays_checkins_statement().whereclause
+        ))
+
+    @staticmethod
+    async def todays_checkouts(db: AsyncSession) -> Tuple[Any, ...]:
+        """Today's check-out list"""
+        return (date.today(), *await AsyncVersionService.reservations(
+            db, ReservationService._todays_checkouts_statement().whereclause
+        ))
@@ -1,4 +1,4 @@
 # Build command for Render
 pip install -r requirements.txt
 
-# Start command is in render.yaml
+# Start command is in render.yaml (runs `alembic upgrade head` before uvicorn)
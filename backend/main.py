@@ -1,7 +1,12 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.cache import invalidation_bus
 from app.config import settings
-from app.database import engine, Base
+from app.database import (
+    SessionLocal, async_engine, engine, check_schema_version, pool_monitors, warm_up_async_pools, warm_up_pools
+)
 from app.controllers import (
     room_router,
     guest_router,
@@ -9,11 +14,22 @@ from app.controllers import (
     checkin_router,
     report_router,
     auth_router,
-    guest_auth_router
+    guest_auth_router,
+    hold_router,
+    metrics_router,
+    diagnostics_router,
+    health_router
 )
+from app.diagnostics import LoopBlockDetector, runtime_metrics
+from app.diagnostics.structured_log import configure_logging
+from app.middleware import (
+    AccessLogMiddleware, MemoryTrackingMiddleware, MetricsMiddleware, ProfilingMiddleware, ReadYourWritesMiddleware, SqlStatsMiddleware
+)
+from app.services.health_service import readiness_probe
+from app.services.hold_service import hold_expiry_scheduler
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# JSON lines log through a background writer thread
+configure_logging(settings.LOG_LEVEL, settings.LOG_FORMAT == "json", settings.LOG_FILE)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -24,6 +40,27 @@ app = FastAPI(
     redoc_url="/api/redoc"
 )
 
+loop_block_detector = LoopBlockDetector(settings.LOOP_BLOCK_THRESHOLD_MS)
+
+# Peak memory per route, only while the memory diagnostics are tracing
+app.add_middleware(MemoryTrackingMiddleware)
+
+# Admin-only sampling profile of a single request (X-Profile / ?profile=)
+app.add_middleware(ProfilingMiddleware)
+
+# Keep clients on the primary right after they write (only with replicas)
+if settings.replica_urls:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Statements and DB time per request, N+1 detection
+app.add_middleware(SqlStatsMiddleware)
+
+# Latency, status codes and in-flight requests per route (Prometheus)
+app.add_middleware(MetricsMiddleware)
+
+# Request id and one structured access log line per request
+app.add_middleware(AccessLogMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +68,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the frontend read the tag to send it back in If-None-Match
+    expose_headers=["ETag"],
 )
 
 # Include routers
@@ -41,7 +80,81 @@ app.include_router(guest_router, prefix="/api")
 app.include_router(reservation_router, prefix="/api")
 app.include_router(checkin_router, prefix="/api")
 app.include_router(report_router, prefix="/api")
+app.include_router(hold_router, prefix="/api")
+app.include_router(metrics_router, prefix="/api")
+app.include_router(diagnostics_router, prefix="/api")
+app.include_router(health_router)
+
+@app.on_event("startup")
+def verify_schema_version():
+    """Warn if migrations are pending (tables are managed by Alembic)"""
+    if settings.SCHEMA_VERSION_CHECK:
+        check_schema_version()
+
+@app.on_event("startup")
+def warm_up_connection_pools():
+    """Open DB connections before the first request (cold starts)"""
+    if settings.DB_POOL_WARMUP:
+        warm_up_pools()
+
+@app.on_event("startup")
+async def warm_up_async_connection_pools():
+    """Same for the async (asyncpg) pools"""
+    if settings.DB_POOL_WARMUP:
+        await warm_up_async_pools()
 
+@app.on_event("startup")
+def start_background_jobs():
+    """Start the room hold expiry timer"""
+    hold_expiry_scheduler.start(SessionLocal)
+
+@app.on_event("startup")
+def start_cache_invalidation_listener():
+    """Apply the cache invalidations of the other workers"""
+    if settings.CACHE_ENABLED and settings.CACHE_INVALIDATION_NOTIFY:
+        invalidation_bus.start(engine)
+
+@app.on_event("startup")
+async def start_loop_block_detector():
+    """Watch the event loop for blocking calls (debug only)"""
+    if settings.loop_block_detector_enabled:
+        loop_block_detector.start(asyncio.get_running_loop())
+
+@app.on_event("startup")
+async def start_runtime_metrics():
+    """Sample event loop lag, thread pool and DB pool usage"""
+    runtime_metrics.start(pool_monitors)
+
+@app.on_event("startup")
+def mark_ready():
+    """Last startup hook: pools are warm and background jobs run"""
+    readiness_probe.mark_started()
+
+@app.on_event("shutdown")
+def mark_shutting_down():
+    """First shutdown hook: fail readiness so the load balancer drains us"""
+    readiness_probe.mark_stopping()
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    """Stop background jobs"""
+    hold_expiry_scheduler.stop()
+    invalidation_bus.stop()
+
+@app.on_event("shutdown")
+async def close_async_pool():
+    """Close the asyncpg connections on the running loop"""
+    await async_engine.dispose()
+
+@app.on_event("shutdown")
+async def stop_runtime_metrics():
+    """Stop the runtime metrics sampler"""
+    await runtime_metrics.stop()
+
+@app.on_event("shutdown")
+def stop_loop_block_detector():
+    """Stop the event loop watchdog"""
+    loop_block_detector.stop()
 @app.get("/")
 def root():
     """Root endpoint"""
@@ -52,19 +165,14 @@ def root():
         "status": "running"
     }
 
-@app.get("/health")
-def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "environment": settings.ENVIRONMENT
-    }
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=settings.PORT,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        # Logging is configured by the app; requests are logged by AccessLogMiddleware
+        log_config=None,
+        access_log=False
     )
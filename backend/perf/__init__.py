@@ -0,0 +1,4 @@
+"""
+Performance tooling for the backend: query plan checks, synthetic data and
+benchmarks. Nothing here is imported by the application.
+"""
@@ -0,0 +1,377 @@
+"""
+Endpoint benchmark suite
+
+Drives the FastAPI app in-process through httpx.ASGITransport (no server,
+no network) against the local database, and measures the hot endpoints:
+room search and availability, reservation lists, the dashboard, guest
+search, guest login and the report exports.
+
+For every scenario it records p50/p95/p99 latency, throughput and the number
+of SQL statements per request, and compares them with a JSON baseline. A
+scenario regresses when p50 or p95 grows, or throughput drops, by more than
+--threshold, or when it runs more statements per request than the baseline.
+
+Latencies depend on the machine, so the baseline is not committed: record it
+on the base branch, then compare on your branch with the same dataset.
+
+Usage (from backend/, against a local database at head):
+    python -m perf.bench --load                       # load a perf.datagen dataset first
+    python -m perf.bench --update-baseline            # record perf/bench_baseline.json
+    python -m perf.bench                              # compare with the baseline
+    python -m perf.bench -k rooms -n 200 --concurrency 8
+"""
+import argparse
+import asyncio
+import gc
+import json
+import math
+import sys
+import threading
+import time as clock
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal, async_engine, engine
+from app.models import Administrator, Guest, Room, RoomStatus
+from app.schemas import AdminCreate
+from app.services import AuthService
+from perf.datagen import GUEST_PASSWORD, TRUNCATE_SQL, add_arguments, generate, spec_from_args
+
+BASELINE_FILE = Path(__file__).with_name("bench_baseline.json")
+DEFAULT_THRESHOLD = 0.20
+# Sub-millisecond differences are timer noise, not regressions
+MIN_LATENCY_SLACK_MS = 1.0
+BENCH_ADMIN = "perf-bench"
+DATASET_TABLES = ("rooms", "room_images", "guests", "reservations", "room_holds")
+
+
+class StatementCounter:
+    """Counts statements executed by the app engines, sync and async"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+
+    ENGINES = (engine, async_engine.sync_engine)
+
+    def __enter__(self) -> "StatementCounter":
+        for target in self.ENGINES:
+            event.listen(target, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for target in self.ENGINES:
+            event.remove(target, "before_cursor_execute", self)
+
+
+class Fixtures:
+    """Ids, names and credentials the scenarios rotate through"""
+
+    # Number of distinct values each scenario cycles through
+    ROTATION = 20
+
+    def __init__(self, db: Session):
+        self.today = date.today()
+        self.room_ids = [
+            room_id for (room_id,) in db.query(Room.id).filter(
+                Room.status != RoomStatus.MAINTENANCE
+            ).order_by(Room.id).limit(self.ROTATION)
+        ]
+        guests = db.query(Guest.id, Guest.email, Guest.last_name).filter(
+            Guest.password_hash.isnot(None)
+        ).order_by(Guest.id).limit(self.ROTATION).all()
+        if not self.room_ids or not guests:
+            raise SystemExit("The database has no rooms or registered guests; run with --load first")
+        self.guest_ids = [guest.id for guest in guests]
+        self.emails = [guest.email for guest in guests]
+        self.last_names = sorted({guest.last_name for guest in guests})
+        self.admin_token = self._admin_token(db)
+
+    @staticmethod
+    def _admin_token(db: Session) -> str:
+        if not db.query(Administrator.id).filter(Administrator.username == BENCH_ADMIN).first():
+            AuthService.create_admin(db, AdminCreate(
+                username=BENCH_ADMIN,
+                full_name="Benchmark",
+                email="perf-bench@example.com",
+                password=GUEST_PASSWORD
+            ))
+        return AuthService.create_access_token(data={"sub": BENCH_ADMIN})
+
+    def pick(self, values: List[Any], i: int) -> Any:
+        return values[i % len(values)]
+
+    def stay(self, i: int, nights: int = 3) -> Dict[str, str]:
+        """Dates 1-4 weeks ahead, shifting with the iteration"""
+        check_in = datetime.combine(self.today + timedelta(days=7 + i % self.ROTATION), time(15))
+        check_out = check_in + timedelta(days=nights)
+        return {"check_in": check_in.isoformat(), "check_out": check_out.isoformat()}
+
+    def last_week(self) -> Dict[str, str]:
+        return {
+            "start_date": (self.today - timedelta(days=7)).isoformat(),
+            "end_date": self.today.isoformat()
+        }
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Builds the httpx request arguments (url, params, json) for iteration i
+    request: Callable[[Fixtures, int], Dict[str, Any]]
+    admin: bool = False
+
+
+ADMIN = f"/api{settings.ADMIN_ROUTE_PREFIX}"
+
+SCENARIOS = [
+    Scenario("rooms.list", "GET", lambda f, i: {"url": "/api/rooms/", "params": {"limit": 100}}),
+    Scenario("rooms.search", "GET", lambda f, i: {"url": "/api/rooms/available/search", "params": f.stay(i)}),
+    Scenario("rooms.search (type, capacity)", "GET", lambda f, i: {
+        "url": "/api/rooms/available/search",
+        "params": {**f.stay(i), "room_type": "Double", "min_capacity": 2}
+    }),
+    Scenario("rooms.check_availability", "POST", lambda f, i: {
+        "url": "/api/rooms/check-availability",
+        "json": {
+            "room_id": f.pick(f.room_ids, i),
+            "check_in_date": f.stay(i)["check_in"],
+            "check_out_date": f.stay(i)["check_out"]
+        }
+    }),
+    Scenario("reservations.check_availability", "POST", lambda f, i: {
+        "url": "/api/reservations/check-availability",
+        "params": {
+            "room_id": f.pick(f.room_ids, i),
+            "check_in": f.stay(i)["check_in"][:10],
+            "check_out": f.stay(i)["check_out"][:10],
+            "guests_count": 1
+        }
+    }),
+    Scenario("reservations.blocked_dates", "GET", lambda f, i: {
+        "url": f"/api/reservations/room/{f.pick(f.room_ids, i)}/blocked-dates"
+    }),
+    Scenario("reservations.list", "GET", lambda f, i: {"url": "/api/reservations/", "params": {"limit": 100}}),
+    Scenario("reservations.active", "GET", lambda f, i: {"url": "/api/reservations/status/active"}),
+    Scenario("reservations.today_checkins", "GET", lambda f, i: {"url": "/api/reservations/today/checkins"}),
+    Scenario("reservations.today_checkouts", "GET", lambda f, i: {"url": "/api/reservations/today/checkouts"}),
+    Scenario("reservations.by_guest", "GET", lambda f, i: {
+        "url": f"/api/reservations/guest/{f.pick(f.guest_ids, i)}"
+    }),
+    Scenario("guests.list", "GET", lambda f, i: {"url": "/api/guests/", "params": {"limit": 100}}),
+    Scenario("guests.search", "GET", lambda f, i: {"url": f"/api/guests/search/{f.pick(f.last_names, i)}"}),
+    Scenario("auth.guest_login", "POST", lambda f, i: {
+        "url": "/api/auth/guest/login",
+        "json": {"email": f.pick(f.emails, i), "password": GUEST_PASSWORD}
+    }),
+    Scenario("reports.dashboard", "GET", lambda f, i: {"url": f"{ADMIN}/reports/dashboard"}, admin=True),
+    Scenario("reports.rooms_status", "GET", lambda f, i: {"url": f"{ADMIN}/reports/rooms-status"}, admin=True),
+    Scenario("reports.occupancy_rate", "GET", lambda f, i: {"url": f"{ADMIN}/reports/occupancy-rate"}, admin=True),
+    Scenario("reports.occupancy_pdf", "GET", lambda f, i: {
+        "url": f"{ADMIN}/reports/occupancy/pdf", "params": f.last_week()
+    }, admin=True),
+    Scenario("reports.occupancy_excel", "GET", lambda f, i: {
+        "url": f"{ADMIN}/reports/occupancy/excel", "params": f.last_week()
+    }, admin=True),
+]
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+@dataclass
+class Result:
+    scenario: Scenario
+    latencies_ms: List[float]
+    seconds: float
+    statements: int
+    errors: int
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies_ms)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "p50_ms": round(percentile(self.latencies_ms, 50), 2),
+            "p95_ms": round(percentile(self.latencies_ms, 95), 2),
+            "p99_ms": round(percentile(self.latencies_ms, 99), 2),
+            "rps": round(self.requests / self.seconds, 1),
+            "statements": round(self.statements / self.requests, 2)
+        }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    fixtures: Fixtures,
+    scenario: Scenario,
+    iterations: int,
+    warmup: int,
+    concurrency: int
+) -> Result:
+    headers = {"Authorization": f"Bearer {fixtures.admin_token}"} if scenario.admin else {}
+
+    failures: List[str] = []
+
+    async def send(i: int) -> Optional[float]:
+        started = clock.perf_counter()
+        response = await client.request(scenario.method, headers=headers, **scenario.request(fixtures, i))
+        elapsed = (clock.perf_counter() - started) * 1000
+        if response.status_code >= 400:
+            if not failures:
+                print(f"  {scenario.name}: HTTP {response.status_code} {response.text[:200]}")
+            failures.append(response.text)
+            return None
+        return elapsed
+
+    for i in range(warmup):
+        await send(i)
+
+    pending = iter(range(iterations))
+    latencies: List[float] = []
+    warmup_failures = len(failures)
+    # Don't charge this scenario for garbage left by the previous one
+    gc.collect()
+
+    async def worker() -> None:
+        for i in pending:
+            elapsed = await send(i)
+            if elapsed is not None:
+                latencies.append(elapsed)
+
+    with StatementCounter() as counter:
+        started = clock.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        seconds = clock.perf_counter() - started
+
+    return Result(scenario, latencies or [0.0], seconds, counter.count, len(failures) - warmup_failures)
+
+
+def regressions(summary: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """Differences beyond the threshold against one baseline entry"""
+    found = []
+    for key in ("p50_ms", "p95_ms"):
+        limit = max(baseline[key] * (1 + threshold), baseline[key] + MIN_LATENCY_SLACK_MS)
+        if summary[key] > limit:
+            found.append(f"{key} {summary[key]:.2f} > {baseline[key]:.2f} (+{threshold:.0%})")
+    if summary["rps"] < baseline["rps"] * (1 - threshold):
+        found.append(f"rps {summary['rps']:.1f} < {baseline['rps']:.1f} (-{threshold:.0%})")
+    if summary["statements"] > baseline["statements"]:
+        found.append(f"statements {summary['statements']} > {baseline['statements']}")
+    return found
+
+
+def dataset_counts() -> Dict[str, int]:
+    with engine.connect() as connection:
+        return {
+            table: connection.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+            for table in DATASET_TABLES
+        }
+
+
+def load(args: argparse.Namespace) -> None:
+    """Replace rooms, guests and reservations with a perf.datagen dataset"""
+    with engine.begin() as connection:
+        connection.execute(text(TRUNCATE_SQL))
+        dataset = generate(connection, spec_from_args(args))
+    print(f"Seeded {dataset.counts['reservations']} reservations in {dataset.seconds:.1f}s")
+
+
+async def run(scenarios: List[Scenario], args: argparse.Namespace) -> List[Result]:
+    db = SessionLocal()
+    try:
+        fixtures = Fixtures(db)
+    finally:
+        db.close()
+
+    # Imported here so settings errors surface before the app is built
+    from main import app
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for scenario in scenarios:
+            results.append(await run_scenario(
+                client, fixtures, scenario, args.iterations, args.warmup, args.concurrency
+            ))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--iterations", type=int, default=50, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="requests in flight per scenario")
+    parser.add_argument("-k", dest="pattern", default="", help="only run scenarios whose name contains this")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative change that counts as a regression (default 0.20)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true", help="record the results as the baseline")
+    parser.add_argument("--load", action="store_true",
+                        help="truncate and load a perf.datagen dataset first (sizes below)")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if settings.ENVIRONMENT == "production":
+        print("Refusing to benchmark with ENVIRONMENT=production")
+        return 1
+
+    if args.load:
+        load(args)
+
+    scenarios = [scenario for scenario in SCENARIOS if args.pattern in scenario.name]
+    counts = dataset_counts()
+    results = asyncio.run(run(scenarios, args))
+
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    if stored and stored.get("dataset") != counts:
+        print(f"Dataset differs from the one in {args.baseline.name}; latencies are not comparable")
+
+    failed = 0
+    print(f"\n{'scenario':<36} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'stmts':>6}")
+    for outcome in results:
+        summary = outcome.summary()
+        problems = [f"{outcome.errors} failed requests"] if outcome.errors else []
+        baseline = (stored or {}).get("scenarios", {}).get(outcome.scenario.name)
+        if baseline and not args.update_baseline:
+            problems += regressions(summary, baseline, args.threshold)
+        failed += bool(problems)
+        print(f"{outcome.scenario.name:<36} {summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} "
+              f"{summary['p99_ms']:>8.2f} {summary['rps']:>8.1f} {summary['statements']:>6}"
+              f"{'  REGRESSION' if problems else ''}")
+        for problem in problems:
+            print(f"    {problem}")
+
+    if args.update_baseline:
+        entries = (stored or {}).get("scenarios", {}) if stored and stored.get("dataset") == counts else {}
+        entries.update({outcome.scenario.name: outcome.summary() for outcome in results})
+        args.baseline.write_text(json.dumps({
+            "dataset": counts,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "scenarios": entries
+        }, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+
+    print(f"\n{len(results) - failed}/{len(results)} scenarios within the baseline")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,428 @@
+"""
+Synthetic large-hotel data generator
+
+Creates rooms, room images, guests, reservations and (optionally) room holds
+with realistic distributions and bulk-loads them with COPY:
+
+- room types, prices, capacities and amenities by type, 40 rooms per floor
+- 3-6 images per room, the first one primary
+- guests with Mexican/international names and nationalities; a share of
+  them registered online with GUEST_PASSWORD so login can be exercised
+- a stay timeline per room: no overlapping Pending/Active stays, ~72%
+  occupancy, 1-7 nights (mostly 1-3), booking lead times of a few weeks,
+  repeat guests, ~10% cancellations; statuses follow the dates
+  (Completed in the past, Active today, Pending in the future)
+
+The benchmark, load-test and plan-check tools call generate() on their own
+connection; this module can also load a database permanently:
+
+    python -m perf.datagen --rooms 800 --guests 120000 --reservations 600000
+    python -m perf.datagen --truncate --rooms 300          # replace existing data
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import secrets
+import string
+import sys
+import time as clock
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+
+# Password of every generated guest that registered online
+GUEST_PASSWORD = "perf-guest-123"
+
+ROOMS_PER_FLOOR = 40
+COPY_CHUNK_ROWS = 50000
+
+ROOM_TYPES = {
+    # type: (share, base price, capacities, amenities)
+    "Single": (0.30, 70, (1, 1, 2), ["WiFi", "TV", "AC"]),
+    "Double": (0.40, 110, (2, 2, 3, 4), ["WiFi", "TV", "AC", "Minibar"]),
+    "Suite": (0.20, 220, (2, 3, 4), ["WiFi", "TV", "AC", "Minibar", "Jacuzzi", "Balcony"]),
+    "Deluxe": (0.10, 340, (2, 4, 5, 6), ["WiFi", "Smart TV", "AC", "Minibar", "Jacuzzi", "Ocean View", "Room Service"]),
+}
+
+FIRST_NAMES = [
+    "José", "María", "Juan", "Guadalupe", "Luis", "Fernanda", "Carlos", "Sofía", "Miguel", "Valeria",
+    "Jorge", "Camila", "Alejandro", "Daniela", "Ricardo", "Ana", "Diego", "Lucía", "Jared", "Paola",
+    "John", "Emily", "Michael", "Sarah", "David", "Laura", "James", "Emma", "Pierre", "Giulia",
+]
+LAST_NAMES = [
+    "Hernández", "García", "Martínez", "López", "González", "Rodríguez", "Pérez", "Sánchez", "Ramírez",
+    "Cruz", "Flores", "Gómez", "Morales", "Vázquez", "Reyes", "Jiménez", "Torres", "Díaz", "Ruiz",
+    "Smith", "Johnson", "Brown", "Miller", "Wilson", "Taylor", "Martin", "Rossi", "Dubois",
+]
+NATIONALITIES = [
+    ("Mexicana", 0.62), ("Estadounidense", 0.14), ("Canadiense", 0.06), ("Española", 0.04),
+    ("Colombiana", 0.04), ("Argentina", 0.03), ("Francesa", 0.03), ("Italiana", 0.02), ("Alemana", 0.02),
+]
+# Nights per stay, weighted towards short stays
+NIGHTS = [(1, 0.24), (2, 0.27), (3, 0.2), (4, 0.12), (5, 0.08), (6, 0.05), (7, 0.04)]
+PAYMENT_METHODS = [("PayPal", 0.55), ("Cash", 0.3), ("Card", 0.15)]
+
+CHECK_IN_TIME = time(15, 0)
+CHECK_OUT_TIME = time(12, 0)
+
+
+@dataclass
+class DatasetSpec:
+    rooms: int = 500
+    images_per_room: int = 4
+    guests: int = 50000
+    reservations: int = 250000
+    holds: int = 0
+    # Bookings extend this far into the future
+    future_days: int = 365
+    occupancy: float = 0.72
+    cancellation_rate: float = 0.10
+    # Share of guests with an online account (password_hash set)
+    registered_share: float = 0.4
+    seed: int = 42
+    # Prefix for room numbers, emails and documents so several datasets can
+    # live in one database
+    tag: str = ""
+
+
+@dataclass
+class Dataset:
+    spec: DatasetSpec
+    room_ids: range
+    guest_ids: range
+    reservation_ids: range
+    counts: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def tag(self) -> str:
+        return self.spec.tag
+
+
+def random_tag() -> str:
+    """Short unique prefix for a throwaway dataset"""
+    return "P" + secrets.token_hex(2).upper()
+
+
+def _weighted(rng: random.Random, options: Sequence[tuple]) -> Any:
+    value = rng.random()
+    for option, weight in options:
+        value -= weight
+        if value <= 0:
+            return option
+    return options[-1][0]
+
+
+def _copy(connection: Connection, table: str, columns: List[str], rows: Iterable[tuple]) -> int:
+    """Stream rows into table with COPY ... FROM STDIN (CSV), in chunks"""
+    cursor = connection.connection.dbapi_connection.cursor()
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    total = 0
+    try:
+        iterator = iter(rows)
+        while True:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            count = 0
+            for row in iterator:
+                writer.writerow(row)
+                count += 1
+                if count == COPY_CHUNK_ROWS:
+                    break
+            if not count:
+                break
+            buffer.seek(0)
+            if hasattr(cursor, "copy_expert"):
+                cursor.copy_expert(statement, buffer)
+            else:
+                # psycopg 3
+                with cursor.copy(statement) as copy:
+                    copy.write(buffer.getvalue())
+            total += count
+            if count < COPY_CHUNK_ROWS:
+                break
+    finally:
+        cursor.close()
+    return total
+
+
+def _next_id(connection: Connection, table: str) -> int:
+    return connection.execute(text(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")).scalar()
+
+
+def _sync_sequence(connection: Connection, table: str) -> None:
+    connection.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"
+    ))
+
+
+class _Generator:
+
+    def __init__(self, spec: DatasetSpec, first_room_id: int, first_guest_id: int, first_reservation_id: int):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.now = datetime.now()
+        self.now_utc = datetime.now(timezone.utc)
+        self.room_ids = range(first_room_id, first_room_id + spec.rooms)
+        self.guest_ids = range(first_guest_id, first_guest_id + spec.guests)
+        self.first_reservation_id = first_reservation_id
+        self.rooms: List[Dict[str, Any]] = []
+        self.occupied_rooms = set()
+        self.reservation_count = 0
+
+    def _aware(self, value: datetime) -> datetime:
+        """Naive local timestamp as an aware one for timestamptz columns"""
+        return value.astimezone(timezone.utc)
+
+    def room_rows(self) -> Iterator[tuple]:
+        rng = self.rng
+        types = [(name, share) for name, (share, *_rest) in ROOM_TYPES.items()]
+        for index, room_id in enumerate(self.room_ids):
+            floor = 1 + index // ROOMS_PER_FLOOR
+            number = f"{self.spec.tag}{floor * 100 + index % ROOMS_PER_FLOOR + 1}"
+            room_type = _weighted(rng, types)
+            _share, base_price, capacities, amenities = ROOM_TYPES[room_type]
+            # Higher floors cost a bit more
+            price = Decimal(base_price + rng.randint(-10, 25) + floor // 3).quantize(Decimal("1.00"))
+            room = {"id": room_id, "number": number, "price": price, "capacity": rng.choice(capacities)}
+            self.rooms.append(room)
+            yield (
+                room_id, number, room_type, price, room["capacity"],
+                f"{room_type} room on floor {floor}", json.dumps(amenities), "Available", floor,
+                f"https://images.example.com/rooms/{number}/1.jpg", self.now_utc.isoformat()
+            )
+
+    def image_rows(self) -> Iterator[tuple]:
+        rng = self.rng
+        for room in self.rooms:
+            count = max(1, self.spec.images_per_room + rng.randint(-1, 2))
+            for position in range(1, count + 1):
+                yield (
+                    room["id"], f"https://images.example.com/rooms/{room['number']}/{position}.jpg",
+                    position == 1, self.now_utc.isoformat()
+                )
+
+    def guest_rows(self, password_hash: str) -> Iterator[tuple]:
+        rng = self.rng
+        tag = self.spec.tag
+        prefix = f"{tag}-" if tag else "ID-"
+        for n, guest_id in enumerate(self.guest_ids, 1):
+            first = rng.choice(FIRST_NAMES)
+            last = rng.choice(LAST_NAMES)
+            local = "".join(ch for ch in f"{first}.{last}".lower() if ch in string.ascii_lowercase + ".")
+            email = f"{tag.lower()}{local}.{n}@example.com"
+            birth = datetime(1945, 1, 1) + timedelta(days=rng.randint(0, 365 * 60))
+            registered = rng.random() < self.spec.registered_share
+            created = self.now_utc - timedelta(days=rng.randint(0, 365 * 4), minutes=rng.randint(0, 1439))
+            yield (
+                guest_id, first, last, email, f"+52 55 {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}",
+                f"{prefix}{n:08d}", _weighted(rng, NATIONALITIES), birth.isoformat(), None,
+                password_hash if registered else None, created.isoformat()
+            )
+
+    def _guest(self) -> int:
+        # Skewed towards low ids: some guests come back often
+        return self.guest_ids[int(len(self.guest_ids) * self.rng.random() ** 1.6)]
+
+    def reservation_rows(self) -> Iterator[tuple]:
+        """Per-room timeline of stays ending future_days from now"""
+        rng = self.rng
+        spec = self.spec
+        mean_nights = sum(nights * weight for nights, weight in NIGHTS)
+        per_room = spec.reservations / max(spec.rooms, 1)
+        # Free nights between stays so the room is occupied `occupancy` of the time
+        mean_gap = mean_nights * (1 / spec.occupancy - 1)
+        span_days = int(per_room * (1 - spec.cancellation_rate) * (mean_nights + mean_gap)) + 1
+        horizon = datetime.combine(date.today() + timedelta(days=spec.future_days), time.min)
+        reservation_id = self.first_reservation_id
+        remaining = spec.reservations
+
+        for position, room in enumerate(self.rooms):
+            quota = round(per_room * (position + 1)) - round(per_room * position)
+            day = horizon - timedelta(days=span_days + rng.randint(0, int(mean_gap) + 2))
+            for _ in range(min(quota, remaining)):
+                nights = _weighted(rng, NIGHTS)
+                cancelled = rng.random() < spec.cancellation_rate
+                check_in = datetime.combine(day.date(), CHECK_IN_TIME)
+                check_out = datetime.combine((day + timedelta(days=nights)).date(), CHECK_OUT_TIME)
+                if not cancelled:
+                    # Cancelled bookings do not take the room
+                    gap = int(rng.expovariate(1 / mean_gap)) if mean_gap > 0 else 0
+                    day += timedelta(days=nights + gap)
+
+                if cancelled:
+                    status = "Cancelled"
+                elif check_out < self.now:
+                    status = "Completed"
+                elif check_in <= self.now:
+                    status = "Active"
+                    self.occupied_rooms.add(room["id"])
+                else:
+                    status = "Pending"
+
+                lead = timedelta(days=min(int(rng.expovariate(1 / 21)), 300), hours=rng.randint(1, 23))
+                created = min(check_in - lead, self.now - timedelta(minutes=rng.randint(1, 60 * 24 * 30)))
+                method = _weighted(rng, PAYMENT_METHODS)
+                paid = method != "Cash" or status in ("Completed", "Active")
+                guests_count = rng.randint(1, room["capacity"])
+                yield (
+                    reservation_id, room["id"], self._guest(), check_in.isoformat(), check_out.isoformat(),
+                    (check_in + timedelta(minutes=rng.randint(0, 300))).isoformat() if status in ("Active", "Completed") else None,
+                    (check_out - timedelta(minutes=rng.randint(0, 180))).isoformat() if status == "Completed" else None,
+                    status, room["price"] * nights, guests_count, method, "Paid" if paid else "Pending",
+                    self._aware(created).isoformat()
+                )
+                reservation_id += 1
+                remaining -= 1
+        self.reservation_count = reservation_id - self.first_reservation_id
+
+    def hold_rows(self) -> Iterator[tuple]:
+        """Past PayPal checkouts: converted or expired, none still held"""
+        rng = self.rng
+        for _ in range(self.spec.holds):
+            room = rng.choice(self.rooms)
+            created = self.now_utc - timedelta(days=rng.randint(1, 365), minutes=rng.randint(0, 1439))
+            check_in = datetime.combine((created + timedelta(days=rng.randint(1, 60))).date(), CHECK_IN_TIME)
+            yield (
+                str(uuid.UUID(int=rng.getrandbits(128), version=4)), room["id"], self._guest(),
+                check_in.isoformat(), (check_in + timedelta(days=2, hours=-3)).isoformat(),
+                rng.randint(1, room["capacity"]), "Expired" if rng.random() < 0.6 else "Converted",
+                (created + timedelta(minutes=15)).isoformat(), created.isoformat()
+            )
+
+
+def generate(connection: Connection, spec: DatasetSpec) -> Dataset:
+    """
+    Load a synthetic dataset on connection (inside its current transaction)
+
+    Ids are assigned explicitly after the current maximum and sequences are
+    moved past them, so the data can be added to a database that already has
+    rows. Planner statistics are refreshed at the end.
+    """
+    from app.services.guest_auth_service import GuestAuthService
+
+    started = clock.perf_counter()
+    generator = _Generator(
+        spec,
+        _next_id(connection, "rooms"),
+        _next_id(connection, "guests"),
+        _next_id(connection, "reservations")
+    )
+    counts = {}
+    counts["rooms"] = _copy(connection, "rooms", [
+        "id", "room_number", "type", "price_per_night", "capacity", "description", "amenities",
+        "status", "floor", "image_url", "created_at"
+    ], generator.room_rows())
+    counts["room_images"] = _copy(connection, "room_images", [
+        "room_id", "image_url", "is_primary", "created_at"
+    ], generator.image_rows())
+    # One hash for every registered guest; bcrypt per row would take minutes
+    counts["guests"] = _copy(connection, "guests", [
+        "id", "first_name", "last_name", "email", "phone", "id_document", "nationality",
+        "date_of_birth", "address", "password_hash", "created_at"
+    ], generator.guest_rows(GuestAuthService.get_password_hash(GUEST_PASSWORD)))
+    counts["reservations"] = _copy(connection, "reservations", [
+        "id", "room_id", "guest_id", "check_in_date", "check_out_date", "actual_check_in",
+        "actual_check_out", "status", "total_price", "guests_count", "payment_method",
+        "payment_status", "created_at"
+    ], generator.reservation_rows())
+    if spec.holds:
+        counts["room_holds"] = _copy(connection, "room_holds", [
+            "hold_token", "room_id", "guest_id", "check_in_date", "check_out_date", "guests_count",
+            "status", "expires_at", "created_at"
+        ], generator.hold_rows())
+
+    # Rooms with a guest in house are Occupied, a few are under maintenance
+    if generator.occupied_rooms:
+        connection.execute(
+            text("UPDATE rooms SET status = 'Occupied' WHERE id = ANY(:ids)"),
+            {"ids": sorted(generator.occupied_rooms)}
+        )
+    maintenance = [
+        room["id"] for room in generator.rooms
+        if room["id"] not in generator.occupied_rooms and generator.rng.random() < 0.03
+    ]
+    if maintenance:
+        connection.execute(text("UPDATE rooms SET status = 'Maintenance' WHERE id = ANY(:ids)"), {"ids": maintenance})
+
+    for table in ("rooms", "room_images", "guests", "reservations", "room_holds"):
+        _sync_sequence(connection, table)
+        connection.execute(text(f"ANALYZE {table}"))
+
+    return Dataset(
+        spec=spec,
+        room_ids=generator.room_ids,
+        guest_ids=generator.guest_ids,
+        reservation_ids=range(generator.first_reservation_id, generator.first_reservation_id + generator.reservation_count),
+        counts=counts,
+        seconds=clock.perf_counter() - started
+    )
+
+
+def add_arguments(parser: argparse.ArgumentParser, defaults: DatasetSpec = DatasetSpec()) -> None:
+    """Dataset size options shared by the perf tools"""
+    group = parser.add_argument_group("dataset")
+    group.add_argument("--rooms", type=int, default=defaults.rooms)
+    group.add_argument("--images-per-room", type=int, default=defaults.images_per_room)
+    group.add_argument("--guests", type=int, default=defaults.guests)
+    group.add_argument("--reservations", type=int, default=defaults.reservations)
+    group.add_argument("--holds", type=int, default=defaults.holds)
+    group.add_argument("--future-days", type=int, default=defaults.future_days)
+    group.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def spec_from_args(args: argparse.Namespace, tag: str = "") -> DatasetSpec:
+    return DatasetSpec(
+        rooms=args.rooms,
+        images_per_room=args.images_per_room,
+        guests=args.guests,
+        reservations=args.reservations,
+        holds=args.holds,
+        future_days=args.future_days,
+        seed=args.seed,
+        tag=tag
+    )
+
+
+TRUNCATE_SQL = (
+    "TRUNCATE room_holds, reservations, reservation_groups, room_images, rooms, guests, idempotency_keys "
+    "RESTART IDENTITY CASCADE"
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--tag", default="", help="prefix for room numbers, emails and documents")
+    parser.add_argument("--truncate", action="store_true",
+                        help="delete all rooms, guests and reservations first (administrators are kept)")
+    args = parser.parse_args()
+
+    if settings.ENVIRONMENT == "production":
+        print("Refusing to generate synthetic data with ENVIRONMENT=production")
+        return 1
+
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    with engine.begin() as connection:
+        if args.truncate:
+            connection.execute(text(TRUNCATE_SQL))
+        dataset = generate(connection, spec_from_args(args, args.tag))
+
+    for table, count in dataset.counts.items():
+        print(f"{table:<14} {count:>10,}")
+    print(f"Loaded in {dataset.seconds:.1f}s (guest password: {GUEST_PASSWORD})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
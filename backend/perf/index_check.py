@@ -0,0 +1,109 @@
+"""
+Index check for the hot reservation queries
+
+Seeds a large synthetic hotel inside a transaction, runs the hot service
+methods against it, and EXPLAINs every statement they emit. The check fails
+if any of them reads reservations or room_holds with a sequential scan.
+Everything, including the ANALYZE statistics, is rolled back at the end.
+
+Usage (from backend/, against a local database at head):
+    python -m perf.index_check
+    python -m perf.index_check --rooms 5000 --reservations 2000000
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.services import HoldService, ReportService, ReservationService, RoomService
+from perf.datagen import Dataset, DatasetSpec, add_arguments, generate, random_tag, spec_from_args
+from perf.plans import capture_statements, explain, is_explainable, scans_by_relation, seq_scanned
+
+# Tables large enough that a sequential scan on a hot path is a regression
+HOT_TABLES = {"reservations", "room_holds"}
+
+DEFAULT_DATASET = DatasetSpec(rooms=2000, guests=100000, reservations=500000, holds=20000)
+
+
+def hot_queries(dataset: Dataset) -> List[Tuple[str, Callable[[Session], object]]]:
+    """Service calls on the booking, front desk and dashboard hot paths"""
+    check_in = datetime.combine(datetime.now().date() + timedelta(days=7), datetime.min.time())
+    check_out = check_in + timedelta(days=3)
+    room_id = dataset.room_ids[0]
+
+    return [
+        ("RoomService.get_available_rooms",
+         lambda db: RoomService.get_available_rooms(db, check_in, check_out)),
+        ("RoomService.get_available_rooms (type, capacity)",
+         lambda db: RoomService.get_available_rooms(db, check_in, check_out, "Double", 2)),
+        ("RoomService.check_room_availability",
+         lambda db: RoomService.check_room_availability(db, room_id, check_in, check_out)),
+        ("HoldService.has_conflicting_reservation",
+         lambda db: HoldService.has_conflicting_reservation(db, room_id, check_in, check_out)),
+        ("HoldService.has_active_hold",
+         lambda db: HoldService.has_active_hold(db, room_id, check_in, check_out)),
+        ("ReservationService.get_todays_checkins", ReservationService.get_todays_checkins),
+        ("ReservationService.get_todays_checkouts", ReservationService.get_todays_checkouts),
+        ("ReportService.get_dashboard_stats", ReportService.get_dashboard_stats),
+        ("ReservationService.auto_cancel_expired_reservations", ReservationService.auto_cancel_expired_reservations),
+        ("ReservationService.auto_complete_overdue_checkouts", ReservationService.auto_complete_overdue_checkouts),
+    ]
+
+
+def check(connection: Connection, dataset: Dataset) -> bool:
+    """EXPLAIN every statement of the hot queries. Returns True if all use indexes"""
+    # Service commits only release a savepoint; the outer transaction is rolled back
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    ok = True
+    try:
+        for label, call in hot_queries(dataset):
+            with capture_statements(connection) as statements:
+                call(db)
+
+            print(f"\n{label}")
+            seen = set()
+            for statement, parameters in statements:
+                # Per-row statements repeated by a loop share one plan
+                if not is_explainable(statement) or statement in seen:
+                    continue
+                seen.add(statement)
+                plan = explain(connection, statement, parameters)
+                scans = scans_by_relation(plan)
+                if not HOT_TABLES & scans.keys():
+                    continue
+                offending = seq_scanned(plan, HOT_TABLES)
+                ok = ok and not offending
+                summary = ", ".join(f"{table}: {'/'.join(nodes)}" for table, nodes in sorted(scans.items()))
+                print(f"  {'FAIL' if offending else 'ok  '} cost={plan['Total Cost']:.0f} {summary}")
+    finally:
+        db.close()
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser, DEFAULT_DATASET)
+    args = parser.parse_args()
+
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            dataset = generate(connection, spec_from_args(args, random_tag()))
+            print(f"Seeded {dataset.counts['reservations']} reservations in {dataset.seconds:.1f}s")
+            ok = check(connection, dataset)
+        finally:
+            transaction.rollback()
+
+    print("\nAll hot queries use indexes" if ok else "\nSequential scans found on hot tables")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
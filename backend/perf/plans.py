@@ -0,0 +1,67 @@
+"""
+Helpers to capture the SQL a service call emits and inspect its plan
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+
+Statement = Tuple[str, Any]
+
+# Node types that read a table without an index
+SEQ_SCAN_NODES = {"Seq Scan", "Parallel Seq Scan"}
+
+
+@contextmanager
+def capture_statements(connection: Connection) -> Iterator[List[Statement]]:
+    """Collect (statement, parameters) for everything executed on connection"""
+    statements: List[Statement] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", before_cursor_execute)
+
+
+def is_explainable(statement: str) -> bool:
+    """Only DML is explained; SAVEPOINT, SET and friends are skipped"""
+    return statement.lstrip().split(None, 1)[0].upper() in {"SELECT", "WITH", "INSERT", "UPDATE", "DELETE"}
+
+
+def explain(connection: Connection, statement: str, parameters: Any = None) -> Dict[str, Any]:
+    """Return the root node of EXPLAIN (FORMAT JSON) for a captured statement"""
+    result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters or {})
+    return result.scalar()[0]["Plan"]
+
+
+def iter_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Walk every node of a plan tree"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_nodes(child)
+
+
+def scans_by_relation(plan: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Map each scanned table to the scan node types used on it"""
+    scans: Dict[str, List[str]] = {}
+    for node in iter_nodes(plan):
+        relation = node.get("Relation Name")
+        if relation:
+            scans.setdefault(relation, []).append(node["Node Type"])
+    return scans
+
+
+def seq_scanned(plan: Dict[str, Any], relations: Optional[set] = None) -> List[str]:
+    """Tables read with a sequential scan, optionally limited to relations"""
+    return sorted({
+        node["Relation Name"]
+        for node in iter_nodes(plan)
+        if node["Node Type"] in SEQ_SCAN_NODES
+        and (relations is None or node["Relation Name"] in relations)
+    })
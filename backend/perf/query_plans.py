@@ -0,0 +1,449 @@
+"""
+Query-plan regression check for the service layer
+
+Every public method of RoomService, ReservationService, GuestService and
+ReportService is called against a large synthetic hotel seeded inside a
+transaction. The SQL each call emits (plus the lazy loads triggered when the
+result is serialized with the endpoint's response schema) is captured and
+EXPLAINed. A case fails when:
+
+- it reads reservations, room_holds or guests with a sequential scan
+  (unless the case documents why that is expected)
+- the same statement runs N_PLUS_ONE_REPEATS or more times (an N+1 loop)
+- it emits more statements than its budget in plan_budgets.json
+- its most expensive statement costs more than its budget
+
+Public methods without a case also fail the check, so new service methods
+get a plan case when they are added. Everything is rolled back at the end.
+
+Usage (from backend/, against a local database at head):
+    python -m perf.query_plans
+    python -m perf.query_plans -v                  # print every plan summary
+    python -m perf.query_plans --update-budgets    # record current counts/costs
+"""
+import argparse
+import inspect
+import itertools
+import json
+import math
+import sys
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app import schemas
+from app.config import settings
+from app.models import Guest, Reservation, ReservationGroup, ReservationStatus, Room, RoomImage, RoomStatus
+from app.services import GuestService, ReportService, ReservationService, RoomService
+from perf.datagen import Dataset, add_arguments, generate, random_tag, spec_from_args
+from perf.index_check import DEFAULT_DATASET
+from perf.plans import capture_statements, explain, is_explainable, scans_by_relation, seq_scanned
+
+SERVICES = (RoomService, ReservationService, GuestService, ReportService)
+
+# Tables that grow with the business; reading them in full is a regression
+LARGE_TABLES = {"reservations", "room_holds", "guests"}
+
+# A statement repeated this many times in one call is a per-row loop
+N_PLUS_ONE_REPEATS = 5
+
+# Group fixtures are large enough for a per-row loop to cross the threshold
+GROUP_SIZE = 6
+
+# Only the first items of a list result are serialized; lazy loads show up
+# on the first few rows already
+SERIALIZE_SAMPLE = 50
+
+BUDGETS_FILE = Path(__file__).with_name("plan_budgets.json")
+COST_HEADROOM = 1.5
+# Estimates of cheap statements move by tens between ANALYZE samples
+MIN_COST_SLACK = 100
+
+# Public methods that never touch the database
+NO_SQL = {"ReservationService.day_range"}
+
+
+class Fixtures:
+    """Rows the cases operate on, created before the captured call"""
+
+    def __init__(self, db: Session, dataset: Dataset):
+        self.db = db
+        self.dataset = dataset
+        self.tag = dataset.tag
+        self._counter = itertools.count(1)
+        self.today = datetime.combine(date.today(), time.min)
+        # Past the seeded horizon, so new bookings never conflict
+        self.free_check_in = self.today + timedelta(days=400, hours=15)
+        self.free_check_out = self.free_check_in + timedelta(days=3)
+
+    def _next(self) -> int:
+        return next(self._counter)
+
+    @cached_property
+    def room(self) -> Room:
+        return self.db.query(Room).filter(
+            Room.id.between(self.dataset.room_ids[0], self.dataset.room_ids[-1]),
+            Room.status == RoomStatus.AVAILABLE
+        ).order_by(Room.id).first()
+
+    @cached_property
+    def guest(self) -> Guest:
+        return self.db.get(Guest, self.dataset.guest_ids[0])
+
+    def new_room(self) -> Room:
+        room = Room(
+            room_number=f"{self.tag}N{self._next()}",
+            type="Double",
+            price_per_night=Decimal("150.00"),
+            capacity=4,
+            status=RoomStatus.AVAILABLE
+        )
+        self.db.add(room)
+        self.db.flush()
+        return room
+
+    def new_image(self) -> RoomImage:
+        image = RoomImage(room_id=self.room.id, image_url=f"https://img.example.com/{self._next()}.jpg")
+        self.db.add(image)
+        self.db.flush()
+        return image
+
+    def guest_create(self) -> schemas.GuestCreate:
+        n = self._next()
+        return schemas.GuestCreate(
+            first_name="Plan",
+            last_name=f"Case {n}",
+            email=f"{self.tag.lower()}.case{n}@example.com",
+            phone="+5215550000000",
+            id_document=f"{self.tag}-C{n}",
+            password="secret123"
+        )
+
+    def new_guest(self) -> Guest:
+        data = self.guest_create().model_dump(exclude={"password"})
+        guest = Guest(**data)
+        self.db.add(guest)
+        self.db.flush()
+        return guest
+
+    def new_reservation(self, status: str, check_in: Optional[datetime] = None, nights: int = 2) -> Reservation:
+        check_in = check_in or self.today + timedelta(hours=15)
+        reservation = Reservation(
+            room_id=self.new_room().id,
+            guest_id=self.guest.id,
+            check_in_date=check_in,
+            check_out_date=check_in + timedelta(days=nights, hours=-3),
+            status=status,
+            total_price=Decimal("300.00")
+        )
+        self.db.add(reservation)
+        self.db.flush()
+        return reservation
+
+    def new_group(self, status: str) -> ReservationGroup:
+        group = ReservationGroup(
+            name=f"Group {self._next()}",
+            guest_id=self.guest.id,
+            check_in_date=self.today + timedelta(hours=15),
+            check_out_date=self.today + timedelta(days=2, hours=12)
+        )
+        self.db.add(group)
+        self.db.flush()
+        for _ in range(GROUP_SIZE):
+            reservation = self.new_reservation(status)
+            reservation.group_id = group.id
+        self.db.flush()
+        return group
+
+    def reservation_create(self, schema: Type[schemas.ReservationCreate]) -> schemas.ReservationCreate:
+        return schema(
+            room_id=self.new_room().id,
+            check_in_date=self.free_check_in,
+            check_out_date=self.free_check_out,
+            guests_count=2,
+            guest=self.guest_create()
+        )
+
+    def group_create(self) -> schemas.GroupBookingCreate:
+        return schemas.GroupBookingCreate(
+            name="Plan case group",
+            guest_id=self.guest.id,
+            check_in_date=self.free_check_in,
+            check_out_date=self.free_check_out,
+            rooms=[schemas.GroupBookingRoom(room_id=self.new_room().id, guests_count=2) for _ in range(GROUP_SIZE)]
+        )
+
+
+@dataclass
+class Case:
+    method: Callable[..., Any]
+    args: Callable[[Fixtures], tuple] = lambda f: ()
+    # Response schema the endpoint serializes the result with
+    schema: Optional[Type[BaseModel]] = None
+    # Why a sequential scan on a large table is expected, if it is
+    seq_scan_ok: Optional[str] = None
+    variant: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        name = self.method.__qualname__
+        return f"{name} ({self.variant})" if self.variant else name
+
+
+def last_month(f: Fixtures) -> Tuple[datetime, datetime]:
+    return f.today - timedelta(days=30), f.today
+
+
+def with_no_show(f: Fixtures) -> tuple:
+    f.new_reservation(ReservationStatus.PENDING, f.today - timedelta(days=3))
+    return ()
+
+
+def with_overdue_checkout(f: Fixtures) -> tuple:
+    f.new_reservation(ReservationStatus.ACTIVE, f.today - timedelta(days=3))
+    return ()
+
+
+CASES: List[Case] = [
+    # Rooms
+    Case(RoomService.get_all_rooms, schema=schemas.Room),
+    Case(RoomService.get_room_by_id, lambda f: (f.room.id,), schemas.Room),
+    Case(RoomService.get_room_by_number, lambda f: (f.room.room_number,), schemas.Room),
+    Case(RoomService.get_available_rooms, lambda f: (f.today + timedelta(days=7), f.today + timedelta(days=10)),
+         schemas.Room),
+    Case(RoomService.get_available_rooms, lambda f: (f.today + timedelta(days=7), f.today + timedelta(days=10), "Double", 2),
+         schemas.Room, variant="type, capacity"),
+    Case(RoomService.check_room_availability, lambda f: (f.room.id, f.today + timedelta(days=7), f.today + timedelta(days=10))),
+    Case(RoomService.get_rooms_by_status, lambda f: (RoomStatus.MAINTENANCE,), schemas.Room),
+    Case(RoomService.create_room, lambda f: (schemas.RoomCreate(
+        room_number=f"{f.tag}R{f._next()}", type="Suite", price_per_night=Decimal("250.00"), capacity=3,
+        gallery_images=[f"https://img.example.com/new-{n}.jpg" for n in range(3)]
+    ),), schemas.Room),
+    Case(RoomService.update_room, lambda f: (f.new_room().id, schemas.RoomUpdate(
+        price_per_night=Decimal("175.00"), gallery_images=["https://img.example.com/a.jpg", "https://img.example.com/b.jpg"]
+    )), schemas.Room),
+    Case(RoomService.delete_room, lambda f: (f.new_room().id,)),
+    Case(RoomService.update_room_status, lambda f: (f.new_room().id, RoomStatus.MAINTENANCE), schemas.Room),
+    Case(RoomService.add_room_image, lambda f: (f.room.id, "https://img.example.com/extra.jpg"), schemas.RoomImage),
+    Case(RoomService.get_room_images, lambda f: (f.room.id,), schemas.RoomImage),
+    Case(RoomService.delete_room_image, lambda f: (f.new_image().id,)),
+
+    # Guests
+    Case(GuestService.get_all_guests, schema=schemas.Guest,
+         seq_scan_ok="offset pagination reads the first rows of the table"),
+    Case(GuestService.get_guest_by_id, lambda f: (f.guest.id,), schemas.Guest),
+    Case(GuestService.get_guest_by_email, lambda f: (f.guest.email,), schemas.Guest),
+    Case(GuestService.get_guest_by_document, lambda f: (f.guest.id_document,), schemas.Guest),
+    Case(GuestService.search_guests, lambda f: (f.guest.last_name,), schemas.Guest,
+         seq_scan_ok="substring ILIKE cannot use a btree index"),
+    Case(GuestService.create_guest, lambda f: (f.guest_create(),), schemas.Guest),
+    Case(GuestService.update_guest, lambda f: (f.new_guest().id, schemas.GuestUpdate(phone="+5215551111111")),
+         schemas.Guest),
+    Case(GuestService.delete_guest, lambda f: (f.new_guest().id,)),
+    Case(GuestService.get_or_create_guest, lambda f: (f.guest_create(),), schemas.Guest),
+
+    # Reservations
+    Case(ReservationService.get_all_reservations, schema=schemas.Reservation),
+    Case(ReservationService.get_reservation_by_id, lambda f: (f.new_reservation(ReservationStatus.PENDING).id,),
+         schemas.Reservation),
+    Case(ReservationService.get_reservations_by_guest, lambda f: (f.guest.id,), schemas.Reservation),
+    Case(ReservationService.get_reservations_by_room, lambda f: (f.room.id,), schemas.Reservation),
+    Case(ReservationService.get_reservations_by_date_range, last_month, schemas.Reservation,
+         seq_scan_ok="a month of stays is hash-joined to guests"),
+    Case(ReservationService.get_active_reservations, schema=schemas.Reservation,
+         seq_scan_ok="hash join of every in-house stay to its guest"),
+    Case(ReservationService.get_pending_reservations, schema=schemas.Reservation,
+         seq_scan_ok="unpaginated list of every future booking"),
+    Case(ReservationService.get_todays_checkins, schema=schemas.Reservation),
+    Case(ReservationService.get_todays_checkouts, schema=schemas.Reservation),
+    Case(ReservationService.create_reservation, lambda f: (f.reservation_create(schemas.ReservationCreate),),
+         schemas.Reservation),
+    Case(ReservationService.create_reservation_authenticated, lambda f: (schemas.ReservationCreateAuthenticated(
+        guest_id=f.guest.id, room_id=f.new_room().id, check_in_date=f.free_check_in,
+        check_out_date=f.free_check_out, total_price=Decimal("450.00")
+    ),), schemas.Reservation),
+    Case(ReservationService.check_in, lambda f: (f.reservation_create(schemas.CheckInRequest),), schemas.Reservation),
+    Case(ReservationService.mark_checkin, lambda f: (f.new_reservation(ReservationStatus.PENDING).id,),
+         schemas.Reservation),
+    Case(ReservationService.check_out, lambda f: (f.new_reservation(ReservationStatus.ACTIVE).id,),
+         schemas.Reservation),
+    Case(ReservationService.cancel_reservation, lambda f: (f.new_reservation(ReservationStatus.PENDING).id,)),
+    Case(ReservationService.update_reservation, lambda f: (
+        f.new_reservation(ReservationStatus.PENDING).id,
+        schemas.ReservationUpdate(check_out_date=f.today + timedelta(days=4, hours=12))
+    ), schemas.Reservation),
+    Case(ReservationService.create_group_booking, lambda f: (f.group_create(),), schemas.ReservationGroup),
+    Case(ReservationService.get_group_by_id, lambda f: (f.new_group(ReservationStatus.PENDING).id,),
+         schemas.ReservationGroup),
+    Case(ReservationService.get_reservations_by_group, lambda f: (f.new_group(ReservationStatus.PENDING).id,),
+         schemas.Reservation),
+    Case(ReservationService.bulk_check_in, lambda f: (None, f.new_group(ReservationStatus.PENDING).id)),
+    Case(ReservationService.bulk_check_out, lambda f: (None, f.new_group(ReservationStatus.ACTIVE).id)),
+    Case(ReservationService.auto_cancel_expired_reservations, with_no_show),
+    Case(ReservationService.auto_complete_overdue_checkouts, with_overdue_checkout),
+    Case(ReservationService.process_expired_reservations, with_overdue_checkout),
+
+    # Reports
+    Case(ReportService.get_dashboard_stats, seq_scan_ok="total guest count reads the whole table"),
+    Case(ReportService.get_room_status_report),
+    Case(ReportService.generate_occupancy_pdf, last_month, seq_scan_ok="includes the dashboard stats"),
+    Case(ReportService.generate_occupancy_excel, last_month, seq_scan_ok="includes the dashboard stats"),
+]
+
+
+@dataclass
+class CaseResult:
+    case: Case
+    statements: int = 0
+    max_cost: float = 0.0
+    failures: List[str] = field(default_factory=list)
+    plans: List[str] = field(default_factory=list)
+
+
+def serialize(result: Any, schema: Type[BaseModel]) -> None:
+    """Validate the result like the endpoint's response_model does"""
+    items = result if isinstance(result, list) else [result]
+    for item in items[:SERIALIZE_SAMPLE]:
+        schema.model_validate(item)
+
+
+def run_case(connection: Connection, db: Session, fixtures: Fixtures, case: Case) -> CaseResult:
+    """Call the service method, capture its SQL and check the plans"""
+    outcome = CaseResult(case)
+    args = case.args(fixtures)
+    db.flush()
+
+    with capture_statements(connection) as captured:
+        try:
+            result = case.method(db, *args)
+            if case.schema is not None and result is not None:
+                serialize(result, case.schema)
+        except Exception as exc:
+            outcome.failures.append(f"raised {type(exc).__name__}: {exc}")
+            db.rollback()
+            return outcome
+
+    statements = [(sql, params) for sql, params in captured if is_explainable(sql)]
+    outcome.statements = len(statements)
+
+    repeated, count = Counter(sql for sql, _ in statements).most_common(1)[0] if statements else ("", 0)
+    if count >= N_PLUS_ONE_REPEATS:
+        outcome.failures.append(f"N+1: statement ran {count} times: {' '.join(repeated.split())[:120]}")
+
+    explained = set()
+    for sql, params in statements:
+        if sql in explained:
+            continue
+        explained.add(sql)
+        plan = explain(connection, sql, params)
+        outcome.max_cost = max(outcome.max_cost, plan["Total Cost"])
+        scans = scans_by_relation(plan)
+        outcome.plans.append(
+            f"cost={plan['Total Cost']:.0f} "
+            + ", ".join(f"{table}: {'/'.join(nodes)}" for table, nodes in sorted(scans.items()))
+        )
+        offending = seq_scanned(plan, LARGE_TABLES)
+        if offending and not case.seq_scan_ok:
+            outcome.failures.append(f"sequential scan on {', '.join(offending)}: {' '.join(sql.split())[:120]}")
+    return outcome
+
+
+def check_budget(outcome: CaseResult, budgets: Dict[str, Any], compare_cost: bool) -> None:
+    budget = budgets.get(outcome.case.name)
+    if budget is None:
+        outcome.failures.append("no budget recorded (run with --update-budgets)")
+        return
+    if outcome.statements > budget["statements"]:
+        outcome.failures.append(f"{outcome.statements} statements, budget is {budget['statements']}")
+    if compare_cost and outcome.max_cost > budget["max_cost"]:
+        outcome.failures.append(f"cost {outcome.max_cost:.0f}, budget is {budget['max_cost']}")
+
+
+def uncovered_methods() -> List[str]:
+    """Public service methods without a plan case"""
+    covered = {case.method.__qualname__ for case in CASES} | NO_SQL
+    return [
+        f"{service.__name__}.{name}"
+        for service in SERVICES
+        for name, _ in inspect.getmembers(service, inspect.isfunction)
+        if not name.startswith("_") and f"{service.__name__}.{name}" not in covered
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser, DEFAULT_DATASET)
+    parser.add_argument("--update-budgets", action="store_true", help="record current counts and costs as budgets")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the plan summary of every statement")
+    args = parser.parse_args()
+
+    spec = spec_from_args(args, random_tag())
+    dataset = {name: value for name, value in asdict(spec).items() if name != "tag"}
+    stored = json.loads(BUDGETS_FILE.read_text()) if BUDGETS_FILE.exists() else {"dataset": dataset, "cases": {}}
+    # Costs scale with the data; statement counts must not
+    compare_cost = stored.get("dataset") == dataset
+    if not compare_cost and not args.update_budgets:
+        print(f"Dataset differs from the one in {BUDGETS_FILE.name}; checking statement counts only")
+
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    results: List[CaseResult] = []
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            seeded = generate(connection, spec)
+            # Service commits only release a savepoint; the outer transaction is rolled back
+            db = Session(bind=connection, join_transaction_mode="create_savepoint")
+            fixtures = Fixtures(db, seeded)
+            for case in CASES:
+                results.append(run_case(connection, db, fixtures, case))
+            db.close()
+        finally:
+            transaction.rollback()
+
+    if args.update_budgets:
+        stored = {
+            "dataset": dataset,
+            "cases": {
+                outcome.case.name: {
+                    "statements": outcome.statements,
+                    "max_cost": math.ceil(max(outcome.max_cost * COST_HEADROOM, outcome.max_cost + MIN_COST_SLACK))
+                }
+                for outcome in results
+            }
+        }
+        BUDGETS_FILE.write_text(json.dumps(stored, indent=2) + "\n")
+        print(f"Budgets written to {BUDGETS_FILE}")
+
+    failed = 0
+    for outcome in results:
+        if not args.update_budgets:
+            check_budget(outcome, stored["cases"], compare_cost)
+        status = "FAIL" if outcome.failures else "ok  "
+        failed += bool(outcome.failures)
+        print(f"{status} {outcome.case.name:<62} {outcome.statements:>3} stmts  cost {outcome.max_cost:>9.0f}")
+        for failure in outcome.failures:
+            print(f"       {failure}")
+        if args.verbose:
+            for plan in outcome.plans:
+                print(f"       {plan}")
+
+    missing = uncovered_methods()
+    for name in missing:
+        print(f"FAIL {name}: no plan case")
+
+    print(f"\n{len(results) - failed}/{len(results)} cases passed")
+    return 1 if failed or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
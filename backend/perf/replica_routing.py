@@ -0,0 +1,161 @@
+"""
+Read-replica routing check
+
+Runs requests through the app in process and counts the statements each
+engine executed, to verify that:
+
+  - read-only endpoints (async reads and reports) go to a replica
+  - writes go to the primary and set the read-your-writes cookie
+  - a client holding that cookie reads from the primary
+  - without replicas configured, everything stays on the primary
+
+The replica does not need to replicate: two independent local PostgreSQL
+databases at the Alembic head are enough, which also makes read-your-writes
+visible (the guest created on the primary is only found there).
+
+Usage (from backend/, DATABASE_URL pointing at the primary):
+    DATABASE_REPLICA_URLS=postgresql://postgres@/hotel_replica?host=/tmp/pg2 \\
+        python -m perf.replica_routing
+"""
+import argparse
+import sys
+import threading
+import uuid
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.config import settings
+from app.database import SessionLocal, async_engine, async_replica_engines, engine, replica_engines
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.models import Administrator, Guest
+from app.services import AuthService
+from main import app
+
+ADMIN = f"/api{settings.ADMIN_ROUTE_PREFIX}"
+
+
+class EngineCounter:
+    """Statements executed per database (primary/replica), sync and async engines"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+        self._listeners: List[Tuple[object, Callable]] = []
+        targets = [("primary", engine), ("primary", async_engine.sync_engine)]
+        targets += [(f"replica{i}", replica) for i, replica in enumerate(replica_engines)]
+        targets += [(f"replica{i}", replica.sync_engine) for i, replica in enumerate(async_replica_engines)]
+        for name, target in targets:
+            listener = self._listener(name)
+            event.listen(target, "before_cursor_execute", listener)
+            self._listeners.append((target, listener))
+
+    def _listener(self, name: str) -> Callable:
+        def count(conn, cursor, statement, parameters, context, executemany):
+            with self._lock:
+                self.counts[name] += 1
+        return count
+
+    def take(self) -> Dict[str, int]:
+        """Counts since the last call"""
+        with self._lock:
+            counts = dict(self.counts)
+            self.counts.clear()
+        return counts
+
+    def close(self) -> None:
+        for target, listener in self._listeners:
+            event.remove(target, "before_cursor_execute", listener)
+
+
+def used_replica(counts: Dict[str, int]) -> bool:
+    return any(name.startswith("replica") for name in counts)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    if settings.ENVIRONMENT == "production":
+        print("Refusing to run against ENVIRONMENT=production")
+        return 2
+
+    db = SessionLocal()
+    try:
+        admin = db.query(Administrator).order_by(Administrator.id).first()
+    finally:
+        db.close()
+
+    counter = EngineCounter()
+    results: List[Tuple[str, bool, Dict[str, int]]] = []
+
+    email = f"replica-check-{uuid.uuid4().hex[:8]}@example.com"
+    guest_payload = {
+        "first_name": "Replica", "last_name": "Check", "email": email,
+        "phone": "0000000000", "id_document": f"RC{uuid.uuid4().hex[:10]}", "password": "replica-check"
+    }
+    replicas = bool(replica_engines)
+
+    try:
+        with TestClient(app) as client:
+            counter.take()
+
+            client.get("/api/rooms/?limit=5")
+            counts = counter.take()
+            if replicas:
+                results.append(("GET /rooms reads from a replica", used_replica(counts) and "primary" not in counts, counts))
+            else:
+                results.append(("GET /rooms reads from the primary", "primary" in counts, counts))
+
+            if admin:
+                token = AuthService.create_access_token(data={"sub": admin.username})
+                client.get(f"{ADMIN}/reports/rooms-status", headers={"Authorization": f"Bearer {token}"})
+                counts = counter.take()
+                # The admin check itself stays on the primary; the report doesn't
+                results.append(("Admin report reads from a replica" if replicas else "Admin report reads from the primary",
+                                used_replica(counts) == replicas, counts))
+
+            response = client.post("/api/guests/", json=guest_payload)
+            guest_id = response.json().get("id") if response.status_code == 201 else None
+            counts = counter.take()
+            results.append(("POST /guests writes to the primary",
+                            guest_id is not None and not used_replica(counts), counts))
+            if replicas:
+                results.append(("POST /guests sets the read-your-writes cookie",
+                                ReadYourWritesMiddleware.COOKIE in response.cookies, {}))
+
+            if guest_id is not None:
+                # TestClient keeps the cookie: this is the same client reading its write
+                found = client.get(f"/api/guests/{guest_id}").status_code == 200
+                counts = counter.take()
+                results.append(("Same client reads its new guest from the primary",
+                                found and not used_replica(counts), counts))
+
+                if replicas:
+                    client.cookies.clear()
+                    client.get(f"/api/guests/{guest_id}")
+                    counts = counter.take()
+                    results.append(("Another client reads the guest from a replica", used_replica(counts), counts))
+    finally:
+        counter.close()
+        db = SessionLocal()
+        try:
+            db.query(Guest).filter(Guest.email == email).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    print(f"Replicas configured: {len(replica_engines)}")
+    for label, ok, counts in results:
+        detail = ", ".join(f"{name}={count}" for name, count in sorted(counts.items()))
+        print(f"{'ok  ' if ok else 'FAIL'} {label:55} {detail}")
+
+    failed = sum(1 for _, ok, _ in results if not ok)
+    print(f"\n{len(results) - failed}/{len(results)} checks passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+"""
+Booking-rush load generator (flash sale)
+
+Thousands of async clients hit the same limited inventory at once: each one
+searches /rooms/available/search for the sale dates, checks availability of
+one of the sale rooms, and races to POST /reservations for it. Only one
+booking per room can be legitimate; every extra overlapping Pending/Active
+booking on a sale room is an oversell that slipped through.
+
+The report covers throughput, latency distribution and error rate per
+endpoint, the final outcome of every client, database pool waits (a probe
+checkout through the app's pool every --sample-interval seconds) and lock
+waits seen in pg_stat_activity, and the number of overlapping bookings.
+
+By default the app is served in-process by uvicorn on a free local port, so
+the pool can be sampled; --url points the clients at a server you started
+yourself (pool probes are then skipped). Reservations created by the run
+are deleted at the end unless --keep is given. No outside services are used.
+
+Usage (from backend/, against a local database loaded with perf.datagen):
+    python -m perf.rush
+    python -m perf.rush --clients 5000 --inventory 10 --connections 200
+    python -m perf.rush --url http://127.0.0.1:8000 --ramp 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import sys
+import threading
+import time as clock
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from perf.bench import percentile
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Every open booking on a sale room beyond the first one overlaps another
+OVERLAPS_SQL = """
+SELECT coalesce(sum(bookings - 1), 0) AS extra, count(*) AS rooms
+FROM (
+    SELECT room_id, count(*) AS bookings
+    FROM reservations
+    WHERE room_id = ANY(:rooms) AND status IN ('Pending', 'Active')
+      AND check_in_date < :check_out AND check_out_date > :check_in
+    GROUP BY room_id
+    HAVING count(*) > 1
+) AS oversold
+"""
+
+LOCK_WAITS_SQL = """
+SELECT count(*) FILTER (WHERE state = 'active') AS active,
+       count(*) FILTER (WHERE wait_event_type = 'Lock') AS lock_waits
+FROM pg_stat_activity
+WHERE datname = current_database() AND pid <> pg_backend_pid()
+"""
+
+
+@dataclass
+class Endpoint:
+    """Latencies and outcomes of one endpoint"""
+    latencies_ms: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values())
+
+    @property
+    def errors(self) -> int:
+        # Business rejections (400/409) are expected in a rush; count the rest
+        return sum(
+            count for status, count in self.statuses.items()
+            if not isinstance(status, int) or status >= 500 or status in (401, 403, 404, 422)
+        )
+
+
+@dataclass
+class Sale:
+    """The contested inventory"""
+    rooms: Dict[int, Decimal]
+    guest_ids: List[int]
+    check_in: datetime
+    check_out: datetime
+    room_type: str
+    first_reservation_id: int
+
+    @property
+    def nights(self) -> int:
+        return (self.check_out.date() - self.check_in.date()).days
+
+
+class Recorder:
+    """Collects client-side results and server-side samples"""
+
+    def __init__(self, connections: int):
+        # httpx rescans its whole wait queue on every pool event, which turns
+        # thousands of queued requests quadratic; clients queue here instead
+        self.slots = asyncio.Semaphore(connections)
+        self.endpoints: Dict[str, Endpoint] = defaultdict(Endpoint)
+        self.outcomes: Counter = Counter()
+        self.pool_waits_ms: List[float] = []
+        self.pool_checked_out: List[int] = []
+        self.pool_timeouts = 0
+        self.db_active: List[int] = []
+        self.lock_waits: List[int] = []
+
+    async def call(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs) -> Optional[Any]:
+        """Send a request; returns the parsed body on 2xx, None otherwise"""
+        async with self.slots:
+            started = clock.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.HTTPError as e:
+                self.endpoints[name].statuses[type(e).__name__] += 1
+                return None
+        self.endpoints[name].latencies_ms.append((clock.perf_counter() - started) * 1000)
+        self.endpoints[name].statuses[response.status_code] += 1
+        return response.json() if response.is_success else None
+
+
+async def client_flow(client: httpx.AsyncClient, recorder: Recorder, sale: Sale, index: int, delay: float) -> None:
+    """One shopper: search, check availability, book"""
+    await asyncio.sleep(delay)
+    rng = random.Random(index)
+
+    rooms = await recorder.call(client, "search", "GET", "/api/rooms/available/search", params={
+        "check_in": sale.check_in.isoformat(),
+        "check_out": sale.check_out.isoformat(),
+        "room_type": sale.room_type
+    })
+    if rooms is None:
+        recorder.outcomes["search failed"] += 1
+        return
+    candidates = [room["id"] for room in rooms if room["id"] in sale.rooms]
+    if not candidates:
+        recorder.outcomes["sold out"] += 1
+        return
+    room_id = rng.choice(candidates)
+
+    check = await recorder.call(client, "availability", "POST", "/api/reservations/check-availability", params={
+        "room_id": room_id,
+        "check_in": sale.check_in.date().isoformat(),
+        "check_out": sale.check_out.date().isoformat(),
+        "guests_count": 1
+    })
+    if check is None:
+        recorder.outcomes["availability failed"] += 1
+        return
+    if not check["available"]:
+        recorder.outcomes["lost at availability"] += 1
+        return
+
+    booking = await recorder.call(client, "book", "POST", "/api/reservations/", json={
+        "guest_id": sale.guest_ids[index % len(sale.guest_ids)],
+        "room_id": room_id,
+        "check_in_date": sale.check_in.isoformat(),
+        "check_out_date": sale.check_out.isoformat(),
+        "guests_count": 1,
+        "total_price": str(sale.rooms[room_id] * sale.nights),
+        "payment_method": "PayPal"
+    })
+    recorder.outcomes["booked" if booking is not None else "lost at booking"] += 1
+
+
+async def sample(recorder: Recorder, stats_engine, interval: float, pool_probe: bool) -> None:
+    """Sample pool checkout waits and database activity until cancelled"""
+    from app.database import engine
+
+    def probe() -> None:
+        recorder.pool_checked_out.append(engine.pool.checkedout())
+        started = clock.perf_counter()
+        try:
+            with engine.connect():
+                pass
+        except exc.TimeoutError:
+            recorder.pool_timeouts += 1
+        recorder.pool_waits_ms.append((clock.perf_counter() - started) * 1000)
+
+    def activity() -> None:
+        with stats_engine.connect() as connection:
+            row = connection.execute(text(LOCK_WAITS_SQL)).one()
+        recorder.db_active.append(row.active)
+        recorder.lock_waits.append(row.lock_waits)
+
+    while True:
+        if pool_probe:
+            await asyncio.to_thread(probe)
+        await asyncio.to_thread(activity)
+        await asyncio.sleep(interval)
+
+
+def prepare_sale(connection, args: argparse.Namespace) -> Sale:
+    """Pick the sale rooms and dates and the guests who will shop"""
+    rooms = connection.execute(text(
+        "SELECT id, price_per_night FROM rooms WHERE type = :type AND status = 'Available' "
+        "ORDER BY id LIMIT :limit"
+    ), {"type": args.room_type, "limit": args.inventory}).all()
+    guest_ids = connection.execute(text("SELECT id FROM guests ORDER BY id LIMIT :limit"), {
+        "limit": args.clients
+    }).scalars().all()
+    if not rooms or not guest_ids:
+        raise SystemExit(f"No {args.room_type} rooms or guests found; load a dataset with perf.datagen first")
+
+    check_in = datetime.combine(date.today() + timedelta(days=args.days_ahead), time(15))
+    room_ids = [room.id for room in rooms]
+    # Start from free inventory so every overlap found afterwards comes from this run
+    taken = connection.execute(text(
+        "SELECT count(*) FROM reservations WHERE room_id = ANY(:rooms) AND status IN ('Pending', 'Active') "
+        "AND check_in_date < :check_out AND check_out_date > :check_in"
+    ), {"rooms": room_ids, "check_in": check_in, "check_out": check_in + timedelta(days=args.nights)}).scalar()
+    if taken:
+        raise SystemExit(f"{taken} sale rooms are already booked for the sale dates; use another --days-ahead")
+
+    return Sale(
+        rooms={room.id: room.price_per_night for room in rooms},
+        guest_ids=guest_ids,
+        check_in=check_in,
+        check_out=check_in + timedelta(days=args.nights),
+        room_type=args.room_type,
+        first_reservation_id=connection.execute(text("SELECT coalesce(max(id), 0) + 1 FROM reservations")).scalar()
+    )
+
+
+def start_server() -> tuple:
+    """Serve the app with uvicorn in a background thread on a free port"""
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    # Server errors show up as 5xx counts in the report instead of tracebacks
+    server = uvicorn.Server(uvicorn.Config("main:app", host="127.0.0.1", port=port, log_level="critical"))
+    thread = threading.Thread(target=server.run, name="rush-server", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise SystemExit("The in-process server failed to start")
+        clock.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+async def rush(url: str, sale: Sale, args: argparse.Namespace, stats_engine) -> tuple:
+    recorder = Recorder(args.connections)
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as client:
+        sampler = asyncio.create_task(sample(recorder, stats_engine, args.sample_interval, pool_probe=not args.url))
+        started = clock.perf_counter()
+        await asyncio.gather(*(
+            client_flow(client, recorder, sale, index, args.ramp * index / args.clients)
+            for index in range(args.clients)
+        ))
+        seconds = clock.perf_counter() - started
+        sampler.cancel()
+    return recorder, seconds
+
+
+def histogram(latencies: List[float]) -> Dict[str, int]:
+    buckets: Dict[str, int] = {}
+    remaining = sorted(latencies)
+    for bound in LATENCY_BUCKETS_MS:
+        count = sum(1 for value in remaining if value <= bound)
+        buckets[f"<={bound}ms"] = count
+        remaining = remaining[count:]
+    buckets[f">{LATENCY_BUCKETS_MS[-1]}ms"] = len(remaining)
+    return buckets
+
+
+def build_report(recorder: Recorder, seconds: float, sale: Sale, overlaps, booked: int) -> Dict[str, Any]:
+    total_requests = sum(endpoint.requests for endpoint in recorder.endpoints.values())
+    report: Dict[str, Any] = {
+        "clients": sum(recorder.outcomes.values()),
+        "inventory": len(sale.rooms),
+        "seconds": round(seconds, 2),
+        "requests": total_requests,
+        "throughput_rps": round(total_requests / seconds, 1),
+        "outcomes": dict(recorder.outcomes),
+        "bookings_created": booked,
+        "overlapping_bookings": int(overlaps.extra),
+        "oversold_rooms": overlaps.rooms,
+        "endpoints": {},
+    }
+    for name, endpoint in recorder.endpoints.items():
+        latencies = endpoint.latencies_ms or [0.0]
+        report["endpoints"][name] = {
+            "requests": endpoint.requests,
+            "error_rate": round(endpoint.errors / max(endpoint.requests, 1), 4),
+            "statuses": {str(status): count for status, count in sorted(endpoint.statuses.items(), key=str)},
+            **{f"p{p}_ms": round(percentile(latencies, p), 1) for p in (50, 90, 95, 99)},
+            "max_ms": round(max(latencies), 1),
+            "histogram": histogram(endpoint.latencies_ms),
+        }
+    if recorder.pool_waits_ms:
+        report["pool"] = {
+            "probes": len(recorder.pool_waits_ms),
+            "wait_p50_ms": round(percentile(recorder.pool_waits_ms, 50), 1),
+            "wait_p95_ms": round(percentile(recorder.pool_waits_ms, 95), 1),
+            "wait_max_ms": round(max(recorder.pool_waits_ms), 1),
+            "probes_waiting_over_10ms": sum(1 for wait in recorder.pool_waits_ms if wait > 10),
+            "max_checked_out": max(recorder.pool_checked_out),
+            "timeouts": recorder.pool_timeouts,
+        }
+    if recorder.db_active:
+        report["database"] = {
+            "max_active_backends": max(recorder.db_active),
+            "max_lock_waits": max(recorder.lock_waits),
+        }
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{report['clients']} clients for {report['inventory']} rooms in {report['seconds']}s: "
+          f"{report['requests']} requests, {report['throughput_rps']} req/s")
+    for outcome, count in sorted(report["outcomes"].items()):
+        print(f"  {outcome:<22} {count:>7}")
+
+    print(f"\n{'endpoint':<14} {'requests':>8} {'errors':>7} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, endpoint in report["endpoints"].items():
+        print(f"{name:<14} {endpoint['requests']:>8} {endpoint['error_rate']:>7.1%} {endpoint['p50_ms']:>8.1f} "
+              f"{endpoint['p90_ms']:>8.1f} {endpoint['p95_ms']:>8.1f} {endpoint['p99_ms']:>8.1f} "
+              f"{endpoint['max_ms']:>8.1f}")
+        print(f"{'':<14} statuses {endpoint['statuses']}")
+
+    if "pool" in report:
+        pool = report["pool"]
+        print(f"\nPool checkout wait: p50 {pool['wait_p50_ms']}ms  p95 {pool['wait_p95_ms']}ms  "
+              f"max {pool['wait_max_ms']}ms  ({pool['probes_waiting_over_10ms']}/{pool['probes']} probes waited "
+              f">10ms, up to {pool['max_checked_out']} connections checked out)")
+        if pool["timeouts"]:
+            print(f"Pool exhausted: {pool['timeouts']} probes hit the checkout timeout")
+    if "database" in report:
+        print(f"Database: up to {report['database']['max_active_backends']} active backends, "
+              f"{report['database']['max_lock_waits']} waiting on locks")
+
+    print(f"\nBookings created: {report['bookings_created']} for {report['inventory']} rooms")
+    if report["overlapping_bookings"]:
+        print(f"OVERSOLD: {report['overlapping_bookings']} overlapping bookings slipped through on "
+              f"{report['oversold_rooms']} rooms")
+    else:
+        print("No overlapping bookings")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=2000, help="concurrent shoppers")
+    parser.add_argument("--inventory", type=int, default=20, help="rooms on sale")
+    parser.add_argument("--room-type", default="Suite", help="type of the rooms on sale")
+    parser.add_argument("--days-ahead", type=int, default=400, help="sale check-in, past the loaded bookings")
+    parser.add_argument("--nights", type=int, default=2)
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which clients start (0 = all at once)")
+    parser.add_argument("--connections", type=int, default=100, help="requests in flight at once")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--sample-interval", type=float, default=0.1, help="seconds between pool/DB samples")
+    parser.add_argument("--url", help="base URL of a running server (default: serve the app in-process)")
+    parser.add_argument("--keep", action="store_true", help="keep the reservations created by the run")
+    parser.add_argument("--json", type=Path, help="also write the report to this file")
+    args = parser.parse_args()
+
+    if settings.ENVIRONMENT == "production":
+        print("Refusing to run a booking rush with ENVIRONMENT=production")
+        return 1
+
+    stats_engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    with stats_engine.connect() as connection:
+        sale = prepare_sale(connection, args)
+
+    server = thread = None
+    url = args.url
+    if not url:
+        server, thread, url = start_server()
+    try:
+        recorder, seconds = asyncio.run(rush(url, sale, args, stats_engine))
+    finally:
+        if server:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+    with stats_engine.begin() as connection:
+        overlaps = connection.execute(text(OVERLAPS_SQL), {
+            "rooms": list(sale.rooms), "check_in": sale.check_in, "check_out": sale.check_out
+        }).one()
+        booked = connection.execute(text(
+            "SELECT count(*) FROM reservations WHERE id >= :first AND room_id = ANY(:rooms)"
+        ), {"first": sale.first_reservation_id, "rooms": list(sale.rooms)}).scalar()
+        if not args.keep:
+            connection.execute(text(
+                "DELETE FROM reservations WHERE id >= :first AND room_id = ANY(:rooms)"
+            ), {"first": sale.first_reservation_id, "rooms": list(sale.rooms)})
+
+    report = build_report(recorder, seconds, sale, overlaps, booked)
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    return 1 if report["overlapping_bookings"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,15 @@
 -- Hotel Reception System - PostgreSQL Database Schema
 -- ================================================
 
+-- NOTE: The schema is managed with Alembic (backend/alembic). Databases
+-- created before the migrations (from this script, current or older, or by
+-- the create_all the app used to run at startup) are brought up to date
+-- with:
+--     cd backend && alembic upgrade head
+-- The migrations only create the tables, columns, indexes and triggers the
+-- database lacks; no `alembic stamp` is needed. Prefer `alembic upgrade head`
+-- for new databases and use this file for the sample data.
+
 -- Create database
 -- Run this in pgAdmin or psql as superuser
 -- CREATE DATABASE hotel_db;
@@ -44,6 +53,7 @@ CREATE TABLE IF NOT EXISTS guests (
     nationality VARCHAR(100),
     date_of_birth TIMESTAMP,
     address TEXT,
+    password_hash VARCHAR(255),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -73,6 +83,16 @@ CREATE TABLE IF NOT EXISTS room_images (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Reservation Groups Table (group bookings: weddings, conferences, tours)
+CREATE TABLE IF NOT EXISTS reservation_groups (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    guest_id INTEGER NOT NULL REFERENCES guests(id),
+    check_in_date TIMESTAMP NOT NULL,
+    check_out_date TIMESTAMP NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Reservations Table
 CREATE TABLE IF NOT EXISTS reservations (
     id SERIAL PRIMARY KEY,
@@ -86,11 +106,42 @@ CREATE TABLE IF NOT EXISTS reservations (
     total_price DECIMAL(10, 2) NOT NULL,
     guests_count INTEGER DEFAULT 1 CHECK (guests_count > 0),
     special_requests TEXT,
+    payment_method VARCHAR(50) DEFAULT 'Cash',
+    payment_status VARCHAR(50) DEFAULT 'Pending',
+    group_id INTEGER REFERENCES reservation_groups(id),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT check_dates CHECK (check_out_date > check_in_date)
 );
 
+-- Room Holds Table (room held during the PayPal checkout)
+CREATE TABLE IF NOT EXISTS room_holds (
+    id SERIAL PRIMARY KEY,
+    hold_token VARCHAR(36) UNIQUE NOT NULL,
+    room_id INTEGER NOT NULL REFERENCES rooms(id) ON DELETE CASCADE,
+    guest_id INTEGER NOT NULL REFERENCES guests(id),
+    check_in_date TIMESTAMP NOT NULL,
+    check_out_date TIMESTAMP NOT NULL,
+    guests_count INTEGER DEFAULT 1,
+    status VARCHAR(20) DEFAULT 'Held' CHECK (status IN ('Held', 'Converted', 'Released', 'Expired')),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    reservation_id INTEGER REFERENCES reservations(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Idempotency Keys Table (stored responses for retried POST requests)
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id SERIAL PRIMARY KEY,
+    key VARCHAR(255) NOT NULL,
+    scope VARCHAR(100) NOT NULL,
+    request_hash VARCHAR(64) NOT NULL,
+    status_code INTEGER,
+    response_body JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    CONSTRAINT uq_idempotency_keys_scope_key UNIQUE (scope, key)
+);
+
 -- ================================================
 -- INDEXES
 -- ================================================
@@ -107,9 +158,28 @@ CREATE INDEX idx_reservations_guest_id ON reservations(guest_id);
 CREATE INDEX idx_reservations_status ON reservations(status);
 CREATE INDEX idx_reservations_check_in_date ON reservations(check_in_date);
 CREATE INDEX idx_reservations_check_out_date ON reservations(check_out_date);
+CREATE INDEX idx_reservations_group_id ON reservations(group_id);
+
+-- Partial indexes for the hot queries (overlap checks, today's arrivals and
+-- departures, revenue). Service queries filter with date ranges instead of
+-- DATE(column) so these indexes can be used.
+CREATE INDEX idx_reservations_room_open_dates ON reservations(room_id, check_in_date, check_out_date)
+    WHERE status IN ('Pending', 'Active');
+CREATE INDEX idx_reservations_open_check_in ON reservations(check_in_date)
+    WHERE status IN ('Pending', 'Active');
+CREATE INDEX idx_reservations_active_check_out ON reservations(check_out_date)
+    WHERE status = 'Active';
+CREATE INDEX idx_reservations_created_at_revenue ON reservations(created_at) INCLUDE (total_price)
+    WHERE status <> 'Cancelled';
 
 CREATE INDEX idx_room_images_room_id ON room_images(room_id);
 
+CREATE INDEX idx_room_holds_room_id ON room_holds(room_id);
+CREATE INDEX idx_room_holds_room_held_dates ON room_holds(room_id, check_in_date, check_out_date)
+    WHERE status = 'Held';
+
+CREATE INDEX idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+
 -- ================================================
 -- TRIGGERS FOR UPDATED_AT
 -- ================================================
@@ -254,6 +324,9 @@ COMMENT ON TABLE guests IS 'Guest information';
 COMMENT ON TABLE reservations IS 'Room reservations and bookings';
 COMMENT ON TABLE administrators IS 'System administrators';
 COMMENT ON TABLE room_images IS 'Room image gallery';
+COMMENT ON TABLE reservation_groups IS 'Group bookings (one reservation per room)';
+COMMENT ON TABLE room_holds IS 'Temporary room holds during checkout';
+COMMENT ON TABLE idempotency_keys IS 'Stored responses for Idempotency-Key retries';
 
 -- ================================================
 -- COMPLETED
@@ -7,6 +7,9 @@ const api = axios.create({
   headers: {
     'Content-Type': 'application/json',
   },
+  // Send and store the API's cookies cross-origin: read_primary_until keeps
+  // reads right after a write on the primary database
+  withCredentials: true,
 });
 
 // Add token to requests if available